@@ -12,28 +12,50 @@ Fully implements ALL requirements from the Forensic Graph Agent use case:
 """
 
 from neo4j import GraphDatabase
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from datetime import datetime, timedelta
 import networkx as nx
 import statistics
 import time
 import math
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, deque
+from itertools import repeat
 import numpy as np
 import traceback
 import json
+import csv
+import gzip
 import requests
+import hashlib
+import heapq
+import operator
+import os
+import sqlite3
+import sys
+import threading
+import multiprocessing
+import pickle
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 
 # ---------- Custom JSON Encoder ----------
 class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder that handles datetime objects"""
+    """Custom JSON encoder that handles datetime objects (and numpy scalars/arrays)"""
     def default(self, obj):
         if isinstance(obj, datetime):
             return obj.isoformat()
         elif hasattr(obj, 'isoformat'):  # Any object with isoformat method
             return obj.isoformat()
+        elif isinstance(obj, np.generic):
+            return obj.item()
+        elif isinstance(obj, np.ndarray):
+            return obj.tolist()
         return super().default(obj)
 
+# Single compact encoder for responses: no indentation, datetimes handled while
+# encoding instead of in a separate pass over the report
+COMPACT_JSON = DateTimeEncoder(separators=(',', ':'), ensure_ascii=False, check_circular=False)
+
 # ---------- Configuration ----------
 NEO4J_URI = "neo4j://127.0.0.1:7687"
 NEO4J_USER = "neo4j"
@@ -49,9 +71,85 @@ WEIGHTS = {
 }
 
 MAX_HOPS = 3
+MAX_HOPS_LIMIT = 6  # largest max_hops a request may ask for
+# Traversal node budget: a provenance traversal stops going deeper once this many
+# wallets have been on its frontier; the depth it got to is reported as depth_reached
+PROVENANCE_FRONTIER_LIMIT = 250000
 MIN_TX_COUNT = 3
+TEMPORAL_PROVENANCE = True  # Only follow causally possible paths (mixer → A happens before A → B)
+PROVENANCE_PATHS_PER_MIXER = 2     # Shortest paths kept per (wallet, mixer) pair
+PROVENANCE_MIXERS_PER_WALLET = 10  # Highest-score mixers kept per wallet (counts still cover all)
 MIXER_SCORE_THRESHOLD = 0.3  # Lowered for testing
 
+# USE CASE: <30 seconds analysis. The budget runs from the start of the analysis:
+# the transfer load / BitQuery fetch (its timeout is capped by the budget) and the
+# graph build spend it first, the detection stages share what is left and return
+# partial results (flagged with their coverage) when it runs out.
+ANALYSIS_TIME_BUDGET = 25.0  # seconds, leaves headroom for reporting
+BITQUERY_TIMEOUT = 45        # seconds, upper bound of a fetch
+STAGE_BUDGET_SHARES = {
+    'mixer_scoring': 0.4,
+    'provenance_forward': 0.3,
+    'provenance_backward': 0.3
+}
+
+# Backward provenance runs per weakly connected component on a process pool:
+# components smaller than COMPONENT_BATCH_NODES wallets are batched together, and
+# each batch's payload is pickled once and its targets split into at most
+# COMPONENT_WORKERS tasks of at least COMPONENT_CHUNK_TARGETS. Runs with
+# fewer than COMPONENT_PARALLEL_MIN_TARGETS targets (or 1 worker) stay in-process.
+COMPONENT_WORKERS = min(4, os.cpu_count() or 1)
+COMPONENT_BATCH_NODES = 5000
+COMPONENT_CHUNK_TARGETS = 250
+COMPONENT_PARALLEL_MIN_TARGETS = 1000
+# Mixer feature scoring splits into about one component batch per worker on
+# graphs of at least COMPONENT_PARALLEL_MIN_EDGES edges
+COMPONENT_PARALLEL_MIN_EDGES = 2_000_000
+
+# Where fetched transfers are cached between analyses: "neo4j" or "sqlite"
+# (embedded per-token file under SQLITE_STORE_DIR, no external database needed)
+TRANSFER_STORE_BACKEND = "neo4j"
+SQLITE_STORE_DIR = "transfer_store"
+
+# Serving: "dev" (Flask threaded dev server) or "production" (waitress, if installed;
+# also selected with --production). Detection pipelines run on a separate bounded
+# pool so cheap requests (initialize, tools/list, health, job polls) never queue
+# behind a 10-30s analysis.
+SERVER_MODE = "dev"
+SERVER_THREADS = 16             # request threads in production mode
+ANALYSIS_WORKERS = 2            # detection pipelines running at once
+ANALYSIS_JOB_RETENTION = 3600   # seconds a finished job stays pollable
+
+# Responses: gzip bodies at least this large when the client accepts it;
+# ?stream=1 sends large results as chunked JSON instead
+RESPONSE_GZIP_MIN_BYTES = 64 * 1024
+RESPONSE_GZIP_LEVEL = 5
+RESPONSE_STREAM_CHUNK_BYTES = 256 * 1024
+
+# detect_mixer_origins_batch: tokens accepted per call, batches coordinated at
+# once (their tokens run on the analysis pool) and seconds for a whole batch:
+# tokens the deadline reaches before they start are reported as skipped.
+# A batch keeps at most BATCH_TOKENS_IN_FLIGHT tokens on the analysis pool, so
+# single-token analyses always find a free worker; synchronous batch calls wait
+# BATCH_SYNC_WAIT seconds, then answer with the job to poll
+BATCH_MAX_TOKENS = 200
+BATCH_WORKERS = 1
+BATCH_TIME_BUDGET = 300
+BATCH_TOKENS_IN_FLIGHT = max(1, ANALYSIS_WORKERS - 1)
+BATCH_SYNC_WAIT = 60
+
+# Neo4j import: rows per UNWIND transaction, parallel write sessions (1 = sequential)
+NEO4J_IMPORT_BATCH_SIZE = 2000
+NEO4J_IMPORT_WORKERS = 1
+
+# Per-token "which mixers reach this wallet within k hops" indexes, built by each
+# analysis and reused by explain_provenance
+REACHABILITY_INDEX_DIR = "reachability_indexes"
+
+# Per-token raw heuristic features saved by each analysis, so new WEIGHTS or
+# MIXER_SCORE_THRESHOLD values can be tried (rescore_analysis) without a re-run
+FEATURE_CACHE_DIR = "feature_caches"
+
 # FORENSIC GRAPH AGENT USE CASE: Known Tornado Cash denominations
 TORNADO_DENOMINATIONS = {
     0.1: "Tornado 0.1 ETH",
@@ -60,7 +158,21 @@ TORNADO_DENOMINATIONS = {
     100.0: "Tornado 100 ETH"
 }
 
-# Known mixer addresses for direct detection
+# Mixer pool denominations per asset symbol (edge 'currency'). Transfers of an
+# asset without a table are matched against DEFAULT_DENOMINATION_ASSET.
+DENOMINATION_TABLES = {
+    'ETH': TORNADO_DENOMINATIONS,
+    'DAI': {100.0: "Tornado 100 DAI", 1000.0: "Tornado 1000 DAI", 10000.0: "Tornado 10000 DAI", 100000.0: "Tornado 100000 DAI"},
+    'CDAI': {5000.0: "Tornado 5000 cDAI", 50000.0: "Tornado 50000 cDAI", 500000.0: "Tornado 500000 cDAI", 5000000.0: "Tornado 5000000 cDAI"},
+    'USDC': {100.0: "Tornado 100 USDC", 1000.0: "Tornado 1000 USDC"},
+    'USDT': {100.0: "Tornado 100 USDT", 1000.0: "Tornado 1000 USDT"},
+    'WBTC': {0.1: "Tornado 0.1 WBTC", 1.0: "Tornado 1 WBTC", 10.0: "Tornado 10 WBTC"}
+}
+DENOMINATION_ASSET_ALIASES = {'WETH': 'ETH'}
+DEFAULT_DENOMINATION_ASSET = 'ETH'
+DENOMINATION_TOLERANCE = 0.01  # relative
+
+# Known mixer addresses for direct detection (always in the address registry)
 KNOWN_MIXER_ADDRESSES = {
     "0x910cbd523d972eb0a6f4cae4618ad62622b39dbf": "Tornado Cash: 100 ETH",
     "0xa160cdab225685da1d56aa342ad8841c3b53f291": "Tornado Cash: 10 ETH",
@@ -68,47 +180,236 @@ KNOWN_MIXER_ADDRESSES = {
     "0x47ce0c6ed5b0ce3d3a51fdb1c52dc66a7c3c2936": "Tornado Cash: 0.1 ETH",
 }
 
+# Local label files (mixers, sanctions lists, ...) merged into the address registry:
+# *.csv with address,label[,category] columns or *.txt with one address per line
+ADDRESS_REGISTRY_DIR = "address_registry"
+
+# Categories that mark a sanctions list; all are normalized to 'sanctioned'
+# (as is any category starting with "sanction"), e.g. ofac.txt or a CSV whose
+# category column says "sanctions". Sanctions are kept as a flag next to the
+# primary category, so a listed mixer can be sanctioned as well
+SANCTIONS_CATEGORIES = ('sanctioned', 'sanctions', 'ofac', 'ofac_sdn', 'sdn')
+
+# Well-known super-nodes (always in the address registry); exchange / router /
+# bridge files in ADDRESS_REGISTRY_DIR add more
+KNOWN_HUB_ADDRESSES = {
+    "0x7a250d5630b4cf539739df2c5dacb4c659f2488d": ("Uniswap V2: Router", "router"),
+    "0xe592427a0aece92de3edee1f18e0157c05861564": ("Uniswap V3: Router", "router"),
+    "0x3fc91a3afd70395cd496c647d5a6cc9d4b2b7fad": ("Uniswap: Universal Router", "router"),
+    "0x1111111254eeb25477b68fb85ed929f73a960582": ("1inch v5: Aggregation Router", "router"),
+    "0x28c6c06298d514db089934071355e5743bf21d60": ("Binance 14", "exchange"),
+}
+
+# Hubs (exchange hot wallets, DEX routers, bridges) are reached but never expanded
+# by provenance traversals, and are not mixer candidates: registry entries in
+# HUB_CATEGORIES, plus wallets whose degree (distinct counterparties) is at the
+# HUB_DEGREE_PERCENTILE of the graph and at least HUB_MIN_DEGREE. Known mixers and
+# wallets sending mostly pool denominations (uniform denomination score at least
+# HUB_DENOMINATION_EXEMPTION) are never degree hubs.
+HUB_CATEGORIES = ('exchange', 'router', 'bridge')
+HUB_DEGREE_PERCENTILE = 99.9
+HUB_MIN_DEGREE = 1000
+HUB_DENOMINATION_EXEMPTION = 0.5
+HUB_SUMMARY_LIMIT = 20  # hubs listed in the report
+
 driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+address_registry = None  # AddressRegistry, loaded on first use
+reachability_indexes = {}  # token_address -> MixerReachabilityIndex
+feature_caches = {}  # token_address -> HeuristicFeatureCache
+persistence_runs = {}  # token_address -> status of the latest background provenance write
+persistence_locks = {}  # token_address -> lock serializing that token's provenance writes
+persistence_locks_lock = threading.Lock()
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='analysis')
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+analysis_jobs = {}  # job_id -> analysis job (see submit_analysis_job)
+analysis_jobs_lock = threading.Lock()
+component_executor = None  # ProcessPoolExecutor for per-component work, started on first use
+component_executor_lock = threading.Lock()
 
 # ---------- Helper Functions ----------
 
+def clamp_max_hops(max_hops):
+    """max_hops as the pipeline runs it: an int within 1..MAX_HOPS_LIMIT (MAX_HOPS if unset)"""
+    return max(1, min(int(max_hops or MAX_HOPS), MAX_HOPS_LIMIT))
+
 def get_last_24h_date():
     """Get date string for 24 hours ago"""
     last_24h = datetime.now() - timedelta(hours=24)
     return last_24h.strftime("%Y-%m-%d")
 
-def parse_time(timestamp):
-    """Parse timestamp from your Neo4j format"""
-    if not timestamp:
-        return None
+def parse_timestamps(timestamps):
+    """
+    Parse a column of timestamps in one go into a numpy datetime64[s] array
+    Accepts "2025-12-01T12:34:56", "2025-12-01 12:34:56" (timezone suffix and
+    fractions are dropped, like before), datetimes, Neo4j DateTime objects and
+    epoch seconds. Unparseable or missing values become NaT (one warning with
+    the count, not one per value).
+    """
+    values = np.empty(len(timestamps), dtype=object)
+    values[:] = list(timestamps)
+    parsed = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[s]')
+    failed = 0
     
-    try:
-        if isinstance(timestamp, str):
-            # Handle ISO format: "2025-12-01T12:34:56"
-            if 'T' in timestamp:
-                # Extract just the date-time part before any timezone
-                timestamp = timestamp.split('T')[0] + ' ' + timestamp.split('T')[1].split('+')[0].split('.')[0]
-                return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-            # Handle regular format: "2025-12-01 12:34:56"
-            return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-        elif isinstance(timestamp, datetime):
-            return timestamp
-        elif hasattr(timestamp, 'to_native'):  # Neo4j DateTime object
-            return timestamp.to_native()
-    except Exception as e:
-        print(f"⚠️  Error parsing timestamp {timestamp}: {e}")
+    # Datetimes and Neo4j DateTimes (the only values needing Python calls) become
+    # ISO strings; strings and numbers are then handled column-wise
+    is_str = np.fromiter(map(isinstance, values, repeat(str)), dtype=bool, count=len(values))
+    is_missing = np.fromiter(map(operator.is_, values, repeat(None)), dtype=bool, count=len(values))
+    for i in np.flatnonzero(~is_str & ~is_missing):
+        value = values[i]
+        if hasattr(value, 'to_native'):  # Neo4j DateTime object
+            value = value.to_native()
+        if isinstance(value, datetime):
+            values[i] = value.isoformat()
+            is_str[i] = True
     
+    # "YYYY-MM-DDTHH:MM:SS" is the first 19 characters of every supported string
+    # (as bytes: numpy parses those fastest; non-ASCII strings stay unicode)
+    string_ids = np.flatnonzero(is_str)
     try:
-        # Fallback: try to parse as timestamp
-        return datetime.fromtimestamp(float(timestamp))
-    except:
-        # Ultimate fallback
-        print(f"⚠️  Could not parse timestamp: {timestamp}, using current time")
-        return datetime.now()
+        strings = values[string_ids].astype(bytes)
+        dash, width = b'-', 'S19'
+    except UnicodeEncodeError:
+        strings = values[string_ids].astype(str)
+        dash, width = '-', 'U19'
+    dated = np.char.find(strings, dash, 4, 5) == 4
+    heads = strings[dated].astype(width)
+    try:
+        parsed[string_ids[dated]] = heads.astype('datetime64[s]')
+    except ValueError:
+        # Some date string is malformed: parse those one by one
+        for i, head in zip(string_ids[dated].tolist(), heads.astype(str).tolist()):
+            try:
+                parsed[i] = np.datetime64(head, 's')
+            except ValueError:
+                failed += 1
+    
+    # Fallback: epoch seconds, from numbers or numeric strings ('' is missing)
+    epoch_ids = np.concatenate([string_ids[~dated & (np.char.str_len(strings) > 0)],
+                                np.flatnonzero(~is_str & ~is_missing)])
+    seconds = np.full(len(epoch_ids), np.nan)
+    for k, value in enumerate(values[epoch_ids].tolist()):
+        try:
+            seconds[k] = float(value)
+        except (ValueError, TypeError):
+            pass
+    valid = np.isfinite(seconds) & (np.abs(seconds) < 2 ** 62)
+    parsed[epoch_ids[valid]] = seconds[valid].astype(np.int64).astype('datetime64[s]')
+    failed += int((~valid).sum())
+    
+    if failed:
+        print(f"⚠️  Could not parse {failed} of {len(values)} timestamps")
+    return parsed
+
+def attach_parsed_times(transactions):
+    """
+    Set 'time_us' (epoch microseconds, None if unparseable) on every transaction
+    from one bulk parse; edge and transfer arrays are built from these integers
+    """
+    parsed = parse_timestamps([tx['timestamp'] for tx in transactions])
+    has_time = ~np.isnat(parsed)
+    time_us = parsed.astype('datetime64[us]').view(np.int64)
+    for tx, value, valid in zip(transactions, time_us.tolist(), has_time.tolist()):
+        tx['time_us'] = value if valid else None
+    return transactions
+
+def parse_time(timestamp):
+    """Parse a single timestamp into a naive UTC datetime (None if unparseable, see parse_timestamps)"""
+    parsed = parse_timestamps([timestamp])[0]
+    return None if np.isnat(parsed) else parsed.astype(datetime)
+
+def datetime_from_us(time_us):
+    """Naive UTC datetime of an epoch-microsecond 'time_us' value (None stays None)"""
+    return None if time_us is None else datetime(1970, 1, 1) + timedelta(microseconds=time_us)
+
+# ---------- Detection Budget ----------
+
+class DetectionBudget:
+    """
+    Cooperative time/work budget for one detection stage.
+    The clock starts at the first checkpoint, so a stage allocated early only
+    spends time once it actually runs.
+    """
+    def __init__(self, stage, seconds=None, max_work=None, total=0, allocator=None):
+        self.stage = stage
+        self.seconds = seconds
+        self.max_work = max_work
+        self.allocator = allocator
+        self.started_at = None
+        self.finished_at = None
+        self.deadline = None
+        self.work_done = 0
+        self.total = total
+        self.completed = 0
+        self.exhausted = False
+        self.unit = 'items'  # what items_processed / items_total count
+        self.details = {}  # stage-specific figures added to the summary
+
+    def start(self):
+        if self.started_at is None:
+            self.started_at = time.time()
+            if self.allocator is not None:
+                self.seconds = self.allocator()
+            if self.seconds is not None:
+                self.deadline = self.started_at + self.seconds
+
+    def checkpoint(self, work=1):
+        """Count work; returns False once the budget is spent so loops can stop early"""
+        if self.exhausted:
+            return False
+        self.start()
+        self.work_done += work
+        if self.max_work is not None and self.work_done > self.max_work:
+            self.exhausted = True
+        elif self.deadline is not None and time.time() > self.deadline:
+            self.exhausted = True
+        return not self.exhausted
+
+    def item_done(self):
+        """Mark one top-level item (node, mixer, target) as fully processed"""
+        self.completed += 1
+
+    def finish(self):
+        self.start()
+        if self.finished_at is None:
+            self.finished_at = time.time()
+
+    def retry(self):
+        """Fresh budget to redo this stage, limited to the time the stage has left"""
+        if self.deadline is None:
+            return DetectionBudget(self.stage, self.seconds, self.max_work, self.total, self.allocator)
+        return DetectionBudget(self.stage, max(0.0, self.deadline - time.time()), self.max_work, self.total)
+
+    def summary(self):
+        return {
+            'stage': self.stage,
+            'partial': self.exhausted,
+            'coverage': round(self.completed / self.total, 4) if self.total else 1.0,
+            'items_processed': self.completed,
+            'items_total': self.total,
+            'items_unit': self.unit,
+            **self.details,
+            'budget_seconds': round(self.seconds, 2) if self.seconds is not None else None,
+            'elapsed_seconds': round((self.finished_at or time.time()) - self.started_at, 2) if self.started_at else 0.0
+        }
+
+def allocate_stage_budget(stage, start_time, time_budget, remaining_stages, total=0):
+    """
+    Budget for a stage: when it starts it gets its share of the time left in the
+    run, so time unused by earlier stages rolls over to later ones
+    """
+    if time_budget is None:
+        return DetectionBudget(stage, total=total)
+
+    def allocator():
+        remaining = max(0.0, time_budget - (time.time() - start_time))
+        shares = sum(STAGE_BUDGET_SHARES[s] for s in remaining_stages)
+        return remaining * STAGE_BUDGET_SHARES[stage] / shares if shares else remaining
+
+    return DetectionBudget(stage, total=total, allocator=allocator)
 
 # ---------- Data Fetching from BitQuery ----------
 
-def fetch_token_transactions_from_bitquery(token_address, limit=10000):
+def fetch_token_transactions_from_bitquery(token_address, limit=10000, timeout=BITQUERY_TIMEOUT):
     """Fetch token transactions directly from BitQuery API (last 24 hours)"""
     print(f"📡 Fetching token transactions from BitQuery: {token_address}")
     
@@ -158,7 +459,7 @@ def fetch_token_transactions_from_bitquery(token_address, limit=10000):
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {BITQUERY_API_KEY}"
             },
-            timeout=45
+            timeout=timeout
         )
         
         if response.status_code != 200:
@@ -184,7 +485,6 @@ def fetch_token_transactions_from_bitquery(token_address, limit=10000):
                     'receiver': transfer["receiver"]["address"].lower(),
                     'amount': float(transfer["amount"]),
                     'timestamp': transfer["block"]["timestamp"]["time"],
-                    'parsed_time': parse_time(transfer["block"]["timestamp"]["time"]),
                     'currency': transfer["currency"].get("symbol", "TOKEN"),
                     'token_address': transfer["currency"].get("address", token_address),
                     'tx_hash': transfer["transaction"]["hash"],
@@ -194,7 +494,7 @@ def fetch_token_transactions_from_bitquery(token_address, limit=10000):
                 print(f"⚠️  Error parsing transfer: {e}")
                 continue
         
-        return transactions
+        return attach_parsed_times(transactions)
         
     except requests.exceptions.Timeout:
         print("❌ BitQuery API timeout")
@@ -204,70 +504,112 @@ def fetch_token_transactions_from_bitquery(token_address, limit=10000):
         traceback.print_exc()
         return []
 
-def import_transactions_to_neo4j(transactions, token_address):
-    """Import fetched transactions to Neo4j"""
+def ensure_wallet_constraint():
+    """Wallet.address uniqueness constraint (also the index MERGE/MATCH rely on)"""
+    try:
+        with driver.session() as session:
+            session.run("""
+                CREATE CONSTRAINT wallet_address_unique IF NOT EXISTS
+                FOR (w:Wallet) REQUIRE w.address IS UNIQUE
+            """).consume()
+    except Exception as e:
+        # e.g. a plain index on Wallet.address already exists
+        print(f"⚠️  Could not create Wallet.address constraint: {e}")
+
+def run_write_batches(query, rows, batch_size=NEO4J_IMPORT_BATCH_SIZE, workers=NEO4J_IMPORT_WORKERS,
+                      failures=None, **params):
+    """
+    Send rows through an UNWIND $batch query, one explicit (retried) write
+    transaction per batch, optionally spread over parallel sessions
+    Returns the number of rows written: the query's `written` column when it
+    returns one (e.g. RETURN count(r) AS written), else the rows of each batch
+    that went through
+    failures: optional list filled with (batch number, error) of failed batches
+    """
+    batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+    if failures is None:
+        failures = []
+    
+    def write_batch(batch):
+        with driver.session() as session:
+            record = session.execute_write(lambda tx: tx.run(query, batch=batch, **params).single())
+        if record is not None and 'written' in record.keys():
+            return record['written']
+        return len(batch)
+    
+    written = 0
+    if workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(write_batch, batch): n for n, batch in enumerate(batches, start=1)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    written += future.result()
+                except Exception as e:
+                    failures.append((futures[future], str(e)))
+                    print(f"  Error importing batch {futures[future]}: {e}")
+                print(f"  Imported batch {done}/{len(batches)}...")
+    else:
+        for n, batch in enumerate(batches, start=1):
+            try:
+                written += write_batch(batch)
+            except Exception as e:
+                failures.append((n, str(e)))
+                print(f"  Error importing batch {n}: {e}")
+            print(f"  Imported batch {n}/{len(batches)}...")
+    
+    return written
+
+def import_transactions_to_neo4j(transactions, token_address, batch_size=NEO4J_IMPORT_BATCH_SIZE,
+                                 workers=NEO4J_IMPORT_WORKERS):
+    """
+    Import fetched transactions to Neo4j with UNWIND batches
+    Wallets are merged first (each address once), then transfers are created
+    between them, batch_size rows per transaction on up to `workers` sessions
+    """
     if not transactions:
         print("⚠️  No transactions to import")
         return
     
     print(f"💾 Importing {len(transactions)} transactions to Neo4j...")
+    ensure_wallet_constraint()
     
-    imported_count = 0
-    with driver.session() as session:
-        for i, tx in enumerate(transactions):
-            try:
-                # Create sender wallet
-                session.run("""
-                    MERGE (s:Wallet {address: $sender})
-                    SET s.last_seen = $timestamp,
-                        s.updated_at = datetime()
-                """,
-                sender=tx['sender'],
-                timestamp=tx['timestamp']
-                )
-                
-                # Create receiver wallet
-                session.run("""
-                    MERGE (r:Wallet {address: $receiver})
-                    SET r.last_seen = $timestamp,
-                        r.updated_at = datetime()
-                """,
-                receiver=tx['receiver'],
-                timestamp=tx['timestamp']
-                )
-                
-                # Create transaction
-                session.run("""
-                    MATCH (s:Wallet {address: $sender})
-                    MATCH (r:Wallet {address: $receiver})
-                    CREATE (s)-[t:SENT]->(r)
-                    SET t.amount = $amount,
-                        t.time = $time,
-                        t.currency = $currency,
-                        t.token_address = $token_address,
-                        t.tx_hash = $tx_hash,
-                        t.block_height = $block_height,
-                        t.imported_at = datetime(),
-                        t.source = 'bitquery_live'
-                """, 
-                sender=tx['sender'],
-                receiver=tx['receiver'],
-                amount=tx['amount'],
-                time=tx['timestamp'],
-                currency=tx['currency'],
-                token_address=token_address,
-                tx_hash=tx.get('tx_hash', ''),
-                block_height=tx.get('block_height', 0)
-                )
-                
-                imported_count += 1
-                
-                if i % 500 == 0 and i > 0:
-                    print(f"  Imported {i}/{len(transactions)}...")
-                    
-            except Exception as e:
-                print(f"  Error importing transaction {i}: {e}")
-                continue
+    # Each wallet once, last_seen from its last transfer in the batch
+    wallet_last_seen = {}
+    for tx in transactions:
+        wallet_last_seen[tx['sender']] = tx['timestamp']
+        wallet_last_seen[tx['receiver']] = tx['timestamp']
+    
+    wallets = [{'address': address, 'timestamp': timestamp} for address, timestamp in wallet_last_seen.items()]
+    run_write_batches("""
+        UNWIND $batch AS w
+        MERGE (wallet:Wallet {address: w.address})
+        SET wallet.last_seen = w.timestamp,
+            wallet.updated_at = datetime()
+    """, wallets, batch_size=batch_size, workers=workers)
+    
+    transfers = [{
+        'sender': tx['sender'],
+        'receiver': tx['receiver'],
+        'amount': tx['amount'],
+        'time': tx['timestamp'],
+        'currency': tx['currency'],
+        'tx_hash': tx.get('tx_hash', ''),
+        'block_height': tx.get('block_height', 0)
+    } for tx in transactions]
+    imported_count = run_write_batches("""
+        UNWIND $batch AS tx
+        MATCH (s:Wallet {address: tx.sender})
+        MATCH (r:Wallet {address: tx.receiver})
+        CREATE (s)-[t:SENT]->(r)
+        SET t.amount = tx.amount,
+            t.time = tx.time,
+            t.currency = tx.currency,
+            t.token_address = $token_address,
+            t.tx_hash = tx.tx_hash,
+            t.block_height = tx.block_height,
+            t.imported_at = datetime(),
+            t.source = 'bitquery_live'
+    """, transfers, batch_size=batch_size, workers=workers, token_address=token_address)
     
     print(f"✅ Successfully imported {imported_count} transactions to Neo4j")
 
@@ -303,7 +645,6 @@ def load_transactions_for_token(token_address, limit=10000):
                     'receiver': rec['receiver'].lower(),
                     'amount': float(rec['amount']) if rec['amount'] else 0.0,
                     'timestamp': rec['timestamp'],
-                    'parsed_time': parse_time(rec['timestamp']),
                     'currency': rec['currency'],
                     'token_address': rec['token_address']
                 })
@@ -315,19 +656,444 @@ def load_transactions_for_token(token_address, limit=10000):
         print(f"❌ Error loading transactions: {e}")
         traceback.print_exc()
     
-    return rows
+    return attach_parsed_times(rows)
+
+def load_transactions_for_tokens(token_addresses, limit=10000):
+    """
+    load_transactions_for_token for many tokens in one query (latest `limit`
+    transfers of each); returns {token_address (lowercase): rows}
+    """
+    tokens = [token.lower() for token in token_addresses]
+    rows_by_token = {token: [] for token in tokens}
+    
+    q = """
+    UNWIND $tokens AS token
+    CALL {
+        WITH token
+        MATCH (s:Wallet)-[t:SENT]->(r:Wallet)
+        WHERE t.token_address = token
+        RETURN s.address AS sender, r.address AS receiver,
+               t.amount AS amount, t.time AS timestamp,
+               COALESCE(t.currency, 'TOKEN') AS currency,
+               t.token_address AS token_address
+        ORDER BY t.time DESC
+        LIMIT $limit
+    }
+    RETURN token, sender, receiver, amount, timestamp, currency, token_address
+    """
+    
+    try:
+        with driver.session() as session:
+            print(f"🔍 Querying Neo4j for {len(tokens)} tokens")
+            for rec in session.run(q, tokens=tokens, limit=limit):
+                rows_by_token[rec['token']].append({
+                    'sender': rec['sender'].lower(),
+                    'receiver': rec['receiver'].lower(),
+                    'amount': float(rec['amount']) if rec['amount'] else 0.0,
+                    'timestamp': rec['timestamp'],
+                    'currency': rec['currency'],
+                    'token_address': rec['token_address']
+                })
+        
+        # One timestamp parse for every token's rows
+        attach_parsed_times([tx for rows in rows_by_token.values() for tx in rows])
+        print(f"📊 Loaded {sum(len(rows) for rows in rows_by_token.values())} transactions for {len(tokens)} tokens")
+    except Exception as e:
+        print(f"❌ Error loading transactions: {e}")
+        traceback.print_exc()
+    
+    return rows_by_token
+
+# ---------- Transfer Storage ----------
+
+class Neo4jTransferStore:
+    """Transfers cached in Neo4j as (:Wallet)-[:SENT]->(:Wallet)"""
+    name = 'neo4j'
+    persists_provenance = True
+
+    def load(self, token_address, limit=10000):
+        return load_transactions_for_token(token_address, limit=limit)
+
+    def load_many(self, token_addresses, limit=10000):
+        return load_transactions_for_tokens(token_addresses, limit=limit)
+
+    def save(self, transactions, token_address):
+        import_transactions_to_neo4j(transactions, token_address)
+
+class SQLiteTransferStore:
+    """
+    Embedded transfer store, no external database: one SQLite file per token,
+    one table per day (transfers_YYYYMMDD) indexed on (token_address, block_height),
+    plus a partitions catalog. Loads read the newest days first until the limit.
+    """
+    name = 'sqlite'
+    persists_provenance = False
+    COLUMNS = ['sender', 'receiver', 'amount', 'timestamp', 'currency', 'token_address', 'tx_hash', 'block_height']
+
+    def __init__(self, directory=SQLITE_STORE_DIR):
+        self.directory = directory
+
+    def path(self, token_address):
+        return os.path.join(self.directory, f"{token_address.lower()}.sqlite")
+
+    def connect(self, token_address):
+        os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(self.path(token_address))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS partitions (day TEXT PRIMARY KEY, row_count INTEGER NOT NULL)")
+        return conn
+
+    @staticmethod
+    def partition_day(timestamp):
+        """YYYYMMDD of a transfer timestamp ('unknown' when it has no date)"""
+        day = str(timestamp or '')[:10].replace('-', '')
+        return day if len(day) == 8 and day.isdigit() else 'unknown'
+
+    def save(self, transactions, token_address):
+        if not transactions:
+            print("⚠️  No transactions to store")
+            return
+        
+        token = token_address.lower()
+        by_day = defaultdict(list)
+        for tx in transactions:
+            by_day[self.partition_day(tx['timestamp'])].append((
+                tx['sender'], tx['receiver'], tx['amount'], str(tx['timestamp']), tx['currency'],
+                token, tx.get('tx_hash', ''), tx.get('block_height', 0) or 0
+            ))
+        
+        conn = self.connect(token_address)
+        try:
+            with conn:
+                for day, rows in by_day.items():
+                    table = f"transfers_{day}"
+                    conn.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {table} (
+                            sender TEXT NOT NULL,
+                            receiver TEXT NOT NULL,
+                            amount REAL,
+                            timestamp TEXT,
+                            currency TEXT,
+                            token_address TEXT NOT NULL,
+                            tx_hash TEXT,
+                            block_height INTEGER
+                        )
+                    """)
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_block ON {table} (token_address, block_height)")
+                    conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    conn.execute("""
+                        INSERT INTO partitions (day, row_count) VALUES (?, ?)
+                        ON CONFLICT(day) DO UPDATE SET row_count = row_count + excluded.row_count
+                    """, (day, len(rows)))
+            print(f"✅ Stored {len(transactions)} transactions in {len(by_day)} day partitions ({self.path(token_address)})")
+        finally:
+            conn.close()
+
+    def load(self, token_address, limit=10000):
+        """Latest `limit` transfers, newest first (same shape as load_transactions_for_token)"""
+        if not os.path.exists(self.path(token_address)):
+            return []
+        
+        token = token_address.lower()
+        rows = []
+        conn = self.connect(token_address)
+        try:
+            days = [day for (day,) in conn.execute("SELECT day FROM partitions ORDER BY day DESC")]
+            for day in days:
+                remaining = limit - len(rows)
+                if remaining <= 0:
+                    break
+                rows.extend(conn.execute(f"""
+                    SELECT {', '.join(self.COLUMNS)} FROM transfers_{day}
+                    WHERE token_address = ?
+                    ORDER BY block_height DESC, timestamp DESC
+                    LIMIT ?
+                """, (token, remaining)).fetchall())
+        finally:
+            conn.close()
+        
+        transactions = [{
+            'sender': sender,
+            'receiver': receiver,
+            'amount': float(amount) if amount else 0.0,
+            'timestamp': timestamp,
+            'currency': currency,
+            'token_address': token_address_col,
+            'tx_hash': tx_hash,
+            'block_height': block_height
+        } for sender, receiver, amount, timestamp, currency, token_address_col, tx_hash, block_height in rows]
+        
+        print(f"📊 Loaded {len(transactions)} transactions for token {token_address} from {self.path(token_address)}")
+        return attach_parsed_times(transactions)
+
+    def load_many(self, token_addresses, limit=10000):
+        """{token_address (lowercase): rows}; one file per token, so one read each"""
+        return {token.lower(): self.load(token, limit=limit) for token in token_addresses}
+
+TRANSFER_STORES = {
+    'neo4j': Neo4jTransferStore,
+    'sqlite': SQLiteTransferStore
+}
+
+def get_transfer_store(backend=None):
+    """Storage backend for transfers, TRANSFER_STORE_BACKEND by default"""
+    backend = backend or TRANSFER_STORE_BACKEND
+    if backend not in TRANSFER_STORES:
+        raise ValueError(f"Unknown transfer store backend: {backend}")
+    return TRANSFER_STORES[backend]()
+
+# ---------- Address Registry ----------
+
+class AddressRegistry:
+    """
+    Labeled address list (mixers, sanctioned wallets, ...) kept as a sorted
+    array of packed 20-byte addresses: membership is a binary search, so
+    hundreds of thousands of labels cost a few MB and no per-lookup hashing
+    of hex strings.
+    """
+    def __init__(self, keys, label_ids, category_ids, labels, categories, sanctioned=None):
+        self.keys = keys  # sorted 'S20'
+        self.label_ids = label_ids
+        self.category_ids = category_ids
+        self.labels = labels
+        self.categories = categories
+        # Listed on any sanctions list, whatever the primary category
+        self.sanctioned = sanctioned if sanctioned is not None else np.zeros(len(keys), dtype=bool)
+
+    @staticmethod
+    def pack(address):
+        """20-byte key of a 0x address (None if it is not one)"""
+        try:
+            key = bytes.fromhex(address[2:] if address[:2].lower() == '0x' else address)
+        except (TypeError, ValueError):
+            return None
+        return key if len(key) == 20 else None
+
+    @staticmethod
+    def normalize_category(category):
+        """Lower-cased category; every sanctions list spelling becomes 'sanctioned'"""
+        category = (category or '').strip().lower()
+        if category in SANCTIONS_CATEGORIES or category.startswith('sanction'):
+            return 'sanctioned'
+        return category
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Build from (address, label, category) tuples. The first non-sanctions
+        label of an address is its primary label; a sanctions entry anywhere
+        sets its sanctioned flag
+        """
+        labels, label_index = [], {}
+        categories, category_index = [], {}
+        keys, label_ids, category_ids, sanctions = [], [], [], []
+        for address, label, category in entries:
+            key = cls.pack(address)
+            if key is None:
+                continue
+            category = cls.normalize_category(category)
+            if label not in label_index:
+                label_index[label] = len(labels)
+                labels.append(label)
+            if category not in category_index:
+                category_index[category] = len(categories)
+                categories.append(category)
+            keys.append(key)
+            label_ids.append(label_index[label])
+            category_ids.append(category_index[category])
+            sanctions.append(category == 'sanctioned')
+        
+        keys = np.array(keys, dtype='S20')
+        label_ids = np.array(label_ids, dtype=np.int32)
+        category_ids = np.array(category_ids, dtype=np.int32)
+        sanctions = np.array(sanctions, dtype=bool)
+        
+        # Sanctions entries after the others (stable), then by address: the
+        # first entry of each address is its primary label
+        order = np.argsort(sanctions, kind='stable')
+        order = order[np.argsort(keys[order], kind='stable')]
+        keys, label_ids, category_ids, sanctions = keys[order], label_ids[order], category_ids[order], sanctions[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(first)
+        sanctioned = np.logical_or.reduceat(sanctions, starts) if len(starts) else sanctions
+        return cls(keys[first], label_ids[first], category_ids[first], labels, categories, sanctioned)
+
+    @staticmethod
+    def source_files(directory):
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+                if os.path.splitext(filename)[1] in ('.csv', '.txt')]
+
+    @classmethod
+    def source_signature(cls, directory):
+        """Changes whenever a label file (or KNOWN_MIXER_ADDRESSES / KNOWN_HUB_ADDRESSES) changes"""
+        digest = hashlib.sha1(json.dumps([sorted(KNOWN_MIXER_ADDRESSES.items()),
+                                          sorted(KNOWN_HUB_ADDRESSES.items()),
+                                          SANCTIONS_CATEGORIES]).encode())
+        for path in cls.source_files(directory):
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def read_entries(cls, directory):
+        """
+        KNOWN_MIXER_ADDRESSES and KNOWN_HUB_ADDRESSES plus every label file in
+        `directory`: *.csv with an address,label[,category] header, or *.txt with
+        one address per line (category = file name, label = file name)
+        """
+        entries = [(address, label, 'mixer') for address, label in KNOWN_MIXER_ADDRESSES.items()]
+        entries.extend((address, label, category) for address, (label, category) in KNOWN_HUB_ADDRESSES.items())
+        for path in cls.source_files(directory):
+            stem, extension = os.path.splitext(os.path.basename(path))
+            try:
+                with open(path, newline='') as f:
+                    if extension == '.csv':
+                        rows = csv.reader(f)
+                        header = [column.strip().lower() for column in next(rows, [])]
+                        address_col = header.index('address')
+                        label_col = header.index('label') if 'label' in header else None
+                        category_col = header.index('category') if 'category' in header else None
+                        for row in rows:
+                            if len(row) <= address_col:
+                                continue
+                            label = row[label_col].strip() if label_col is not None and label_col < len(row) else ''
+                            category = row[category_col] if category_col is not None and category_col < len(row) else ''
+                            entries.append((row[address_col].strip(), label or stem, category.strip() or stem))
+                    else:
+                        for line in f:
+                            line = line.strip()
+                            if line and not line.startswith('#'):
+                                entries.append((line, stem, stem))
+            except Exception as e:
+                print(f"⚠️  Could not read address registry file {path}: {e}")
+        return entries
+
+    @classmethod
+    def load(cls, directory=ADDRESS_REGISTRY_DIR):
+        """
+        Registry from the label files in `directory`, compiled once into
+        <directory>.npz and reused until the files change
+        """
+        compiled = f"{directory.rstrip(os.sep)}.npz"
+        signature = cls.source_signature(directory)
+        
+        registry = None
+        if os.path.exists(compiled):
+            try:
+                with np.load(compiled) as data:
+                    if str(data['signature']) == signature:
+                        registry = cls(data['keys'], data['label_ids'], data['category_ids'],
+                                       data['labels'].tolist(), data['categories'].tolist(),
+                                       data['sanctioned'])
+            except Exception as e:
+                print(f"⚠️  Could not load compiled address registry {compiled}: {e}")
+        
+        if registry is None:
+            registry = cls.from_entries(cls.read_entries(directory))
+            if cls.source_files(directory):
+                try:
+                    np.savez(compiled, keys=registry.keys, label_ids=registry.label_ids,
+                             category_ids=registry.category_ids, sanctioned=registry.sanctioned,
+                             labels=np.array(registry.labels),
+                             categories=np.array(registry.categories), signature=np.array(signature))
+                except Exception as e:
+                    print(f"⚠️  Could not save compiled address registry {compiled}: {e}")
+        
+        print(f"📇 Address registry: {len(registry)} labeled addresses ({', '.join(registry.categories)})")
+        return registry
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, addresses):
+        """Registry position of each address (-1 if not listed), one searchsorted for all"""
+        positions = np.full(len(addresses), -1, dtype=np.int64)
+        packed = [self.pack(address) for address in addresses]
+        valid = np.array([key is not None for key in packed], dtype=bool)
+        if not len(self.keys) or not valid.any():
+            return positions
+        
+        keys = np.array([key for key in packed if key is not None], dtype='S20')
+        slots = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        hits = self.keys[slots] == keys
+        positions[np.flatnonzero(valid)[hits]] = slots[hits]
+        return positions
+
+    def category_mask(self, positions, category):
+        """Boolean column: listed under `category` (positions from find)"""
+        if category not in self.categories:
+            return np.zeros(len(positions), dtype=bool)
+        listed = positions >= 0
+        mask = np.zeros(len(positions), dtype=bool)
+        mask[listed] = self.category_ids[positions[listed]] == self.categories.index(category)
+        return mask
+
+    def categories_mask(self, positions, categories):
+        """Boolean column: listed under any of `categories`"""
+        mask = np.zeros(len(positions), dtype=bool)
+        for category in categories:
+            mask |= self.category_mask(positions, category)
+        return mask
+
+    def sanctioned_mask(self, positions):
+        """Boolean column: listed on a sanctions list (positions from find)"""
+        listed = positions >= 0
+        mask = np.zeros(len(positions), dtype=bool)
+        mask[listed] = self.sanctioned[positions[listed]]
+        return mask
+
+    def mixer_types(self, positions):
+        """Label of each position listed as a mixer, None otherwise (positions from find)"""
+        mixers = self.category_mask(positions, 'mixer')
+        return [self.labels[self.label_ids[p]] if mixer else None
+                for p, mixer in zip(positions.tolist(), mixers.tolist())]
+
+    def is_sanctioned(self, address):
+        """Whether one address is on a sanctions list"""
+        position = self.find([address])[0]
+        return bool(position >= 0 and self.sanctioned[position])
+
+    def lookup(self, address):
+        """(label, category) of one address, or None"""
+        position = self.find([address])[0]
+        if position < 0:
+            return None
+        return self.labels[self.label_ids[position]], self.categories[self.category_ids[position]]
+
+def get_address_registry():
+    """Registry loaded from ADDRESS_REGISTRY_DIR on first use"""
+    global address_registry
+    if address_registry is None:
+        address_registry = AddressRegistry.load()
+    return address_registry
 
 def detect_direct_mixer_addresses(address):
     """Check if address is a known mixer (direct detection)"""
-    address_lower = address.lower()
-    if address_lower in KNOWN_MIXER_ADDRESSES:
-        return {
+    registry = get_address_registry()
+    entry = registry.lookup(address)
+    if entry and entry[1] == 'mixer':
+        result = {
             'is_mixer': True,
-            'mixer_type': KNOWN_MIXER_ADDRESSES[address_lower],
+            'mixer_type': entry[0],
             'confidence': 1.0,
             'detection_method': 'known_address'
         }
-    return {'is_mixer': False, 'confidence': 0.0}
+    else:
+        result = {'is_mixer': False, 'confidence': 0.0}
+        if entry:
+            result['registry_label'], result['registry_category'] = entry
+    if entry and registry.is_sanctioned(address):
+        result['sanctioned'] = True
+    return result
+
+def known_mixer_type(candidate):
+    """Registry label of a mixer candidate flagged as a known mixer (None for behavioral detections)"""
+    reasoning = (candidate or {}).get('reasoning', {})
+    return reasoning.get('mixer_type') if reasoning.get('flags', {}).get('known_mixer') else None
 
 # ---------- Core Behavioral Heuristics ----------
 
@@ -349,27 +1115,60 @@ def calculate_fan_out_score(G, node):
     except:
         return 0.0, 0
 
+def denomination_table(currency):
+    """Pool denominations for an asset symbol (DEFAULT_DENOMINATION_ASSET if unknown)"""
+    symbol = str(currency or '').upper()
+    symbol = DENOMINATION_ASSET_ALIASES.get(symbol, symbol)
+    return DENOMINATION_TABLES.get(symbol, DENOMINATION_TABLES[DEFAULT_DENOMINATION_ASSET])
+
+def match_denominations(amounts, currencies=None):
+    """
+    Pool denomination each amount matches within DENOMINATION_TOLERANCE (NaN if none)
+    One searchsorted per asset against the sorted lower bounds of its table, so
+    the cost barely depends on how many denominations the tables hold
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    matched = np.full(len(amounts), np.nan)
+    
+    if currencies is None:
+        groups = [(None, np.arange(len(amounts)))]
+    else:
+        symbols, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        groups = [(symbol, np.flatnonzero(inverse == k)) for k, symbol in enumerate(symbols)]
+    
+    for currency, positions in groups:
+        denoms = np.array(sorted(denomination_table(currency)), dtype=np.float64)
+        if not len(denoms) or not len(positions):
+            continue
+        lows = denoms * (1 - DENOMINATION_TOLERANCE)
+        highs = denoms * (1 + DENOMINATION_TOLERANCE)
+        
+        values = amounts[positions]
+        slot = np.maximum(np.searchsorted(lows, values, side='right') - 1, 0)
+        hit = (values > lows[slot]) & (values < highs[slot])
+        matched[positions[hit]] = denoms[slot[hit]]
+    
+    return matched
+
 def calculate_uniform_denominations_score(G, node):
     """
     Uniform withdrawal denominations heuristic (10% weight)
     Detects Tornado Cash patterns - USE CASE ALIGNED
     """
     try:
-        out_amounts = [data.get('amount', 0) for _, _, data in G.out_edges(node, data=True)]
+        out_edges = [data for _, _, data in G.out_edges(node, data=True)]
+        out_amounts = [data.get('amount', 0) for data in out_edges]
         
         if len(out_amounts) < 3:
             return 0.0, []
         
-        # Check for exact Tornado denominations
-        tornado_matches = []
-        for amount in out_amounts:
-            for denom in TORNADO_DENOMINATIONS:
-                if abs(amount - denom) / denom < 0.01:  # 1% tolerance
-                    tornado_matches.append((amount, denom))
-                    break
+        # Check for pool denominations of the transferred asset
+        matched = match_denominations(out_amounts, [data.get('currency') for data in out_edges])
+        tornado_matches = [(amount, float(denom)) for amount, denom in zip(out_amounts, matched) if not np.isnan(denom)]
         
-        # Check for uniform amounts (not necessarily Tornado)
-        unique_amounts = Counter(out_amounts)
+        # Check for uniform amounts (not necessarily Tornado); amounts within
+        # tolerance of the same denomination count as one amount
+        unique_amounts = Counter(amount if np.isnan(denom) else float(denom) for amount, denom in zip(out_amounts, matched))
         most_common_count = unique_amounts.most_common(1)[0][1] if unique_amounts else 0
         uniformity = most_common_count / len(out_amounts)
         
@@ -388,50 +1187,36 @@ def calculate_temporal_randomness_score(G, node):
     Mixers have bursty, irregular timing - USE CASE ALIGNED
     """
     try:
-        times = []
-        
         # Collect all transaction times
-        for _, _, data in G.in_edges(node, data=True):
-            if data.get('parsed_time'):
-                times.append(data['parsed_time'])
-        
-        for _, _, data in G.out_edges(node, data=True):
-            if data.get('parsed_time'):
-                times.append(data['parsed_time'])
+        times = [data['time_us'] for _, _, data in G.in_edges(node, data=True) if data.get('time_us') is not None]
+        times += [data['time_us'] for _, _, data in G.out_edges(node, data=True) if data.get('time_us') is not None]
         
         if len(times) < 5:
             return 0.0, {"error": "insufficient_data"}
         
-        # Sort times
-        times.sort()
-        
-        # Calculate inter-arrival times
-        intervals = []
-        for i in range(1, len(times)):
-            delta = (times[i] - times[i-1]).total_seconds()
-            intervals.append(delta)
+        # Inter-arrival times in seconds
+        stamps = np.sort(np.array(times, dtype=np.int64))
+        intervals = np.diff(stamps) / 1e6
         
         # Calculate randomness metrics
-        if intervals:
+        mean_interval = float(intervals.mean())
+        if mean_interval > 0:
             # Coefficient of variation (higher = more random/bursty)
-            mean_interval = statistics.mean(intervals) if intervals else 0
-            if mean_interval > 0:
-                stdev = statistics.stdev(intervals) if len(intervals) > 1 else 0
-                cv = stdev / mean_interval if mean_interval > 0 else 0
-                # Normalize to 0-1 (mixers have high CV)
-                score = min(1.0, cv / 10.0)
-                
-                # Check for burstiness: many transactions in short time
-                short_intervals = [i for i in intervals if i < 60]  # < 1 minute
-                burst_score = len(short_intervals) / len(intervals) if intervals else 0
-                
-                final_score = max(score, burst_score)
-                return final_score, {
-                    'cv': cv,
-                    'burst_score': burst_score,
-                    'avg_interval': mean_interval,
-                    'short_intervals': len(short_intervals)
-                }
+            cv = float(intervals.std(ddof=1)) / mean_interval
+            # Normalize to 0-1 (mixers have high CV)
+            score = min(1.0, cv / 10.0)
+            
+            # Check for burstiness: many transactions in short time
+            short_intervals = int(np.count_nonzero(intervals < 60))  # < 1 minute
+            burst_score = short_intervals / len(intervals)
+            
+            final_score = max(score, burst_score)
+            return final_score, {
+                'cv': cv,
+                'burst_score': burst_score,
+                'avg_interval': mean_interval,
+                'short_intervals': short_intervals
+            }
         
         return 0.0, {"error": "no_intervals"}
     except Exception as e:
@@ -538,6 +1323,289 @@ def detect_mixer_behavior(G, node):
         print(f"Error detecting mixer behavior for {node}: {e}")
         return 0.0, {"error": str(e)}
 
+# ---------- Batch Heuristic Engine ----------
+
+HEURISTIC_NAMES = ['fan_in', 'fan_out', 'uniform_denominations', 'temporal_randomness']
+# Raw per-node measurements the heuristic scores are derived from
+FEATURE_NAMES = ['fan_in', 'fan_out', 'uniformity', 'tornado_share', 'temporal_cv', 'burst_share', 'tornado_matches']
+# Edge 'time_us' placeholder for untimed edges (the int64 view of NaT)
+MISSING_TIME_US = np.iinfo(np.int64).min
+
+def build_edge_arrays(G):
+    """
+    Flatten the transaction graph into parallel numpy arrays (one entry per edge)
+    so heuristics can be computed for every node at once
+    """
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    
+    src, dst, amounts, currencies, times = [], [], [], [], []
+    for s, neighbors in G.adj.items():
+        i = index[s]
+        for r, data in neighbors.items():
+            src.append(i)
+            dst.append(index[r])
+            amounts.append(data.get('amount', 0))
+            currencies.append(data.get('currency') or '')
+            time_us = data.get('time_us')
+            times.append(MISSING_TIME_US if time_us is None else time_us)
+    
+    # Edge times as integer microseconds from the earliest one: differences are
+    # exact, like subtracting the datetimes themselves
+    time_us = np.array(times, dtype=np.int64)
+    has_time = time_us != MISSING_TIME_US
+    if has_time.any():
+        time_us[has_time] -= time_us[has_time].min()
+    time_us[~has_time] = 0
+    
+    return {
+        'nodes': nodes,
+        'index': index,
+        'src': np.array(src, dtype=np.int64),
+        'dst': np.array(dst, dtype=np.int64),
+        'amounts': np.array(amounts, dtype=np.float64),
+        'currencies': np.array(currencies, dtype=str),
+        'has_time': has_time,
+        'time_us': time_us
+    }
+
+def calculate_denomination_features_batch(src, amounts, out_degree, currencies=None):
+    """
+    Uniform denomination features for every node from its outgoing edge amounts
+    Returns (uniformity, tornado share, tornado match counts), all 0 for nodes
+    with fewer than 3 outgoing edges; the score is max(uniformity, tornado share)
+    """
+    n = len(out_degree)
+    uniformity = np.zeros(n)
+    tornado_share = np.zeros(n)
+    
+    # Edges matching a pool denomination of their asset, summed per sender
+    matched = match_denominations(amounts, currencies)
+    is_tornado = ~np.isnan(matched)
+    tornado_counts = np.bincount(src[is_tornado], minlength=n)
+    
+    # Longest run of identical amounts per sender = most common amount count
+    # (matched amounts grouped under their denomination)
+    amounts = np.where(is_tornado, matched, amounts)
+    most_common = np.zeros(n, dtype=np.int64)
+    if len(src):
+        order = np.lexsort((amounts, src))
+        s, a = src[order], amounts[order]
+        run_start = np.ones(len(s), dtype=bool)
+        run_start[1:] = (s[1:] != s[:-1]) | (a[1:] != a[:-1])
+        run_lengths = np.diff(np.append(np.flatnonzero(run_start), len(s)))
+        np.maximum.at(most_common, s[run_start], run_lengths)
+    
+    eligible = out_degree >= 3
+    uniformity[eligible] = most_common[eligible] / out_degree[eligible]
+    tornado_share[eligible] = tornado_counts[eligible] / out_degree[eligible]
+    tornado_counts[~eligible] = 0
+    
+    return uniformity, tornado_share, tornado_counts
+
+def calculate_temporal_features_batch(src, dst, has_time, time_us, n):
+    """
+    Temporal randomness features for every node from the times of all its edges
+    (incoming and outgoing): coefficient of variation of the gaps and share of
+    gaps under a minute, both 0 for nodes with fewer than 5 timestamps; the score
+    is max(CV / 10, burst share)
+    """
+    cv = np.zeros(n)
+    burst_share = np.zeros(n)
+    
+    # One (node, time) entry per edge endpoint
+    owners = np.concatenate([dst[has_time], src[has_time]])
+    stamps = np.concatenate([time_us[has_time], time_us[has_time]])
+    counts = np.bincount(owners, minlength=n)
+    
+    order = np.lexsort((stamps, owners))
+    owners, stamps = owners[order], stamps[order]
+    
+    # Inter-arrival gaps within each node's sorted timeline
+    same_owner = owners[1:] == owners[:-1]
+    gap_owner = owners[1:][same_owner]
+    gaps = np.diff(stamps)[same_owner] / 1e6
+    
+    n_gaps = np.bincount(gap_owner, minlength=n)
+    gap_sum = np.bincount(gap_owner, weights=gaps, minlength=n)
+    mean_gap = np.divide(gap_sum, n_gaps, out=np.zeros(n), where=n_gaps > 0)
+    
+    squared_dev = np.bincount(gap_owner, weights=(gaps - mean_gap[gap_owner]) ** 2, minlength=n)
+    stdev = np.sqrt(np.divide(squared_dev, n_gaps - 1, out=np.zeros(n), where=n_gaps > 1))
+    
+    short_gaps = np.bincount(gap_owner[gaps < 60], minlength=n)
+    
+    eligible = (counts >= 5) & (mean_gap > 0)
+    cv[eligible] = stdev[eligible] / mean_gap[eligible]
+    burst_share[eligible] = short_gaps[eligible] / n_gaps[eligible]
+    
+    return cv, burst_share
+
+def heuristic_score_matrix(features):
+    """Per-node heuristic scores (columns = HEURISTIC_NAMES) from raw features (columns = FEATURE_NAMES)"""
+    column = {name: features[:, i] for i, name in enumerate(FEATURE_NAMES)}
+    return np.column_stack([
+        np.minimum(1.0, column['fan_in'] / 100.0),
+        np.minimum(1.0, column['fan_out'] / 100.0),
+        np.maximum(column['uniformity'], column['tornado_share']),
+        np.maximum(np.minimum(1.0, column['temporal_cv'] / 10.0), column['burst_share'])
+    ])
+
+def weighted_heuristic_score(score_matrix, weights):
+    """
+    Weighted sum of the heuristic score columns, accumulated column by column in
+    HEURISTIC_NAMES order (the order detect_mixer_behavior adds them in), so every
+    path produces bit-identical scores
+    """
+    weighted = np.zeros(len(score_matrix))
+    for column, name in enumerate(HEURISTIC_NAMES):
+        weighted += weights[name] * score_matrix[:, column]
+    return weighted
+
+def classify_hubs(degree, registry_hubs=None, exempt=None, percentile=HUB_DEGREE_PERCENTILE,
+                  min_degree=HUB_MIN_DEGREE):
+    """
+    Super-node mask: registry hubs, plus wallets whose degree reaches both the
+    graph's degree percentile and min_degree (exempt wallets are never degree hubs)
+    Returns (mask, degree threshold used)
+    """
+    hubs = np.zeros(len(degree), dtype=bool) if registry_hubs is None else registry_hubs.copy()
+    threshold = float(min_degree)
+    if len(degree):
+        threshold = max(threshold, float(np.percentile(degree, percentile)))
+        by_degree = degree >= threshold
+        if exempt is not None:
+            by_degree &= ~exempt
+        hubs |= by_degree
+    return hubs, threshold
+
+def heuristic_features(src, dst, amounts, currencies, has_time, time_us, n):
+    """
+    Raw feature matrix (columns = FEATURE_NAMES) for n nodes from their edges.
+    Every feature depends only on a node's own edges, so any edge subset closed
+    over its nodes (a union of components) gives the same rows.
+    """
+    fan_in = np.bincount(dst, minlength=n)
+    fan_out = np.bincount(src, minlength=n)
+    
+    uniformity, tornado_share, tornado_counts = calculate_denomination_features_batch(
+        src, amounts, fan_out, currencies)
+    temporal_cv, burst_share = calculate_temporal_features_batch(src, dst, has_time, time_us, n)
+    return np.column_stack([fan_in, fan_out, uniformity, tornado_share, temporal_cv, burst_share,
+                            tornado_counts]).astype(np.float64)
+
+def calculate_mixer_scores_batch(G, edge_arrays=None, registry_memo=None):
+    """
+    Vectorized detect_mixer_behavior for the whole graph
+    Returns a dict with the raw feature matrix (columns = FEATURE_NAMES), the
+    per-node score matrix (columns = HEURISTIC_NAMES),
+    the weighted 45/45/5/5 score (with Tornado boost and known-mixer override),
+    the raw fan-in/fan-out/Tornado counts and the hub mask (hubs score 0)
+    registry_memo: optional {address: registry position} shared across graphs
+    (multi-token batches), filled in for addresses it does not have yet
+    """
+    arrays = edge_arrays or build_edge_arrays(G)
+    nodes = arrays['nodes']
+    n = len(nodes)
+    
+    features = None
+    if COMPONENT_WORKERS > 1 and len(arrays['src']) >= COMPONENT_PARALLEL_MIN_EDGES:
+        try:
+            features = heuristic_features_by_component(G, arrays)
+        except Exception as e:
+            print(f"⚠️ Per-component scoring failed ({type(e).__name__}: {e}), scoring in-process")
+    if features is None:
+        features = heuristic_features(arrays['src'], arrays['dst'], arrays['amounts'], arrays['currencies'],
+                                      arrays['has_time'], arrays['time_us'], n)
+    fan_in = features[:, 0].astype(np.int64)
+    fan_out = features[:, 1].astype(np.int64)
+    tornado_counts = features[:, 6].astype(np.int64)
+    score_matrix = heuristic_score_matrix(features)
+    weighted = weighted_heuristic_score(score_matrix, WEIGHTS)
+    
+    # Boost score if Tornado denominations detected
+    boosted = tornado_counts > 0
+    weighted[boosted] = np.minimum(1.0, weighted[boosted] + 0.2)
+    
+    # Skip nodes with insufficient activity
+    active = (fan_in + fan_out) >= MIN_TX_COUNT
+    weighted[~active] = 0.0
+    
+    # Registry membership resolved once per node
+    registry = get_address_registry()
+    if registry_memo is None:
+        registry_positions = registry.find(nodes)
+    else:
+        missing = [node for node in nodes if node not in registry_memo]
+        if missing:
+            registry_memo.update(zip(missing, registry.find(missing).tolist()))
+        registry_positions = np.array([registry_memo[node] for node in nodes], dtype=np.int64)
+    known = registry.category_mask(registry_positions, 'mixer')
+    score_matrix[known] = 1.0
+    weighted[known] = 1.0
+    
+    # Exchanges and routers saturate fan-in/fan-out: they are traversal
+    # endpoints, not mixer candidates
+    registry_hubs = registry.categories_mask(registry_positions, HUB_CATEGORIES)
+    pool_like = score_matrix[:, 2] >= HUB_DENOMINATION_EXEMPTION
+    hubs, hub_threshold = classify_hubs(fan_in + fan_out, registry_hubs, exempt=known | pool_like)
+    hubs &= ~known
+    weighted[hubs] = 0.0
+    
+    return {
+        'nodes': nodes,
+        'index': arrays['index'],
+        'heuristics': HEURISTIC_NAMES,
+        'features': features,
+        'score_matrix': score_matrix,
+        'weighted_scores': weighted,
+        'fan_in': fan_in,
+        'fan_out': fan_out,
+        'tornado_matches': tornado_counts,
+        'known_mixers': known,
+        'sanctioned': registry.sanctioned_mask(registry_positions),
+        'hubs': hubs,
+        'registry_hubs': registry_hubs & hubs,
+        'hub_degree_threshold': hub_threshold
+    }
+
+class MixerScoreCache:
+    """
+    Per-graph memo of detect_mixer_behavior results, so provenance tracing scores
+    each wallet once instead of once per visit.
+    With batch scores, nodes below the threshold are answered from the batch
+    without building their reasoning.
+    """
+    def __init__(self, G, batch_scores=None):
+        self.G = G
+        self.batch_scores = batch_scores
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def seed(self, node, score, reasoning):
+        self.results[node] = (score, reasoning)
+
+    def get(self, node):
+        """Returns (score, reasoning) like detect_mixer_behavior"""
+        cached = self.results.get(node)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        
+        self.misses += 1
+        batch = self.batch_scores
+        i = batch['index'].get(node) if batch is not None else None
+        if i is not None and batch['hubs'][i]:
+            result = (0.0, {"reason": "hub"})
+        elif i is not None and batch['weighted_scores'][i] < MIXER_SCORE_THRESHOLD:
+            result = (float(batch['weighted_scores'][i]), {"reason": "below_threshold"})
+        else:
+            result = detect_mixer_behavior(self.G, node)
+        
+        self.results[node] = result
+        return result
+
 # ---------- Enhanced Detailed Reporting Functions ----------
 
 def generate_mixer_detailed_report(G, mixer_candidates):
@@ -549,11 +1617,7 @@ def generate_mixer_detailed_report(G, mixer_candidates):
         score = data['score']
         
         # Check if known mixer
-        known_mixer = detect_direct_mixer_addresses(addr)
-        if known_mixer['is_mixer']:
-            mixer_type = known_mixer['mixer_type']
-        else:
-            mixer_type = "Behavioral detection"
+        mixer_type = known_mixer_type(data) or "Behavioral detection"
         
         # Get transaction statistics for this mixer
         in_txs = list(G.in_edges(addr, data=True))
@@ -642,26 +1706,45 @@ def generate_mixer_detailed_report(G, mixer_candidates):
     
     return detailed_reports
 
-def generate_wallet_detailed_report(G, provenance_map, mixer_candidates):
-    """Generate detailed report for each wallet with mixer exposure"""
-    wallet_reports = []
+def generate_wallet_detailed_report(G, provenance_map, mixer_candidates, taint=None, provenance_stats=None):
+    """
+    Generate detailed report for each wallet with mixer exposure
+    taint: optional calculate_taint_exposure result, adds value-weighted exposure
+    provenance_stats: optional per-wallet totals from build_complete_provenance, used
+    for counts and scores when the map only keeps the top paths
+    """
+    wallet_reports = []
+    
+    # Path mixers that are not candidates: one registry lookup for all of them
+    outside = list(dict.fromkeys(p['mixer'] for paths in provenance_map.values() for p in paths
+                                 if p['mixer'] not in mixer_candidates))
+    registry = get_address_registry()
+    registry_mixers = {m for m, mixer_type in zip(outside, registry.mixer_types(registry.find(outside)))
+                       if mixer_type is not None}
     
     for wallet_addr, paths in provenance_map.items():
-        unique_mixers = set(p['mixer'] for p in paths)
+        unique_mixers = list(dict.fromkeys(p['mixer'] for p in paths))
         
         # Calculate risk metrics
         mixer_scores = []
         for m in unique_mixers:
             if m in mixer_candidates:
                 mixer_scores.append(mixer_candidates[m]['score'])
-            else:
-                # Check if it's a known mixer
-                known_mixer = detect_direct_mixer_addresses(m)
-                if known_mixer['is_mixer']:
-                    mixer_scores.append(1.0)
+            elif m in registry_mixers:
+                # Known mixer
+                mixer_scores.append(1.0)
         
         avg_mixer_score = statistics.mean(mixer_scores) if mixer_scores else 0
         max_mixer_score = max(mixer_scores) if mixer_scores else 0
+        mixer_count = len(unique_mixers)
+        path_count = len(paths)
+        
+        stats = provenance_stats.get(wallet_addr) if provenance_stats else None
+        if stats:
+            mixer_count = stats['mixers_found']
+            path_count = stats['paths_found']
+            avg_mixer_score = stats['avg_mixer_score']
+            max_mixer_score = stats['max_mixer_score']
         
         # Count paths by direction
         forward_paths = [p for p in paths if p['direction'] == 'forward']
@@ -678,8 +1761,8 @@ def generate_wallet_detailed_report(G, provenance_map, mixer_candidates):
             'address': wallet_addr,
             'exposure_summary': {
                 'exposed_to_mixers': True,
-                'number_of_mixers': len(unique_mixers),
-                'total_provenance_paths': len(paths),
+                'number_of_mixers': mixer_count,
+                'total_provenance_paths': path_count,
                 'avg_distance_to_mixers': round(avg_hops, 2),
                 'max_mixer_score': round(max_mixer_score, 4),
                 'avg_mixer_score': round(avg_mixer_score, 4),
@@ -688,12 +1771,12 @@ def generate_wallet_detailed_report(G, provenance_map, mixer_candidates):
             },
             
             'risk_assessment': {
-                'risk_score': min(1.0, (len(unique_mixers) * 0.3) + (avg_mixer_score * 0.7)),
-                'risk_level': 'CRITICAL' if len(unique_mixers) > 3 and avg_mixer_score > 0.8 else
-                            'HIGH' if len(unique_mixers) > 1 and avg_mixer_score > 0.7 else
-                            'MEDIUM' if len(unique_mixers) > 0 else 'LOW',
+                'risk_score': min(1.0, (mixer_count * 0.3) + (avg_mixer_score * 0.7)),
+                'risk_level': 'CRITICAL' if mixer_count > 3 and avg_mixer_score > 0.8 else
+                            'HIGH' if mixer_count > 1 and avg_mixer_score > 0.7 else
+                            'MEDIUM' if mixer_count > 0 else 'LOW',
                 'risk_factors': [
-                    f"Connected to {len(unique_mixers)} mixer{'s' if len(unique_mixers) > 1 else ''}",
+                    f"Connected to {mixer_count} mixer{'s' if mixer_count > 1 else ''}",
                     f"Average mixer score: {avg_mixer_score:.3f}",
                     f"Maximum distance: {max([p['hops'] for p in paths]) if paths else 0} hops"
                 ]
@@ -702,7 +1785,7 @@ def generate_wallet_detailed_report(G, provenance_map, mixer_candidates):
             'connected_mixers': [
                 {
                     'address': mixer_addr,
-                    'score': 1.0 if detect_direct_mixer_addresses(mixer_addr)['is_mixer'] else mixer_candidates.get(mixer_addr, {}).get('score', 0),
+                    'score': 1.0 if known_mixer_type(mixer_candidates.get(mixer_addr)) is not None else mixer_candidates.get(mixer_addr, {}).get('score', 0),
                     'paths': [
                         {
                             'direction': p['direction'],
@@ -724,12 +1807,17 @@ def generate_wallet_detailed_report(G, provenance_map, mixer_candidates):
             },
             
             'recommendations': [
-                "Monitor this wallet for suspicious activity" if len(unique_mixers) > 0 else "No immediate action needed",
+                "Monitor this wallet for suspicious activity" if mixer_count > 0 else "No immediate action needed",
                 "Check incoming transactions for mixer patterns",
                 "Consider KYC/AML review if high transaction volume"
             ]
         }
         
+        if taint is not None and wallet_addr in taint['index']:
+            i = taint['index'][wallet_addr]
+            report['exposure_summary']['taint_exposure'] = round(float(taint['haircut'][i]), 4)
+            report['exposure_summary']['poison_tainted'] = bool(taint['poison'][i] > 0)
+        
         wallet_reports.append(report)
     
     wallet_reports.sort(key=lambda x: x['risk_assessment']['risk_score'], reverse=True)
@@ -813,117 +1901,731 @@ def generate_network_analysis_report(G, mixer_candidates):
         }
     }
 
+def generate_hub_summary(batch_scores, edge_arrays, limit=HUB_SUMMARY_LIMIT):
+    """
+    Activity of the hubs that traversals stop at (they are not expanded, so this
+    summary is all the report says about them), busiest first
+    """
+    hub_ids = np.flatnonzero(batch_scores['hubs'])
+    n = len(batch_scores['nodes'])
+    src, dst, amounts = edge_arrays['src'], edge_arrays['dst'], edge_arrays['amounts']
+    volume_in = np.bincount(dst, weights=amounts, minlength=n)
+    volume_out = np.bincount(src, weights=amounts, minlength=n)
+    fan_in, fan_out = batch_scores['fan_in'], batch_scores['fan_out']
+    
+    busiest = hub_ids[np.argsort(-(fan_in[hub_ids] + fan_out[hub_ids]), kind='stable')][:limit]
+    hubs = []
+    for i in busiest:
+        address = batch_scores['nodes'][i]
+        entry = get_address_registry().lookup(address) if batch_scores['registry_hubs'][i] else None
+        hubs.append({
+            'address': address,
+            'label': entry[0] if entry else None,
+            'category': entry[1] if entry else 'degree_hub',
+            'fan_in': int(fan_in[i]),
+            'fan_out': int(fan_out[i]),
+            'volume_in': float(volume_in[i]),
+            'volume_out': float(volume_out[i])
+        })
+    
+    return {
+        'hub_count': len(hub_ids),
+        'registry_hubs': int(batch_scores['registry_hubs'].sum()),
+        'degree_hubs': len(hub_ids) - int(batch_scores['registry_hubs'].sum()),
+        'degree_threshold': batch_scores['hub_degree_threshold'],
+        'degree_percentile': HUB_DEGREE_PERCENTILE,
+        'hub_volume_share': round(float((volume_in[hub_ids].sum() + volume_out[hub_ids].sum())
+                                        / (2 * amounts.sum())), 4) if amounts.sum() > 0 else 0,
+        'top_hubs': hubs
+    }
+
 # ---------- Provenance Tracing ----------
 
-def trace_provenance_backward(G, target, max_hops=MAX_HOPS):
+def unwind_parent_pointers(parents, node):
+    """Path from the BFS root to node, following parent pointers (root maps to None)"""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
+def trace_provenance_backward(G, target, max_hops=MAX_HOPS, budget=None, score_cache=None,
+                              node_limit=PROVENANCE_FRONTIER_LIMIT, trace_info=None, terminal=None):
     """
     Trace BACKWARD to find mixer origins
     target → ... → mixer
+    Stops early (keeping paths found so far) when the budget is exhausted
+    score_cache: MixerScoreCache shared across targets (scores are computed once per graph)
+    node_limit: stop expanding once this many wallets were reached (None = no cap)
+    trace_info: optional dict filled with depth_reached and frontier_capped
+    terminal: addresses reached but never expanded (hubs)
     """
     paths = []
+    terminal = terminal or ()
+    depth_reached = 0
+    capped = False
     
     try:
-        # BFS backward
-        visited = {target}
-        queue = [(target, [target], 0)]  # (node, path, hops)
+        # BFS backward, paths rebuilt from parent pointers only for mixer hits
+        parents = {target: None}
+        queue = deque([(target, 0)])  # (node, hops)
         
         while queue:
-            node, path, hops = queue.pop(0)
+            if budget is not None and not budget.checkpoint():
+                break
+            if node_limit is not None and len(parents) >= node_limit:
+                capped = True
+                break
+            
+            node, hops = queue.popleft()
             
             if hops >= max_hops:
                 continue
             
             # Check predecessors
             for predecessor in G.predecessors(node):
-                if predecessor not in visited:
-                    visited.add(predecessor)
-                    new_path = path + [predecessor]
+                if predecessor not in parents:
+                    parents[predecessor] = node
                     new_hops = hops + 1
+                    depth_reached = max(depth_reached, new_hops)
                     
                     # Check if predecessor is a mixer candidate
-                    score, reasoning = detect_mixer_behavior(G, predecessor)
+                    if score_cache is not None:
+                        score, reasoning = score_cache.get(predecessor)
+                    else:
+                        score, reasoning = detect_mixer_behavior(G, predecessor)
                     if score >= MIXER_SCORE_THRESHOLD:
                         paths.append({
                             'mixer': predecessor,
-                            'path': new_path,
+                            'path': unwind_parent_pointers(parents, predecessor),
                             'hops': new_hops,
                             'mixer_score': score,
                             'mixer_reasoning': reasoning,
                             'direction': 'backward'
                         })
                     
-                    queue.append((predecessor, new_path, new_hops))
+                    if predecessor not in terminal:
+                        queue.append((predecessor, new_hops))
     except Exception as e:
         print(f"Error in backward tracing from {target}: {e}")
     
+    if trace_info is not None:
+        trace_info['depth_reached'] = depth_reached
+        trace_info['frontier_capped'] = capped
     return paths
 
-def trace_provenance_forward(G, source, max_hops=MAX_HOPS):
+def successor_csr(edge_arrays):
+    """CSR adjacency (indptr, indices) over node indices, cached on the edge arrays"""
+    if 'successor_csr' not in edge_arrays:
+        src, dst = edge_arrays['src'], edge_arrays['dst']
+        n = len(edge_arrays['nodes'])
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        indices = dst[np.argsort(src, kind='stable')]
+        edge_arrays['successor_csr'] = (indptr, indices)
+    return edge_arrays['successor_csr']
+
+def terminal_mask(edge_arrays, terminal):
+    """Boolean mask over the edge-array nodes of the terminal addresses"""
+    mask = np.zeros(len(edge_arrays['nodes']), dtype=bool)
+    if terminal:
+        index = edge_arrays['index']
+        mask[[index[address] for address in terminal if address in index]] = True
+    return mask
+
+def trace_provenance_multi_source(G, sources, max_hops=MAX_HOPS, budget=None, edge_arrays=None,
+                                  node_limit=PROVENANCE_FRONTIER_LIMIT, terminal=None):
     """
-    Trace FORWARD from mixers
-    mixer → ... → target
+    Single-pass forward BFS seeded with all mixers at once
+    Every reached wallet is labelled with its nearest mixer, hop count and BFS
+    parent in flat arrays (memory linear in graph size); paths are rebuilt on
+    demand with reconstruct_provenance_path. Sources should be ordered strongest
+    first: on equal distance the first seed wins.
+    Budget is checked per hop level (coverage = levels completed / max_hops).
+    node_limit: no further level is expanded once this many wallets have been on
+    the frontier; labels report the depth_reached and whether the cap hit.
+    terminal: addresses labelled when reached but never expanded (hubs), counted
+    in the labels' terminal_reached
+    Mixers are seeds (hops 0), so a mixer funded through another mixer gets its
+    own label in seed_hops / seed_origin / seed_parent, set the first time another
+    mixer's flow reaches it (see exposure_labels)
+    """
+    arrays = edge_arrays or build_edge_arrays(G)
+    nodes, index = arrays['nodes'], arrays['index']
+    n = len(nodes)
+    indptr, indices = successor_csr(arrays)
+    is_terminal = terminal_mask(arrays, terminal)
+    terminal_reached = 0
+    
+    origin = np.full(n, -1, dtype=np.int64)
+    hops = np.full(n, -1, dtype=np.int64)
+    parent = np.full(n, -1, dtype=np.int64)
+    seed_labels = SeedLabels(n)
+    
+    seeds = list(dict.fromkeys(index[s] for s in sources if s in index))
+    frontier = np.array(seeds, dtype=np.int64)
+    origin[frontier] = frontier
+    hops[frontier] = 0
+    seed_labels.is_seed[frontier] = True
+    frontier_total = len(frontier)
+    depth_reached = 0
+    capped = False
+    
+    if budget is not None:
+        budget.total = max_hops
+        budget.unit = 'hop_levels'
+    
+    for hop in range(1, max_hops + 1):
+        if len(frontier) == 0:
+            break
+        if node_limit is not None and frontier_total >= node_limit:
+            capped = True
+            break
+        if budget is not None and not budget.checkpoint(len(frontier)):
+            break
+        
+        # All successors of the frontier, tagged with the frontier node they came from
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        owners = np.repeat(frontier, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        reached = indices[np.repeat(starts, counts) + offsets]
+        seed_labels.reach(hop, reached, owners, origin[owners])
+        
+        unseen = hops[reached] < 0
+        reached, owners = reached[unseen], owners[unseen]
+        
+        # First discovery wins, and keeps discovery order for the next level
+        _, first = np.unique(reached, return_index=True)
+        first.sort()
+        frontier, owners = reached[first], owners[first]
+        
+        hops[frontier] = hop
+        parent[frontier] = owners
+        origin[frontier] = origin[owners]
+        frontier_total += len(frontier)
+        if len(frontier):
+            depth_reached = hop
+        
+        # Hubs keep their label but are not expanded
+        stops = is_terminal[frontier]
+        terminal_reached += int(stops.sum())
+        frontier = frontier[~stops]
+        
+        if budget is not None:
+            budget.item_done()
+    
+    if budget is not None:
+        budget.details = {'wallets_labelled': int((hops > 0).sum() + (seed_labels.hops > 0).sum()),
+                          'frontier_pending': len(frontier) if budget.exhausted else 0}
+    
+    return {
+        'nodes': nodes,
+        'index': index,
+        'origin': origin,
+        'hops': hops,
+        'parent': parent,
+        **seed_labels.labels(),
+        'depth_reached': depth_reached,
+        'frontier_capped': capped,
+        'terminal_reached': terminal_reached
+    }
+
+class SeedLabels:
+    """
+    Labels of the seeds (mixers) of a multi-source traversal reached by another
+    seed's flow: hop, origin seed and parent of the first such arrival
+    """
+    def __init__(self, n):
+        self.is_seed = np.zeros(n, dtype=bool)
+        self.hops = np.full(n, -1, dtype=np.int64)
+        self.origin = np.full(n, -1, dtype=np.int64)
+        self.parent = np.full(n, -1, dtype=np.int64)
+
+    def reach(self, hop, reached, senders, origins):
+        """Record arrivals (in priority order) at seeds not labelled yet from another seed's flow"""
+        chained = self.is_seed[reached] & (self.hops[reached] < 0) & (origins != reached)
+        if not chained.any():
+            return
+        reached, senders, origins = reached[chained], senders[chained], origins[chained]
+        _, first = np.unique(reached, return_index=True)
+        reached = reached[first]
+        self.hops[reached] = hop
+        self.origin[reached] = origins[first]
+        self.parent[reached] = senders[first]
+
+    def labels(self):
+        return {'seed_hops': self.hops, 'seed_origin': self.origin, 'seed_parent': self.parent}
+
+def exposure_labels(labels):
+    """
+    (hops, origin) of every wallet from multi-source labels, with mixers reached
+    from another mixer labelled like any exposed wallet (hops > 0)
+    """
+    chained = labels['seed_hops'] > 0
+    return (np.where(chained, labels['seed_hops'], labels['hops']),
+            np.where(chained, labels['seed_origin'], labels['origin']))
+
+def reconstruct_provenance_path(labels, node):
+    """Path mixer → ... → node from multi-source BFS labels (empty if unreached)"""
+    i = labels['index'].get(node, -1)
+    if i < 0 or labels['hops'][i] < 0:
+        return []
+    
+    level = labels['hops'][i]
+    path = [labels['nodes'][i]]
+    if level == 0 and labels['seed_hops'][i] > 0:
+        # A mixer funded through another mixer: continue from the wallet that reached it
+        level = labels['seed_hops'][i] - 1
+        i = labels['seed_parent'][i]
+        path.append(labels['nodes'][i])
+    
+    if 'level_parent' in labels:
+        # Temporal labels: follow the parent set at each hop level, a -1 means
+        # the wallet's label was carried over unchanged from the previous level
+        level_parent = labels['level_parent']
+        for level in range(level, 0, -1):
+            if level_parent[level, i] >= 0:
+                i = level_parent[level, i]
+                path.append(labels['nodes'][i])
+    else:
+        i = labels['parent'][i]
+        while i >= 0:
+            path.append(labels['nodes'][i])
+            i = labels['parent'][i]
+    path.reverse()
+    return path
+
+def build_transfer_arrays(edge_arrays, G):
+    """
+    Individual transfers (not aggregated edges) sorted per node by time, for
+    time-respecting traversal. Times are replaced by their rank (1..n_ranks) so
+    (node, time) pairs pack into one sortable int64 key. Transfers without a
+    timestamp cannot be ordered and are left out. Cached on the edge arrays.
+    """
+    if 'transfers' in edge_arrays:
+        return edge_arrays['transfers']
+    
+    index = edge_arrays['index']
+    n = len(edge_arrays['nodes'])
+    src, dst, times = [], [], []
+    for s, neighbors in G.adj.items():
+        i = index[s]
+        for r, data in neighbors.items():
+            j = index[r]
+            for t in data.get('times_us') or [data.get('time_us')]:
+                if t is not None:
+                    src.append(i)
+                    dst.append(j)
+                    times.append(t)
+    
+    src = np.array(src, dtype=np.int64)
+    dst = np.array(dst, dtype=np.int64)
+    time_us = np.array(times, dtype=np.int64)
+    if len(time_us):
+        time_us -= time_us.min()
+    unique_times, ranks = np.unique(time_us, return_inverse=True)
+    ranks = ranks.astype(np.int64) + 1
+    n_ranks = len(unique_times)
+    key_base = n_ranks + 2  # ranks 1..n_ranks, plus 0 (before all) and n_ranks + 1 (after all)
+    
+    out_order = np.lexsort((ranks, src))
+    in_order = np.lexsort((ranks, dst))
+    transfers = {
+        'n_ranks': n_ranks,
+        'key_base': key_base,
+        'out_keys': src[out_order] * key_base + ranks[out_order],
+        'out_indptr': np.r_[0, np.cumsum(np.bincount(src, minlength=n))],
+        'out_src': src[out_order],
+        'out_dst': dst[out_order],
+        'out_rank': ranks[out_order],
+        'in_indptr': np.r_[0, np.cumsum(np.bincount(dst, minlength=n))],
+        'in_src': src[in_order],
+        'in_rank': ranks[in_order]
+    }
+    edge_arrays['transfers'] = transfers
+    return transfers
+
+def trace_provenance_multi_source_temporal(G, sources, max_hops=MAX_HOPS, budget=None, edge_arrays=None,
+                                           node_limit=PROVENANCE_FRONTIER_LIMIT, terminal=None):
+    """
+    Time-respecting version of trace_provenance_multi_source
+    Funds reach a wallet at the earliest transfer time possible within the hop
+    limit, and only transfers at or after that arrival are followed (found by
+    binary search in each node's time-sorted transfers). Mixers can send at any time.
+    Labels are the same as the plain BFS, except parents are kept per hop level
+    ('level_parent') because a later level may give a wallet an earlier arrival.
+    terminal, seed labels: as in trace_provenance_multi_source
+    """
+    arrays = edge_arrays or build_edge_arrays(G)
+    transfers = build_transfer_arrays(arrays, G)
+    nodes, index = arrays['nodes'], arrays['index']
+    n = len(nodes)
+    is_terminal = terminal_mask(arrays, terminal)
+    terminal_reached = 0
+    key_base = transfers['key_base']
+    out_keys, out_indptr = transfers['out_keys'], transfers['out_indptr']
+    
+    unreached = transfers['n_ranks'] + 1
+    arrival = np.full(n, unreached, dtype=np.int64)
+    current_origin = np.full(n, -1, dtype=np.int64)
+    origin = np.full(n, -1, dtype=np.int64)
+    hops = np.full(n, -1, dtype=np.int64)
+    level_parent = np.full((max_hops + 1, n), -1, dtype=np.int64)
+    seed_labels = SeedLabels(n)
+    
+    seeds = list(dict.fromkeys(index[s] for s in sources if s in index))
+    frontier = np.array(seeds, dtype=np.int64)
+    arrival[frontier] = 0
+    current_origin[frontier] = frontier
+    origin[frontier] = frontier
+    hops[frontier] = 0
+    seed_labels.is_seed[frontier] = True
+    frontier_total = len(frontier)
+    depth_reached = 0
+    capped = False
+    
+    if budget is not None:
+        budget.total = max_hops
+        budget.unit = 'hop_levels'
+    
+    for hop in range(1, max_hops + 1):
+        if len(frontier) == 0:
+            break
+        if node_limit is not None and frontier_total >= node_limit:
+            capped = True
+            break
+        if budget is not None and not budget.checkpoint(len(frontier)):
+            break
+        
+        # Transfers leaving each frontier node at or after its arrival
+        starts = np.searchsorted(out_keys, frontier * key_base + arrival[frontier])
+        counts = out_indptr[frontier + 1] - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        usable = np.repeat(starts, counts) + offsets
+        
+        reached = transfers['out_dst'][usable]
+        reached_at = transfers['out_rank'][usable]
+        senders = transfers['out_src'][usable]
+        by_time = np.argsort(reached_at, kind='stable')
+        seed_labels.reach(hop, reached[by_time], senders[by_time], current_origin[senders[by_time]])
+        
+        better = reached_at < arrival[reached]
+        reached, reached_at, senders = reached[better], reached_at[better], senders[better]
+        
+        # Earliest arrival per wallet (first sender on ties)
+        order = np.lexsort((reached_at, reached))
+        first = order[np.r_[True, reached[order][1:] != reached[order][:-1]]] if len(order) else order
+        frontier, reached_at, senders = reached[first], reached_at[first], senders[first]
+        
+        level_origin = current_origin[senders]
+        arrival[frontier] = reached_at
+        current_origin[frontier] = level_origin
+        level_parent[hop, frontier] = senders
+        
+        discovered = hops[frontier] < 0
+        hops[frontier[discovered]] = hop
+        origin[frontier[discovered]] = level_origin[discovered]
+        frontier_total += len(frontier)
+        if len(frontier):
+            depth_reached = hop
+        
+        # Hubs keep their label but are not expanded
+        stops = is_terminal[frontier]
+        terminal_reached += int((stops & discovered).sum())
+        frontier = frontier[~stops]
+        
+        if budget is not None:
+            budget.item_done()
+    
+    if budget is not None:
+        budget.details = {'wallets_labelled': int((hops > 0).sum() + (seed_labels.hops > 0).sum()),
+                          'frontier_pending': len(frontier) if budget.exhausted else 0}
+    
+    return {
+        'nodes': nodes,
+        'index': index,
+        'origin': origin,
+        'hops': hops,
+        'level_parent': level_parent,
+        **seed_labels.labels(),
+        'depth_reached': depth_reached,
+        'frontier_capped': capped,
+        'terminal_reached': terminal_reached
+    }
+
+def trace_provenance_backward_temporal(G, target, max_hops=MAX_HOPS, budget=None, score_cache=None,
+                                       edge_arrays=None, node_limit=PROVENANCE_FRONTIER_LIMIT, trace_info=None,
+                                       terminal=None):
+    """
+    Time-respecting version of trace_provenance_backward
+    Walks back from the target keeping, per wallet, the latest time its funds can
+    leave and still reach the target; only transfers at or before that time are
+    followed (binary search in each node's time-sorted incoming transfers).
+    node_limit / trace_info / terminal: as in trace_provenance_backward, counted per hop level
     """
     paths = []
+    depth_reached = 0
+    capped = False
     
     try:
-        # BFS forward
-        visited = {source}
-        queue = [(source, [source], 0)]
+        arrays = edge_arrays or build_edge_arrays(G)
+        transfers = build_transfer_arrays(arrays, G)
+        nodes, index = arrays['nodes'], arrays['index']
+        in_indptr, in_src, in_rank = transfers['in_indptr'], transfers['in_src'], transfers['in_rank']
         
-        while queue:
-            node, path, hops = queue.pop(0)
+        start = index[target]
+        terminal_ids = {index[address] for address in terminal if address in index} if terminal else set()
+        deadline = {start: transfers['n_ranks'] + 1}
+        level_child = [{} for _ in range(max_hops + 1)]  # per hop: wallet -> next wallet toward target
+        discovered = {start}
+        frontier = [start]
+        frontier_total = 1
+        
+        for hop in range(1, max_hops + 1):
+            if not frontier:
+                break
+            if node_limit is not None and frontier_total >= node_limit:
+                capped = True
+                break
             
-            if hops >= max_hops:
-                continue
+            frontier_deadline = {v: deadline[v] for v in frontier}
+            improved = {}
             
-            for successor in G.successors(node):
-                if successor not in visited:
-                    visited.add(successor)
-                    new_path = path + [successor]
-                    new_hops = hops + 1
+            for v in frontier:
+                if budget is not None and not budget.checkpoint():
+                    break
+                
+                lo, hi = in_indptr[v], in_indptr[v + 1]
+                hi = lo + np.searchsorted(in_rank[lo:hi], frontier_deadline[v], side='right')
+                
+                # Ranks ascend, so each sender ends on its latest usable transfer
+                for p, latest in zip(in_src[lo:hi].tolist(), in_rank[lo:hi].tolist()):
+                    if latest > deadline.get(p, -1):
+                        deadline[p] = latest
+                        level_child[hop][p] = v
+                        improved[p] = True
+            
+            for p in improved:
+                if p in discovered:
+                    continue
+                discovered.add(p)
+                predecessor = nodes[p]
+                
+                # Check if predecessor is a mixer candidate
+                if score_cache is not None:
+                    score, reasoning = score_cache.get(predecessor)
+                else:
+                    score, reasoning = detect_mixer_behavior(G, predecessor)
+                if score >= MIXER_SCORE_THRESHOLD:
+                    # Walk the per-hop links back to the target (no link = label unchanged at that hop)
+                    path, node = [p], p
+                    for level in range(hop, 0, -1):
+                        node = level_child[level].get(node, node)
+                        if node != path[-1]:
+                            path.append(node)
                     
-                    # Record all paths from mixer
                     paths.append({
-                        'target': successor,
-                        'path': new_path,
-                        'hops': new_hops,
-                        'mixer': source,
-                        'direction': 'forward'
+                        'mixer': predecessor,
+                        'path': [nodes[i] for i in reversed(path)],
+                        'hops': hop,
+                        'mixer_score': score,
+                        'mixer_reasoning': reasoning,
+                        'direction': 'backward'
                     })
-                    
-                    queue.append((successor, new_path, new_hops))
+            
+            if budget is not None and budget.exhausted:
+                break
+            frontier = [p for p in improved if p not in terminal_ids]
+            frontier_total += len(improved)
+            if improved:
+                depth_reached = hop
+    except Exception as e:
+        print(f"Error in temporal backward tracing from {target}: {e}")
+    
+    if trace_info is not None:
+        trace_info['depth_reached'] = depth_reached
+        trace_info['frontier_capped'] = capped
+    return paths
+
+def trace_provenance_forward(G, source, max_hops=MAX_HOPS, budget=None, edge_arrays=None, terminal=None):
+    """
+    Trace FORWARD from mixers
+    mixer → ... → target
+    Stops early (keeping paths found so far) when the budget is exhausted
+    terminal: addresses reached but never expanded (hubs)
+    """
+    paths = []
+    
+    try:
+        labels = trace_provenance_multi_source(G, [source], max_hops=max_hops, budget=budget,
+                                               edge_arrays=edge_arrays, terminal=terminal)
+        
+        # Record all paths from mixer
+        hops, _ = exposure_labels(labels)
+        for i in np.flatnonzero(hops > 0):
+            target = labels['nodes'][i]
+            paths.append({
+                'target': target,
+                'path': reconstruct_provenance_path(labels, target),
+                'hops': int(hops[i]),
+                'mixer': source,
+                'direction': 'forward'
+            })
     except Exception as e:
         print(f"Error in forward tracing from {source}: {e}")
     
     return paths
 
-def build_complete_provenance(G, mixer_candidates):
+def select_top_provenance(entries, mixer_score, paths_per_mixer=PROVENANCE_PATHS_PER_MIXER,
+                          mixers_per_wallet=PROVENANCE_MIXERS_PER_WALLET):
+    """
+    Bounded selection of one wallet's provenance entries: a bounded heap keeps the
+    shortest paths per mixer, then the highest-score mixers are kept (nearest
+    first on ties). Returns (kept entries, stats over every entry seen).
+    """
+    per_mixer = {}
+    for seq, entry in enumerate(entries):
+        heap = per_mixer.setdefault(entry['mixer'], [])
+        item = (-entry['hops'], -seq, entry)  # heap top = longest (then latest) path
+        if len(heap) < paths_per_mixer:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heappushpop(heap, item)
+    
+    scores = {mixer: mixer_score(mixer) for mixer in per_mixer}
+    best_mixers = heapq.nlargest(mixers_per_wallet, per_mixer,
+                                 key=lambda mixer: (scores[mixer], max(per_mixer[mixer])[0]))
+    
+    kept = []
+    for mixer in best_mixers:
+        kept.extend(entry for _, _, entry in sorted(per_mixer[mixer], reverse=True))
+    
+    stats = {
+        'mixers_found': len(per_mixer),
+        'paths_found': len(entries),
+        'avg_mixer_score': statistics.mean(scores.values()) if scores else 0,
+        'max_mixer_score': max(scores.values()) if scores else 0
+    }
+    return kept, stats
+
+def build_complete_provenance(G, mixer_candidates, forward_budget=None, backward_budget=None,
+                              score_cache=None, edge_arrays=None, temporal=TEMPORAL_PROVENANCE,
+                              provenance_stats=None, max_hops=MAX_HOPS,
+                              node_limit=PROVENANCE_FRONTIER_LIMIT, traversal_stats=None, terminal=None,
+                              parallel=True):
     """
     Build complete provenance: mixer → intermediaries → targets
+    Forward: nearest mixer per wallet (ties go to the mixer passed first, so pass
+    them highest score first). Backward: every mixer reaching each exposed wallet.
+    temporal: only keep time-respecting paths
+    Each wallet keeps a bounded set of paths (see select_top_provenance); entries
+    reference mixers by address, their reasoning lives in the mixer candidates.
+    provenance_stats: optional dict filled with per-wallet totals over all paths found
+    max_hops / node_limit: traversal depth and frontier cap for every tracer
+    traversal_stats: optional dict filled with the depth the traversals actually reached
+    terminal: addresses (hubs) that get provenance when reached but are never
+    expanded, forward or backward
+    parallel: trace backward per weakly connected component on the process pool
+    when there are enough targets (see COMPONENT_PARALLEL_MIN_TARGETS)
     """
     provenance_map = {}  # target -> list of provenance paths
+    if provenance_stats is None:
+        provenance_stats = {}
+    if traversal_stats is None:
+        traversal_stats = {}
+    traversal_stats.update({
+        'max_hops': max_hops,
+        'node_limit': node_limit,
+        'forward_depth_reached': 0,
+        'forward_frontier_capped': False,
+        'backward_depth_reached': 0,
+        'backward_capped_targets': 0,
+        'hubs_reached': 0
+    })
+    terminal = terminal or set()
+    if score_cache is None:
+        score_cache = MixerScoreCache(G)
+    if edge_arrays is None:
+        edge_arrays = build_edge_arrays(G)
+    trace_forward = trace_provenance_multi_source_temporal if temporal else trace_provenance_multi_source
     
     try:
-        for mixer in mixer_candidates:
-            # Trace forward from mixer
-            forward_paths = trace_provenance_forward(G, mixer, max_hops=MAX_HOPS)
-            
-            for path_info in forward_paths:
-                target = path_info['target']
-                
-                if target not in provenance_map:
-                    provenance_map[target] = []
-                
-                provenance_map[target].append({
-                    'mixer': mixer,
-                    'path': path_info['path'],
-                    'hops': path_info['hops'],
-                    'direction': 'forward'
-                })
+        # One multi-source BFS from all mixers: each wallet gets its nearest mixer
+        labels = trace_forward(G, mixer_candidates, max_hops=max_hops, budget=forward_budget,
+                               edge_arrays=edge_arrays, node_limit=node_limit, terminal=terminal)
+        traversal_stats['forward_depth_reached'] = labels['depth_reached']
+        traversal_stats['forward_frontier_capped'] = labels['frontier_capped']
+        traversal_stats['hubs_reached'] = labels['terminal_reached']
+        if labels['frontier_capped']:
+            print(f"✂️  Forward tracing capped at depth {labels['depth_reached']} (frontier limit {node_limit})")
+        
+        # Mixers funded through another mixer are exposed wallets too
+        hops, origin = exposure_labels(labels)
+        for i in np.flatnonzero(hops > 0):
+            target = labels['nodes'][i]
+            provenance_map[target] = [{
+                'mixer': labels['nodes'][origin[i]],
+                'path': reconstruct_provenance_path(labels, target),
+                'hops': int(hops[i]),
+                'direction': 'forward'
+            }]
+        
+        if forward_budget is not None:
+            forward_budget.finish()
         
         # For each target, also trace backward to find additional mixers
-        for target in list(provenance_map.keys()):
-            backward_paths = trace_provenance_backward(G, target, max_hops=MAX_HOPS)
+        # (hubs keep their forward path only: their inflow is not expanded)
+        targets = list(provenance_map.keys())
+        expandable = [target for target in targets if target not in terminal]
+        if backward_budget is not None:
+            backward_budget.total = len(expandable)
+            backward_budget.unit = 'targets'
+        
+        # Many targets: trace them per weakly connected component on the process pool
+        stage_budget = backward_budget
+        traced = None
+        if (parallel and COMPONENT_WORKERS > 1 and len(expandable) >= COMPONENT_PARALLEL_MIN_TARGETS
+                and score_cache.batch_scores is not None):
+            try:
+                component_stats = {}
+                traced = trace_backward_by_component(G, expandable, edge_arrays, score_cache, max_hops=max_hops,
+                                                     budget=backward_budget, temporal=temporal,
+                                                     node_limit=node_limit, terminal=terminal,
+                                                     component_stats=component_stats)
+                traversal_stats['component_parallelism'] = component_stats
+                print(f"🧩 Backward tracing: {component_stats['tasks']} tasks over {component_stats['components_traced']} components on {COMPONENT_WORKERS} workers")
+            except Exception as e:
+                print(f"⚠️  Per-component tracing failed, tracing in-process: {e}")
+                traced = None
+                # The failed attempt may have spent or exhausted the stage budget
+                if stage_budget is not None:
+                    backward_budget = stage_budget.retry()
+        
+        for target in expandable:
+            if traced is not None:
+                if target not in traced:
+                    continue
+                backward_paths, trace_info = traced[target]
+            else:
+                if backward_budget is not None and backward_budget.exhausted:
+                    break
+                
+                trace_info = {}
+                if temporal:
+                    backward_paths = trace_provenance_backward_temporal(G, target, max_hops=max_hops, budget=backward_budget,
+                                                                        score_cache=score_cache, edge_arrays=edge_arrays,
+                                                                        node_limit=node_limit, trace_info=trace_info,
+                                                                        terminal=terminal)
+                else:
+                    backward_paths = trace_provenance_backward(G, target, max_hops=max_hops, budget=backward_budget,
+                                                               score_cache=score_cache, node_limit=node_limit,
+                                                               trace_info=trace_info, terminal=terminal)
+            traversal_stats['backward_depth_reached'] = max(traversal_stats['backward_depth_reached'],
+                                                            trace_info.get('depth_reached', 0))
+            if trace_info.get('frontier_capped'):
+                traversal_stats['backward_capped_targets'] += 1
             
             for path_info in backward_paths:
                 provenance_map[target].append({
@@ -931,15 +2633,811 @@ def build_complete_provenance(G, mixer_candidates):
                     'path': path_info['path'],
                     'hops': path_info['hops'],
                     'direction': 'backward',
-                    'mixer_score': path_info['mixer_score'],
-                    'mixer_reasoning': path_info['mixer_reasoning']
+                    'mixer_score': path_info['mixer_score']
                 })
+            
+            provenance_map[target], provenance_stats[target] = select_top_provenance(
+                provenance_map[target], lambda mixer: score_cache.get(mixer)[0])
+            
+            if traced is None and backward_budget is not None and not backward_budget.exhausted:
+                backward_budget.item_done()
+        
+        if backward_budget is not stage_budget:
+            # Report the retry's progress on the stage budget the caller holds
+            stage_budget.completed = backward_budget.completed
+            stage_budget.exhausted = backward_budget.exhausted
+            stage_budget.work_done += backward_budget.work_done
+        if stage_budget is not None:
+            stage_budget.finish()
+        
+        # Hubs and wallets the backward budget did not reach only hold their forward path
+        for target in targets:
+            if target not in provenance_stats:
+                provenance_map[target], provenance_stats[target] = select_top_provenance(
+                    provenance_map[target], lambda mixer: score_cache.get(mixer)[0])
+        
+        print(f"🧮 Mixer score cache: {score_cache.misses} wallets scored, {score_cache.hits} lookups reused")
     except Exception as e:
         print(f"Error building provenance: {e}")
         traceback.print_exc()
     
     return provenance_map
 
+# ---------- Component Partitioning ----------
+
+def weakly_connected_labels(G, edge_arrays):
+    """Component id per node (edge-array order), largest component first; cached on the edge arrays"""
+    if 'components' not in edge_arrays:
+        index = edge_arrays['index']
+        labels = np.zeros(len(index), dtype=np.int64)
+        components = sorted(nx.weakly_connected_components(G), key=len, reverse=True)
+        for component_id, component in enumerate(components):
+            labels[[index[node] for node in component]] = component_id
+        edge_arrays['components'] = labels
+    return edge_arrays['components']
+
+def plan_component_batches(labels, component_ids, batch_nodes=COMPONENT_BATCH_NODES):
+    """
+    Component ids grouped into work batches, largest components first: a
+    component of batch_nodes wallets or more is a batch of its own, smaller ones
+    are packed together up to batch_nodes wallets
+    """
+    sizes = np.bincount(labels)
+    component_ids = np.asarray(component_ids, dtype=np.int64)
+    component_ids = component_ids[np.argsort(-sizes[component_ids], kind='stable')]
+    
+    batches, current, current_size = [], [], 0
+    for component_id in component_ids.tolist():
+        if current and current_size + sizes[component_id] > batch_nodes:
+            batches.append(current)
+            current, current_size = [], 0
+        current.append(component_id)
+        current_size += sizes[component_id]
+    if current:
+        batches.append(current)
+    return batches
+
+def plan_component_tasks(labels, target_ids, batch_nodes=COMPONENT_BATCH_NODES,
+                         chunk_targets=COMPONENT_CHUNK_TARGETS, workers=COMPONENT_WORKERS):
+    """
+    Work units for per-component tracing: components holding targets, batched
+    (plan_component_batches), each batch's targets split into at most `workers`
+    parts of at least chunk_targets. Returns [(node ids, [target id parts])], so
+    a batch's payload is built once however many parts share it.
+    """
+    target_components = labels[target_ids]
+    tasks = []
+    for components in plan_component_batches(labels, np.unique(target_components), batch_nodes):
+        node_ids = np.flatnonzero(np.isin(labels, components))
+        batch_targets = target_ids[np.isin(target_components, components)]
+        parts = max(1, min(workers, -(-len(batch_targets) // chunk_targets)))
+        tasks.append((node_ids, np.array_split(batch_targets, parts)))
+    return tasks
+
+def predecessor_arrays(edge_arrays, G):
+    """
+    Incoming edges per wallet in G.predecessors order (CSR: in_indptr, in_src),
+    so tracers rebuilt from them visit parents like the in-process tracer.
+    Cached on the edge arrays.
+    """
+    if 'predecessors' not in edge_arrays:
+        index = edge_arrays['index']
+        in_src, counts = [], []
+        for node in edge_arrays['nodes']:
+            predecessors = [index[p] for p in G.predecessors(node)]
+            in_src.extend(predecessors)
+            counts.append(len(predecessors))
+        edge_arrays['predecessors'] = {
+            'in_indptr': np.r_[0, np.cumsum(counts)].astype(np.int64),
+            'in_src': np.array(in_src, dtype=np.int64)
+        }
+    return edge_arrays['predecessors']
+
+def csr_rows(indptr, node_ids):
+    """Positions of the CSR entries of node_ids (in node order) and the sliced indptr"""
+    counts = indptr[node_ids + 1] - indptr[node_ids]
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(indptr[node_ids], counts) + offsets, np.r_[0, np.cumsum(counts)]
+
+def component_task_payload(G, edge_arrays, node_ids, scores, is_terminal, temporal, **options):
+    """
+    Self-contained input for trace_component_backward, pickled once per batch:
+    the batch's wallets and their incoming transfers (temporal: slices of
+    build_transfer_arrays) or incoming edges (predecessor_arrays), renumbered.
+    Batches are unions of whole components, so no edge leaves them.
+    """
+    local = np.full(len(edge_arrays['nodes']), -1, dtype=np.int64)
+    local[node_ids] = np.arange(len(node_ids))
+    nodes = edge_arrays['nodes']
+    payload = {
+        'nodes': [nodes[i] for i in node_ids],
+        'scores': scores[node_ids],
+        'terminal': [nodes[i] for i in node_ids[is_terminal[node_ids]]],
+        'temporal': temporal,
+        **options
+    }
+    
+    if temporal:
+        transfers = build_transfer_arrays(edge_arrays, G)
+        rows, in_indptr = csr_rows(transfers['in_indptr'], node_ids)
+        payload['transfers'] = {
+            'n_ranks': transfers['n_ranks'],
+            'in_indptr': in_indptr,
+            'in_src': local[transfers['in_src'][rows]],
+            'in_rank': transfers['in_rank'][rows]
+        }
+    else:
+        predecessors = predecessor_arrays(edge_arrays, G)
+        rows, in_indptr = csr_rows(predecessors['in_indptr'], node_ids)
+        payload['in_indptr'] = in_indptr
+        payload['in_src'] = local[predecessors['in_src'][rows]]
+    return pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+class ComponentScores:
+    """Score lookup for pool workers: batch weighted scores, no reasoning (the parent resolves it)"""
+    def __init__(self, nodes, scores):
+        self.scores = dict(zip(nodes, scores.tolist()))
+
+    def get(self, node):
+        return self.scores.get(node, 0.0), None
+
+def trace_component_backward(blob, targets):
+    """
+    Process-pool task: backward provenance for one part of the targets of a
+    component batch (blob from component_task_payload). Returns {'results':
+    [(target, paths, trace_info)], 'completed', 'exhausted'}: like the in-process
+    loop, the target being traced when the deadline passes keeps its partial
+    paths but does not count as completed.
+    """
+    payload = pickle.loads(blob)
+    nodes = payload['nodes']
+    scores = ComponentScores(nodes, payload['scores'])
+    terminal = set(payload['terminal'])
+    deadline = payload.get('deadline')
+    budget = DetectionBudget('provenance_backward', seconds=deadline - time.time()) if deadline else None
+    
+    if payload['temporal']:
+        G = None
+        arrays = {'nodes': nodes, 'index': {node: i for i, node in enumerate(nodes)},
+                  'transfers': payload['transfers']}
+    else:
+        # Edges grouped by receiver in predecessor order rebuild the same parent order
+        G = nx.DiGraph()
+        G.add_nodes_from(nodes)
+        receivers = np.repeat(np.arange(len(nodes)), np.diff(payload['in_indptr']))
+        G.add_edges_from((nodes[s], nodes[d]) for s, d in zip(payload['in_src'].tolist(), receivers.tolist()))
+        arrays = None
+    
+    results, completed = [], 0
+    for target in targets:
+        if budget is not None and budget.exhausted:
+            break
+        trace_info = {}
+        if payload['temporal']:
+            paths = trace_provenance_backward_temporal(G, target, max_hops=payload['max_hops'], budget=budget,
+                                                       score_cache=scores, edge_arrays=arrays,
+                                                       node_limit=payload['node_limit'], trace_info=trace_info,
+                                                       terminal=terminal)
+        else:
+            paths = trace_provenance_backward(G, target, max_hops=payload['max_hops'], budget=budget,
+                                              score_cache=scores, node_limit=payload['node_limit'],
+                                              trace_info=trace_info, terminal=terminal)
+        for path_info in paths:
+            path_info.pop('mixer_reasoning', None)
+        results.append((target, paths, trace_info))
+        if budget is None or not budget.exhausted:
+            completed += 1
+    
+    return {'results': results, 'completed': completed, 'exhausted': budget is not None and budget.exhausted}
+
+def get_component_executor():
+    """Process pool shared by all analyses (spawned workers: safe next to the server's threads)"""
+    global component_executor
+    with component_executor_lock:
+        if component_executor is None:
+            component_executor = ProcessPoolExecutor(max_workers=COMPONENT_WORKERS,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+        return component_executor
+
+def discard_component_executor(executor):
+    """Forget a broken pool so the next analysis starts a new one"""
+    global component_executor
+    with component_executor_lock:
+        if component_executor is executor:
+            component_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def trace_backward_by_component(G, targets, edge_arrays, score_cache, max_hops=MAX_HOPS, budget=None,
+                                temporal=TEMPORAL_PROVENANCE, node_limit=PROVENANCE_FRONTIER_LIMIT,
+                                terminal=None, component_stats=None):
+    """
+    Backward provenance for many targets, one pool task per part of a component
+    batch (each batch's payload is built and pickled once)
+    Returns {target: (paths, trace_info)} for the targets traced; mixer scores in
+    the paths come from score_cache, like the in-process tracers. Completed
+    targets are counted on the budget.
+    component_stats: optional dict filled with the partition and task counts
+    """
+    labels = weakly_connected_labels(G, edge_arrays)
+    index = edge_arrays['index']
+    target_ids = np.array([index[target] for target in targets], dtype=np.int64)
+    tasks = plan_component_tasks(labels, target_ids)
+    
+    scores = np.array(score_cache.batch_scores['weighted_scores'], dtype=np.float64)
+    is_terminal = terminal_mask(edge_arrays, terminal)
+    if budget is not None:
+        budget.start()
+    options = {'max_hops': max_hops, 'node_limit': node_limit,
+               'deadline': budget.deadline if budget is not None else None}
+    
+    executor = get_component_executor()
+    futures = {}
+    traced = {}
+    try:
+        for node_ids, parts in tasks:
+            blob = component_task_payload(G, edge_arrays, node_ids, scores, is_terminal, temporal, **options)
+            for part in parts:
+                futures[executor.submit(trace_component_backward, blob,
+                                        [edge_arrays['nodes'][i] for i in part])] = len(futures)
+        
+        for future in as_completed(futures):
+            outcome = future.result()
+            if budget is not None:
+                budget.completed += outcome['completed']
+                budget.exhausted = budget.exhausted or outcome['exhausted']
+            for target, paths, trace_info in outcome['results']:
+                for path_info in paths:
+                    path_info['mixer_score'] = score_cache.get(path_info['mixer'])[0]
+                traced[target] = (paths, trace_info)
+    except BaseException as e:
+        # The caller retraces every target in-process: drop the chunks still queued
+        for future in futures:
+            future.cancel()
+        if isinstance(e, BrokenProcessPool):
+            discard_component_executor(executor)
+        raise
+    
+    if component_stats is not None:
+        component_stats.update({
+            'components': int(labels.max()) + 1 if len(labels) else 0,
+            'largest_component': int(np.bincount(labels).max()) if len(labels) else 0,
+            'components_traced': int(len(np.unique(labels[target_ids]))),
+            'batches': len(tasks),
+            'tasks': len(futures),
+            'workers': COMPONENT_WORKERS
+        })
+    return traced
+
+def component_features_task(blob):
+    """Process-pool task: heuristic_features over one component batch's edges"""
+    return heuristic_features(**pickle.loads(blob))
+
+def heuristic_features_by_component(G, edge_arrays):
+    """
+    heuristic_features computed per component batch on the process pool, about
+    one batch per worker, rows merged back in node order. Renumbering keeps
+    wallet and edge order, so the rows are bit-identical to the whole-graph pass.
+    Returns None when the graph is a single batch (nothing to split).
+    """
+    labels = weakly_connected_labels(G, edge_arrays)
+    n = len(labels)
+    batches = plan_component_batches(labels, np.arange(labels.max() + 1 if n else 0),
+                                     batch_nodes=-(-n // COMPONENT_WORKERS))
+    if len(batches) < 2:
+        return None
+    
+    src, dst = edge_arrays['src'], edge_arrays['dst']
+    edge_labels = labels[src]
+    features = np.zeros((n, len(FEATURE_NAMES)))
+    executor = get_component_executor()
+    futures = {}
+    try:
+        for components in batches:
+            node_ids = np.flatnonzero(np.isin(labels, components))
+            edges = np.flatnonzero(np.isin(edge_labels, components))
+            local = np.full(n, -1, dtype=np.int64)
+            local[node_ids] = np.arange(len(node_ids))
+            payload = {'src': local[src[edges]], 'dst': local[dst[edges]],
+                       'amounts': edge_arrays['amounts'][edges], 'currencies': edge_arrays['currencies'][edges],
+                       'has_time': edge_arrays['has_time'][edges], 'time_us': edge_arrays['time_us'][edges],
+                       'n': len(node_ids)}
+            blob = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+            futures[executor.submit(component_features_task, blob)] = node_ids
+        for future in as_completed(futures):
+            features[futures[future]] = future.result()
+    except BaseException as e:
+        for future in futures:
+            future.cancel()
+        if isinstance(e, BrokenProcessPool):
+            discard_component_executor(executor)
+        raise
+    return features
+
+# ---------- Taint Propagation ----------
+
+TAINT_MODES = ('haircut', 'poison')
+
+def propagate_taint(edge_arrays, mixers, max_hops=MAX_HOPS, mode='haircut'):
+    """
+    Mixer-origin exposure for every wallet, one sparse mat-vec per hop
+    haircut: each wallet's taint is the value-weighted share of its inflow that
+             comes from tainted wallets (mixers pinned at 1.0)
+    poison:  any inflow from a tainted wallet taints fully (1.0)
+    Cost is O(max_hops × edges), independent of how many paths exist.
+    """
+    if mode not in TAINT_MODES:
+        raise ValueError(f"Unknown taint mode: {mode}")
+    
+    index = edge_arrays['index']
+    src, dst = edge_arrays['src'], edge_arrays['dst']
+    n = len(edge_arrays['nodes'])
+    
+    seeds = np.array([index[m] for m in mixers if m in index], dtype=np.int64)
+    taint = np.zeros(n)
+    taint[seeds] = 1.0
+    
+    # Row-normalized inflow weights: share of each receiver's inflow per edge
+    amounts = np.clip(edge_arrays['amounts'], 0, None)
+    inflow = np.bincount(dst, weights=amounts, minlength=n)
+    share = np.divide(amounts, inflow[dst], out=np.zeros(len(amounts)), where=inflow[dst] > 0)
+    
+    for _ in range(max_hops):
+        if mode == 'haircut':
+            updated = np.bincount(dst, weights=share * taint[src], minlength=n)
+        else:
+            updated = (np.bincount(dst, weights=taint[src], minlength=n) > 0).astype(np.float64)
+        updated = np.minimum(updated, 1.0)
+        updated[seeds] = 1.0
+        if np.array_equal(updated, taint):
+            break
+        taint = updated
+    
+    return taint
+
+def calculate_taint_exposure(G, mixer_candidates, max_hops=MAX_HOPS, edge_arrays=None):
+    """Haircut and poison taint per wallet: {'index', 'haircut', 'poison'}"""
+    arrays = edge_arrays or build_edge_arrays(G)
+    return {
+        'index': arrays['index'],
+        'haircut': propagate_taint(arrays, mixer_candidates, max_hops=max_hops, mode='haircut'),
+        'poison': propagate_taint(arrays, mixer_candidates, max_hops=max_hops, mode='poison')
+    }
+
+# ---------- Reachability Index ----------
+
+def graph_fingerprint(edge_arrays):
+    """Version id of a graph (nodes + edges), used to tell stale indexes apart"""
+    digest = hashlib.sha1()
+    digest.update('\n'.join(edge_arrays['nodes']).encode())
+    digest.update(edge_arrays['src'].tobytes())
+    digest.update(edge_arrays['dst'].tobytes())
+    return digest.hexdigest()
+
+class MixerReachabilityIndex:
+    """
+    Which mixers reach each wallet within k hops, and at what distance
+    reach[h] holds one bitset per wallet (bit j = mixer j reaches it in <= h hops),
+    so a single-wallet check is a lookup instead of a graph/Neo4j traversal.
+    temporal: reach follows time-respecting paths only, like the provenance tracers
+    with TEMPORAL_PROVENANCE.
+    Built once per graph version; save/load round-trips through a .npz file.
+    """
+    MIXER_INFO_FIELDS = ['score', 'fan_in', 'fan_out']
+    TEMPORAL_BLOCK = 64  # mixers relaxed together by the temporal build (multiple of 8)
+
+    def __init__(self, nodes, mixers, mixer_info, reach, version, built_at=None, temporal=False):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.mixers = list(mixers)
+        self.mixer_info = mixer_info  # float matrix, columns = MIXER_INFO_FIELDS
+        self.reach = reach
+        self.max_hops = reach.shape[0] - 1
+        self.version = version
+        self.built_at = built_at or datetime.now().isoformat()
+        self.registry_types = None  # registry mixer label per mixer, resolved on first lookup
+        self.temporal = temporal
+
+    @classmethod
+    def build(cls, G, mixer_candidates, max_hops=MAX_HOPS, edge_arrays=None, terminal=None,
+              temporal=TEMPORAL_PROVENANCE):
+        """
+        mixer_candidates: {address: {'score', 'reasoning'}} as built by the pipeline
+        terminal: addresses (hubs) that are reached but do not pass reach on
+        temporal: index time-respecting reachability (see temporal_reach)
+        """
+        arrays = edge_arrays or build_edge_arrays(G)
+        nodes, index = arrays['nodes'], arrays['index']
+        src, dst = arrays['src'], arrays['dst']
+        mixers = [m for m in mixer_candidates if m in index]
+        n_bytes = max(1, (len(mixers) + 7) // 8)
+        
+        reach = np.zeros((max_hops + 1, len(nodes), n_bytes), dtype=np.uint8)
+        mixer_ids = np.arange(len(mixers))
+        rows = np.array([index[m] for m in mixers], dtype=np.int64)
+        np.bitwise_or.at(reach[0], (rows, mixer_ids // 8), (0x80 >> (mixer_ids % 8)).astype(np.uint8))
+        
+        if temporal:
+            cls.temporal_reach(reach, G, arrays, rows, terminal)
+        else:
+            # Within h hops = within h-1 hops, or a predecessor was within h-1 hops
+            order = np.argsort(dst, kind='stable')
+            sorted_src, sorted_dst = src[order], dst[order]
+            group_starts = np.flatnonzero(np.r_[True, sorted_dst[1:] != sorted_dst[:-1]])
+            from_terminal = terminal_mask(arrays, terminal)[sorted_src]
+            for h in range(1, max_hops + 1):
+                reach[h] = reach[h - 1]
+                if len(order):
+                    relayed = reach[h - 1][sorted_src]
+                    relayed[from_terminal] = 0
+                    incoming = np.bitwise_or.reduceat(relayed, group_starts, axis=0)
+                    reach[h][sorted_dst[group_starts]] |= incoming
+        
+        mixer_info = np.array([
+            [
+                mixer_candidates[m]['score'],
+                mixer_candidates[m]['reasoning'].get('heuristics', {}).get('fan_in', {}).get('value', 0),
+                mixer_candidates[m]['reasoning'].get('heuristics', {}).get('fan_out', {}).get('value', 0)
+            ]
+            for m in mixers
+        ], dtype=np.float64).reshape(len(mixers), len(cls.MIXER_INFO_FIELDS))
+        
+        return cls(nodes, mixers, mixer_info, reach, graph_fingerprint(arrays), temporal=temporal)
+
+    @classmethod
+    def temporal_reach(cls, reach, G, arrays, rows, terminal):
+        """
+        Fill reach[1:] from time-respecting paths: earliest arrival per (wallet,
+        mixer) within h hops, relaxed once per hop over the individual transfers
+        (build_transfer_arrays). A transfer passes a mixer's funds on when it
+        happens at or after they arrived; mixers send at any time, like
+        trace_provenance_multi_source_temporal. Mixers go TEMPORAL_BLOCK at a
+        time to keep the arrival matrix small.
+        """
+        transfers = build_transfer_arrays(arrays, G)
+        n = len(arrays['nodes'])
+        receivers = np.repeat(np.arange(n), np.diff(transfers['in_indptr']))
+        relaying = ~terminal_mask(arrays, terminal)[transfers['in_src']]
+        senders, ranks = transfers['in_src'][relaying], transfers['in_rank'][relaying][:, None]
+        receivers = receivers[relaying]
+        group_starts = np.flatnonzero(np.r_[True, receivers[1:] != receivers[:-1]]) if len(receivers) else receivers
+        group_receivers = receivers[group_starts]
+        unreached = transfers['n_ranks'] + 1
+        
+        for first in range(0, len(rows), cls.TEMPORAL_BLOCK):
+            block = rows[first:first + cls.TEMPORAL_BLOCK]
+            arrival = np.full((n, len(block)), unreached, dtype=np.int64)
+            arrival[block, np.arange(len(block))] = 0
+            byte_slice = slice(first // 8, first // 8 + (len(block) + 7) // 8)
+            for h in range(1, reach.shape[0]):
+                if len(senders):
+                    relayed = np.where(arrival[senders] <= ranks, ranks, unreached)
+                    earliest = np.minimum.reduceat(relayed, group_starts, axis=0)
+                    arrival[group_receivers] = np.minimum(arrival[group_receivers], earliest)
+                reach[h][:, byte_slice] = np.packbits(arrival < unreached, axis=1)
+
+    def lookup(self, wallet):
+        """
+        Mixers reaching wallet within max_hops, nearest first then highest score
+        Returns None when the wallet is not in the indexed graph
+        """
+        i = self.index.get(wallet)
+        if i is None:
+            i = self.index.get(wallet.lower())
+        if i is None:
+            return None
+        
+        within = np.unpackbits(self.reach[:, i, :], axis=1)[:, :len(self.mixers)].astype(bool)
+        reached = np.flatnonzero(within[-1])
+        distances = within[:, reached].argmax(axis=0)
+        if self.registry_types is None:
+            registry = get_address_registry()
+            self.registry_types = registry.mixer_types(registry.find(self.mixers))
+        
+        exposures = []
+        for j, distance in zip(reached, distances):
+            exposures.append({
+                'mixer': self.mixers[j],
+                'distance': int(distance),
+                'mixer_score': float(self.mixer_info[j, 0]),
+                'fan_in': int(self.mixer_info[j, 1]),
+                'fan_out': int(self.mixer_info[j, 2]),
+                'mixer_type': self.registry_types[j]
+            })
+        exposures.sort(key=lambda e: (e['distance'], -e['mixer_score']))
+        return exposures
+
+    def save(self, filename):
+        np.savez_compressed(
+            filename,
+            nodes=np.array(self.nodes),
+            mixers=np.array(self.mixers),
+            mixer_info=self.mixer_info,
+            reach=self.reach,
+            version=np.array(self.version),
+            built_at=np.array(self.built_at),
+            temporal=np.array(self.temporal)
+        )
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            return cls(data['nodes'].tolist(), data['mixers'].tolist(), data['mixer_info'],
+                       data['reach'], str(data['version']), str(data['built_at']),
+                       bool(data['temporal']) if 'temporal' in data else False)
+
+def reachability_index_path(token_address):
+    return os.path.join(REACHABILITY_INDEX_DIR, f"{token_address.lower()}.npz")
+
+def save_reachability_index(token_address, reach_index):
+    """Keep the latest index for a token in memory and on disk"""
+    reachability_indexes[token_address.lower()] = reach_index
+    try:
+        os.makedirs(REACHABILITY_INDEX_DIR, exist_ok=True)
+        reach_index.save(reachability_index_path(token_address))
+    except Exception as e:
+        print(f"⚠️  Could not save reachability index for {token_address}: {e}")
+
+def get_reachability_index(token_address):
+    """Latest index for a token (memory, then disk), or None if never analyzed"""
+    key = token_address.lower()
+    if key not in reachability_indexes:
+        path = reachability_index_path(token_address)
+        if not os.path.exists(path):
+            return None
+        try:
+            reachability_indexes[key] = MixerReachabilityIndex.load(path)
+        except Exception as e:
+            print(f"⚠️  Could not load reachability index {path}: {e}")
+            return None
+    return reachability_indexes[key]
+
+# ---------- Heuristic Feature Cache ----------
+
+class HeuristicFeatureCache:
+    """
+    Raw per-node heuristic features of one analysis (columns = FEATURE_NAMES),
+    with the known-mixer / hub flags, the edges and the analysis' candidates and
+    exposed wallets. Scores under other weights are one mat-vec away, and the
+    forward exposure of a new candidate set one vectorized traversal away.
+    save/load round-trips through a .npz file.
+    """
+    TRANSFER_FIELDS = ['out_keys', 'out_indptr', 'out_src', 'out_dst', 'out_rank']
+
+    def __init__(self, nodes, features, known, hubs, src, dst, mixers, exposed, settings,
+                 transfers=None, version=None, built_at=None):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.features = features
+        self.known = known
+        self.hubs = hubs
+        self.src = src
+        self.dst = dst
+        self.mixers = list(mixers)
+        self.exposed = exposed
+        self.settings = settings  # weights, threshold, max_hops, temporal of the analysis
+        self.transfers = transfers
+        self.version = version
+        self.built_at = built_at or datetime.now().isoformat()
+
+    @classmethod
+    def build(cls, batch_scores, edge_arrays, mixer_candidates, provenance_map, max_hops=MAX_HOPS,
+              temporal=TEMPORAL_PROVENANCE, partial=False):
+        """
+        The baseline candidates are every wallet at or above the threshold in
+        batch_scores, not only the ones a budget let the analysis score: when
+        the analysis stopped short (partial, or candidates missing) the baseline
+        exposure is re-traversed from that full set instead of taken from
+        provenance_map
+        """
+        index = batch_scores['index']
+        weighted = batch_scores['weighted_scores']
+        mixer_ids = np.flatnonzero(weighted >= MIXER_SCORE_THRESHOLD)
+        mixer_ids = mixer_ids[np.argsort(-weighted[mixer_ids], kind='stable')]
+        mixers = [batch_scores['nodes'][i] for i in mixer_ids]
+        exposed = np.zeros(len(batch_scores['nodes']), dtype=bool)
+        exposed[[index[wallet] for wallet in provenance_map if wallet in index]] = True
+        transfers = edge_arrays.get('transfers')
+        if transfers is not None:
+            transfers = {'n_ranks': transfers['n_ranks'], 'key_base': transfers['key_base'],
+                         **{field: transfers[field] for field in cls.TRANSFER_FIELDS}}
+        settings = {
+            'weights': dict(WEIGHTS),
+            'threshold': MIXER_SCORE_THRESHOLD,
+            'max_hops': max_hops,
+            'temporal': bool(temporal and transfers is not None),
+            'partial_results': bool(partial)
+        }
+        cache = cls(batch_scores['nodes'], batch_scores['features'], batch_scores['known_mixers'],
+                    batch_scores['hubs'], edge_arrays['src'], edge_arrays['dst'], mixers,
+                    exposed, settings, transfers, graph_fingerprint(edge_arrays))
+        if partial or set(mixers) != set(mixer_candidates):
+            cache.exposed = cache.trace_exposure(mixers)
+        return cache
+
+    def weighted_scores(self, weights):
+        """
+        Weighted mixer score per node under `weights`, summed like
+        calculate_mixer_scores_batch, with the same Tornado boost, activity
+        floor, known-mixer and hub rules
+        """
+        column = {name: self.features[:, i] for i, name in enumerate(FEATURE_NAMES)}
+        scores = weighted_heuristic_score(heuristic_score_matrix(self.features), weights)
+        
+        boosted = column['tornado_matches'] > 0
+        scores[boosted] = np.minimum(1.0, scores[boosted] + 0.2)
+        scores[(column['fan_in'] + column['fan_out']) < MIN_TX_COUNT] = 0.0
+        scores[self.known] = 1.0
+        scores[self.hubs] = 0.0
+        return scores
+
+    def trace_exposure(self, mixers, max_hops=None):
+        """Wallets reached from `mixers` (strongest first) by the analysis' forward traversal"""
+        arrays = {'nodes': self.nodes, 'index': self.index, 'src': self.src, 'dst': self.dst}
+        hubs = [self.nodes[i] for i in np.flatnonzero(self.hubs)]
+        max_hops = max_hops or self.settings['max_hops']
+        if self.settings['temporal']:
+            arrays['transfers'] = self.transfers
+            labels = trace_provenance_multi_source_temporal(None, mixers, max_hops=max_hops,
+                                                            edge_arrays=arrays, terminal=hubs)
+        else:
+            labels = trace_provenance_multi_source(None, mixers, max_hops=max_hops,
+                                                   edge_arrays=arrays, terminal=hubs)
+        return exposure_labels(labels)[0] > 0
+
+    def save(self, filename):
+        transfers = self.transfers or {}
+        np.savez_compressed(
+            filename,
+            nodes=np.array(self.nodes),
+            features=self.features,
+            known=self.known,
+            hubs=self.hubs,
+            src=self.src,
+            dst=self.dst,
+            mixers=np.array(self.mixers),
+            exposed=self.exposed,
+            settings=np.array(json.dumps(self.settings)),
+            transfer_meta=np.array(json.dumps({k: int(transfers[k]) for k in ('n_ranks', 'key_base') if k in transfers})),
+            **{f"transfer_{field}": transfers[field] for field in self.TRANSFER_FIELDS if field in transfers},
+            version=np.array(self.version),
+            built_at=np.array(self.built_at)
+        )
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            transfers = json.loads(str(data['transfer_meta'])) or None
+            if transfers is not None:
+                transfers.update({field: data[f"transfer_{field}"] for field in cls.TRANSFER_FIELDS})
+            return cls(data['nodes'].tolist(), data['features'], data['known'], data['hubs'],
+                       data['src'], data['dst'], data['mixers'].tolist(), data['exposed'],
+                       json.loads(str(data['settings'])), transfers, str(data['version']), str(data['built_at']))
+
+def feature_cache_path(token_address):
+    return os.path.join(FEATURE_CACHE_DIR, f"{token_address.lower()}.npz")
+
+def save_feature_cache(token_address, cache):
+    """Keep the latest feature cache for a token in memory and on disk"""
+    feature_caches[token_address.lower()] = cache
+    try:
+        os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+        cache.save(feature_cache_path(token_address))
+    except Exception as e:
+        print(f"⚠️  Could not save feature cache for {token_address}: {e}")
+
+def get_feature_cache(token_address):
+    """Latest feature cache for a token (memory, then disk), or None if never analyzed"""
+    key = token_address.lower()
+    if key not in feature_caches:
+        path = feature_cache_path(token_address)
+        if not os.path.exists(path):
+            return None
+        try:
+            feature_caches[key] = HeuristicFeatureCache.load(path)
+        except Exception as e:
+            print(f"⚠️  Could not load feature cache {path}: {e}")
+            return None
+    return feature_caches[key]
+
+def resolve_rescoring_weights(weights, base):
+    """`base` weights overridden by `weights` ({heuristic: weight}); raises ValueError if invalid"""
+    if weights is None:
+        return dict(base)
+    if not isinstance(weights, dict):
+        raise ValueError(f"weights must map heuristics ({', '.join(HEURISTIC_NAMES)}) to numbers")
+    unknown = sorted(set(weights) - set(HEURISTIC_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown heuristics: {', '.join(unknown)} (expected {', '.join(HEURISTIC_NAMES)})")
+    resolved = dict(base)
+    for name, weight in weights.items():
+        try:
+            resolved[name] = float(weight)
+        except (TypeError, ValueError):
+            raise ValueError(f"Weight of {name} must be a number")
+        if resolved[name] < 0:
+            raise ValueError(f"Weight of {name} must not be negative")
+    return resolved
+
+def rescore_analysis(token_address, weights=None, threshold=None, limit=50):
+    """
+    Mixer candidates and forward exposure of an analyzed token under other
+    heuristic weights and/or score threshold, from its feature cache (no fetch,
+    no graph rebuild). The exposure is only re-traversed when the candidate set
+    changes. Backward paths and the reachability index keep the analysis' own
+    candidates until the token is analyzed again.
+    Returns None if the token has no feature cache; raises ValueError for
+    invalid weights or threshold.
+    """
+    cache = get_feature_cache(token_address)
+    if cache is None:
+        return None
+    
+    weights = resolve_rescoring_weights(weights, cache.settings['weights'])
+    threshold = cache.settings['threshold'] if threshold is None else threshold
+    try:
+        threshold = float(threshold)
+    except (TypeError, ValueError):
+        raise ValueError("threshold must be a number")
+    if not 0.0 <= threshold <= 1.0:
+        raise ValueError("threshold must be between 0 and 1")
+    
+    start_time = time.time()
+    scores = cache.weighted_scores(weights)
+    candidate_ids = np.flatnonzero(scores >= threshold)
+    candidate_ids = candidate_ids[np.argsort(-scores[candidate_ids], kind='stable')]
+    mixers = [cache.nodes[i] for i in candidate_ids]
+    
+    candidates, previous = set(mixers), set(cache.mixers)
+    added = [mixer for mixer in mixers if mixer not in previous]
+    removed = [mixer for mixer in cache.mixers if mixer not in candidates]
+    
+    changed = bool(added or removed)
+    exposed = cache.trace_exposure(mixers) if changed else cache.exposed
+    newly_exposed = np.flatnonzero(exposed & ~cache.exposed)
+    no_longer_exposed = np.flatnonzero(cache.exposed & ~exposed)
+    
+    def describe(mixer):
+        return {'address': mixer, 'score': round(float(scores[cache.index[mixer]]), 4)}
+    
+    return {
+        'token_address': token_address,
+        'weights': weights,
+        'threshold': threshold,
+        'analysis': {
+            'built_at': cache.built_at,
+            'graph_version': cache.version,
+            **cache.settings,
+            # A budget-cut analysis: the baseline below is the full candidate set,
+            # its own provenance covered only part of it
+            'partial_results': bool(cache.settings.get('partial_results', False))
+        },
+        'mixer_candidates': {
+            'total': len(mixers),
+            'previous_total': len(cache.mixers),
+            'added': [describe(mixer) for mixer in added[:limit]],
+            'removed': [describe(mixer) for mixer in removed[:limit]],
+            'top': [describe(mixer) for mixer in mixers[:limit]]
+        },
+        'exposure': {
+            'wallets_exposed': int(exposed.sum()),
+            'previously_exposed': int(cache.exposed.sum()),
+            'newly_exposed': len(newly_exposed),
+            'no_longer_exposed': len(no_longer_exposed),
+            'newly_exposed_wallets': [cache.nodes[i] for i in newly_exposed[:limit]],
+            'no_longer_exposed_wallets': [cache.nodes[i] for i in no_longer_exposed[:limit]],
+            're_traversed': changed
+        },
+        # Only candidates and forward exposure are re-derived here
+        'stale': {
+            'backward_provenance': changed,
+            'reachability_index': changed,
+            'message': ("Backward provenance paths and the reachability index (explain_provenance) "
+                        "still use the analysis' own candidates; analyze the token again to rebuild them")
+                       if changed else None
+        },
+        'rescoring_seconds': round(time.time() - start_time, 4)
+    }
+
 # ---------- Graph Building ----------
 
 def build_complete_graph(transactions):
@@ -962,7 +3460,8 @@ def build_complete_graph(transactions):
             edge_data = {
                 'amount': tx['amount'],
                 'timestamp': tx['timestamp'],
-                'parsed_time': tx['parsed_time'],
+                'time_us': tx['time_us'],
+                'times_us': [tx['time_us']],
                 'currency': tx['currency'],
                 'count': 1
             }
@@ -975,6 +3474,7 @@ def build_complete_graph(transactions):
                 if 'timestamps' not in G[s][r]:
                     G[s][r]['timestamps'] = []
                 G[s][r]['timestamps'].append(tx['timestamp'])
+                G[s][r]['times_us'].append(tx['time_us'])
             else:
                 G.add_edge(s, r, **edge_data)
                 G[s][r]['timestamps'] = [tx['timestamp']]
@@ -986,141 +3486,193 @@ def build_complete_graph(transactions):
 
 # ---------- Neo4j Persistence ----------
 
-def persist_complete_provenance(mixer_candidates, provenance_map, token_address):
+def persist_complete_provenance(mixer_candidates, provenance_map, token_address, run_id=None):
     """
     Persist complete provenance to Neo4j with ALL required fields
+    Mixers and FUNDED edges are written as UNWIND batches (paths as native lists);
+    a (:ProvenanceRun) node marks whether the token's provenance is fully written
+    Returns the run status: 'complete' (every batch written), 'incomplete' (some
+    batches failed) or 'failed'
     """
+    run_id = run_id or f"{token_address.lower()}-{int(time.time() * 1000)}"
+    
     try:
-        timestamp = int(time.time() * 1000)
         detected_at = datetime.utcnow().isoformat()
         
         with driver.session() as session:
+            session.run("""
+                MERGE (run:ProvenanceRun {token_address: $token_address})
+                SET run.run_id = $run_id,
+                    run.status = 'writing',
+                    run.started_at = $started_at
+            """, token_address=token_address, run_id=run_id, started_at=detected_at).consume()
+            
             # Clear previous results for this token
             session.run("""
                 MATCH (m:Mixer)-[f:FUNDED]->(w:Wallet)
                 WHERE f.token_address = $token_address
                 DELETE f
-            """, token_address=token_address)
-            
-            # Create Mixer nodes with ALL details
-            for mixer_addr, mixer_data in mixer_candidates.items():
-                score = mixer_data['score']
-                reasoning = mixer_data['reasoning']
-                
-                fan_in = reasoning.get('heuristics', {}).get('fan_in', {}).get('value', 0)
-                fan_out = reasoning.get('heuristics', {}).get('fan_out', {}).get('value', 0)
-                uniform_score = reasoning.get('heuristics', {}).get('uniform_denominations', {}).get('score', 0)
-                temporal_score = reasoning.get('heuristics', {}).get('temporal_randomness', {}).get('score', 0)
-                tornado_matches = reasoning.get('heuristics', {}).get('uniform_denominations', {}).get('tornado_matches', 0)
-                
-                # Check if known mixer
-                known_mixer = detect_direct_mixer_addresses(mixer_addr)
-                if known_mixer['is_mixer']:
-                    mixer_type = known_mixer['mixer_type']
-                else:
-                    mixer_type = "Behavioral detection"
-                
-                session.run("""
-                    MERGE (m:Mixer {address: $address})
-                    SET m.mixer_score = $score,
-                        m.detected_at = $detected_at,
-                        m.token_address = $token_address,
-                        m.fan_in = $fan_in,
-                        m.fan_out = $fan_out,
-                        m.uniform_score = $uniform_score,
-                        m.temporal_score = $temporal_score,
-                        m.tornado_matches = $tornado_matches,
-                        m.mixer_type = $mixer_type,
-                        m.reasoning = $reasoning
-                """, 
-                address=mixer_addr,
-                score=score,
-                detected_at=detected_at,
-                token_address=token_address,
-                fan_in=fan_in,
-                fan_out=fan_out,
-                uniform_score=uniform_score,
-                temporal_score=temporal_score,
-                tornado_matches=tornado_matches,
-                mixer_type=mixer_type,
-                reasoning=json.dumps(reasoning, cls=DateTimeEncoder)
-                )
-            
-            # Create FUNDED relationships with ALL provenance details
-            for wallet_addr, provenance_paths in provenance_map.items():
-                for path_info in provenance_paths:
-                    mixer_addr = path_info['mixer']
-                    hops = path_info['hops']
-                    path = path_info['path']
-                    direction = path_info['direction']
-                    
-                    # Get mixer score if available
-                    mixer_score = path_info.get('mixer_score', 0.0)
-                    
-                    session.run("""
-                        MATCH (m:Mixer {address: $mixer_addr})
-                        MERGE (w:Wallet {address: $wallet_addr})
-                        MERGE (m)-[f:FUNDED]->(w)
-                        SET f.hops = $hops,
-                            f.direction = $direction,
-                            f.path = $path,
-                            f.detected_at = $detected_at,
-                            f.token_address = $token_address,
-                            f.score = $mixer_score
-                    """,
-                    mixer_addr=mixer_addr,
-                    wallet_addr=wallet_addr,
-                    hops=hops,
-                    direction=direction,
-                    path=str(path),
-                    detected_at=detected_at,
-                    token_address=token_address,
-                    mixer_score=mixer_score
-                    )
+            """, token_address=token_address).consume()
+        
+        # Create Mixer nodes with ALL details
+        mixer_rows = []
+        for mixer_addr, mixer_data in mixer_candidates.items():
+            reasoning = mixer_data['reasoning']
+            heuristics = reasoning.get('heuristics', {})
             
+            mixer_rows.append({
+                'address': mixer_addr,
+                'score': mixer_data['score'],
+                'fan_in': heuristics.get('fan_in', {}).get('value', 0),
+                'fan_out': heuristics.get('fan_out', {}).get('value', 0),
+                'uniform_score': heuristics.get('uniform_denominations', {}).get('score', 0),
+                'temporal_score': heuristics.get('temporal_randomness', {}).get('score', 0),
+                'tornado_matches': heuristics.get('uniform_denominations', {}).get('tornado_matches', 0),
+                'mixer_type': known_mixer_type(mixer_data) or "Behavioral detection",
+                'reasoning': json.dumps(reasoning, cls=DateTimeEncoder)
+            })
+        
+        failures = []
+        run_write_batches("""
+            UNWIND $batch AS row
+            MERGE (m:Mixer {address: row.address})
+            SET m.mixer_score = row.score,
+                m.detected_at = $detected_at,
+                m.token_address = $token_address,
+                m.fan_in = row.fan_in,
+                m.fan_out = row.fan_out,
+                m.uniform_score = row.uniform_score,
+                m.temporal_score = row.temporal_score,
+                m.tornado_matches = row.tornado_matches,
+                m.mixer_type = row.mixer_type,
+                m.reasoning = row.reasoning
+        """, mixer_rows, failures=failures, detected_at=detected_at, token_address=token_address)
+        
+        # Create FUNDED relationships with ALL provenance details
+        funded_rows = [
+            {
+                'mixer_addr': path_info['mixer'],
+                'wallet_addr': wallet_addr,
+                'hops': path_info['hops'],
+                'direction': path_info['direction'],
+                'path': list(path_info['path']),
+                'mixer_score': path_info.get('mixer_score', 0.0)
+            }
+            for wallet_addr, provenance_paths in provenance_map.items()
+            for path_info in provenance_paths
+            if path_info['mixer'] in mixer_candidates  # no Mixer node for the others
+        ]
+        
+        funded_count = run_write_batches("""
+            UNWIND $batch AS row
+            MATCH (m:Mixer {address: row.mixer_addr})
+            MERGE (w:Wallet {address: row.wallet_addr})
+            MERGE (m)-[f:FUNDED]->(w)
+            SET f.hops = row.hops,
+                f.direction = row.direction,
+                f.path = row.path,
+                f.detected_at = $detected_at,
+                f.token_address = $token_address,
+                f.score = row.mixer_score
+            RETURN count(f) AS written
+        """, funded_rows, failures=failures, detected_at=detected_at, token_address=token_address)
+        
+        # Complete only if every batch went through (a failed Mixer batch also
+        # leaves its FUNDED rows unmatched, hence the created-edge count)
+        status = 'complete' if not failures and funded_count == len(funded_rows) else 'incomplete'
+        with driver.session() as session:
+            session.run("""
+                MATCH (run:ProvenanceRun {token_address: $token_address, run_id: $run_id})
+                SET run.status = $status,
+                    run.completed_at = $completed_at,
+                    run.mixers = $mixers,
+                    run.funded_edges = $funded_edges,
+                    run.funded_rows = $funded_rows,
+                    run.failed_batches = $failed_batches
+            """, token_address=token_address, run_id=run_id, status=status,
+            completed_at=datetime.utcnow().isoformat(), mixers=len(mixer_rows), funded_edges=funded_count,
+            funded_rows=len(funded_rows), failed_batches=len(failures)).consume()
+        
+        if status == 'complete':
             print(f"✅ Persisted {len(mixer_candidates)} mixers and {len(provenance_map)} funded wallets")
+        else:
+            print(f"⚠️  Provenance for {token_address} incomplete: {funded_count}/{len(funded_rows)} FUNDED edges, {len(failures)} failed batches")
+        return status
     except Exception as e:
         print(f"Error persisting provenance: {e}")
         traceback.print_exc()
+        return 'failed'
 
-# ---------- Main Detection Function ----------
+def persist_provenance_in_background(mixer_candidates, provenance_map, token_address):
+    """
+    Run persist_complete_provenance off the request path; progress is tracked in
+    persistence_runs[token] (and by the ProvenanceRun node in Neo4j)
+    Writes for one token are serialized: a run waits for the previous one, and a
+    run superseded by a newer analysis while waiting is skipped. The threads are
+    not daemons, so the process waits for in-flight writes before exiting.
+    """
+    key = token_address.lower()
+    run_id = f"{key}-{int(time.time() * 1000)}"
+    status = {
+        'run_id': run_id,
+        'status': 'scheduled',
+        'scheduled_at': datetime.now().isoformat(),
+        'completed_at': None
+    }
+    with persistence_locks_lock:
+        persistence_runs[key] = status
+        token_lock = persistence_locks.setdefault(key, threading.Lock())
+    
+    def persist():
+        with token_lock:
+            if persistence_runs.get(key) is not status:
+                status['status'] = 'superseded'
+            else:
+                status['status'] = 'writing'
+                status['status'] = persist_complete_provenance(mixer_candidates, provenance_map, token_address,
+                                                               run_id=run_id)
+            status['completed_at'] = datetime.now().isoformat()
+    
+    threading.Thread(target=persist, name=f"persist-{run_id}").start()
+    return status
 
-def convert_datetime_to_string(obj):
-    """Recursively convert datetime objects to ISO format strings"""
-    if isinstance(obj, dict):
-        return {k: convert_datetime_to_string(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_datetime_to_string(item) for item in obj]
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    elif hasattr(obj, 'isoformat'):  # Any object with isoformat method
-        return obj.isoformat()
-    else:
-        return obj
+# ---------- Main Detection Function ----------
 
-def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
+def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS, time_budget=ANALYSIS_TIME_BUDGET,
+                                  transactions=None, registry_memo=None):
     """
     Complete mixer detection pipeline - USE CASE ALIGNED
     FORENSIC GRAPH AGENT: Analyzes last 10,000 transactions from last 24 hours
+    time_budget: seconds for the whole run (None = unbounded). Stages that run out
+    return what they found so far and are reported as partial with their coverage.
+    transactions: transfers already loaded from the store (batch runs); an empty
+    list goes straight to BitQuery
+    registry_memo: shared address registry lookups (see calculate_mixer_scores_batch)
     """
     start_time = time.time()
+    max_hops = clamp_max_hops(max_hops)
     
     print(f"🔍 FORENSIC GRAPH AGENT: Analyzing token: {token_address}")
     print(f"📅 Time range: Last 24 hours")
     
     try:
-        # 1. First try to load from Neo4j (existing data)
-        print("🔍 Checking Neo4j for existing transactions...")
-        transactions = load_transactions_for_token(token_address, limit=10000)
+        # 1. First try to load from the transfer store (existing data)
+        store = get_transfer_store()
+        if transactions is None:
+            print(f"🔍 Checking {store.name} store for existing transactions...")
+            transactions = store.load(token_address, limit=10000)
         
-        # 2. If no transactions in Neo4j, fetch from BitQuery
+        # 2. If no transactions in the store, fetch from BitQuery
         if len(transactions) == 0:
             print("📡 No existing transactions found, fetching from BitQuery...")
-            transactions = fetch_token_transactions_from_bitquery(token_address, limit=10000)
+            fetch_timeout = BITQUERY_TIMEOUT
+            if time_budget is not None:
+                fetch_timeout = max(1.0, min(fetch_timeout, time_budget - (time.time() - start_time)))
+            transactions = fetch_token_transactions_from_bitquery(token_address, limit=10000, timeout=fetch_timeout)
             
-            # 3. Import fetched transactions to Neo4j for future use
+            # 3. Store fetched transactions for future use
             if transactions:
-                import_transactions_to_neo4j(transactions, token_address)
+                store.save(transactions, token_address)
             else:
                 return {
                     'error': 'no_transactions',
@@ -1130,7 +3682,7 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
                     'time_range': 'last_24_hours'
                 }
         else:
-            print(f"📊 Using {len(transactions)} existing transactions from Neo4j")
+            print(f"📊 Using {len(transactions)} existing transactions from {store.name} store")
         
         if not transactions:
             return {
@@ -1143,34 +3695,97 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
         print(f"📅 Time range of data: {transactions[0]['timestamp'] if transactions else 'N/A'} to {transactions[-1]['timestamp'] if transactions else 'N/A'}")
         
         # 2. Build complete graph
+        load_seconds = time.time() - start_time
         G = build_complete_graph(transactions)
+        graph_seconds = time.time() - start_time - load_seconds
         print(f"🕸️  Built graph with {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
         
         # 3. Detect mixer candidates with ALL heuristics
         mixer_candidates = {}
         print(f"🔍 Analyzing {G.number_of_nodes()} nodes for mixer behavior...")
         
-        for node in G.nodes():
+        # Score every node at once, then build the detailed reasoning for the
+        # candidates only, highest score first so a budget cut drops the weakest
+        scoring_budget = allocate_stage_budget('mixer_scoring', start_time, time_budget,
+                                               list(STAGE_BUDGET_SHARES))
+        scoring_budget.start()
+        edge_arrays = build_edge_arrays(G)
+        batch_scores = calculate_mixer_scores_batch(G, edge_arrays, registry_memo=registry_memo)
+        weighted_scores = batch_scores['weighted_scores']
+        candidate_indices = np.flatnonzero(weighted_scores >= MIXER_SCORE_THRESHOLD)
+        candidate_indices = candidate_indices[np.argsort(-weighted_scores[candidate_indices], kind='stable')]
+        scoring_budget.total = len(candidate_indices)
+        scoring_budget.unit = 'candidates'
+        print(f"⚡ Batch heuristics scored {len(batch_scores['nodes'])} nodes in {time.time() - scoring_budget.started_at:.2f}s")
+        
+        for i in candidate_indices:
+            if not scoring_budget.checkpoint():
+                print(f"⏱️  Mixer scoring budget exhausted after {scoring_budget.completed}/{scoring_budget.total} candidates")
+                break
+            
+            node = batch_scores['nodes'][i]
             score, reasoning = detect_mixer_behavior(G, node)
+            scoring_budget.item_done()
             
-            if score >= MIXER_SCORE_THRESHOLD:
-                mixer_candidates[node] = {
-                    'score': score,
-                    'reasoning': reasoning
-                }
-                print(f"🎯 Detected mixer candidate: {node[:10]}... (Score: {score:.3f})")
+            mixer_candidates[node] = {
+                'score': score,
+                'reasoning': reasoning
+            }
+            print(f"🎯 Detected mixer candidate: {node[:10]}... (Score: {score:.3f})")
+        scoring_budget.finish()
+        
+        # Provenance tracing looks scores up instead of re-running the heuristics
+        score_cache = MixerScoreCache(G, batch_scores)
+        for node, data in mixer_candidates.items():
+            score_cache.seed(node, data['score'], data['reasoning'])
         
         print(f"🎯 Total mixer candidates detected: {len(mixer_candidates)}")
         
-        # 4. Build complete provenance (backward + forward)
-        provenance_map = build_complete_provenance(G, list(mixer_candidates.keys()))
+        # Exchanges and routers end traversals instead of fanning them out
+        hubs = {batch_scores['nodes'][i] for i in np.flatnonzero(batch_scores['hubs'])}
+        if hubs:
+            print(f"🏦 {len(hubs)} hubs (exchanges, routers, degree >= {batch_scores['hub_degree_threshold']:.0f}) treated as traversal endpoints")
+        
+        # 4. Build complete provenance (backward + forward), strongest mixers first
+        ranked_mixers = sorted(mixer_candidates, key=lambda m: mixer_candidates[m]['score'], reverse=True)
+        forward_budget = allocate_stage_budget('provenance_forward', start_time, time_budget,
+                                               ['provenance_forward', 'provenance_backward'])
+        backward_budget = allocate_stage_budget('provenance_backward', start_time, time_budget,
+                                                ['provenance_backward'])
+        provenance_stats = {}
+        traversal_stats = {}
+        provenance_map = build_complete_provenance(G, ranked_mixers,
+                                                   forward_budget=forward_budget,
+                                                   backward_budget=backward_budget,
+                                                   score_cache=score_cache,
+                                                   edge_arrays=edge_arrays,
+                                                   provenance_stats=provenance_stats,
+                                                   max_hops=max_hops,
+                                                   traversal_stats=traversal_stats,
+                                                   terminal=hubs)
+        stage_budgets = [scoring_budget, forward_budget, backward_budget]
+        partial_results = any(b.exhausted for b in stage_budgets)
+        detection_seconds = time.time() - start_time - load_seconds - graph_seconds
         
-        # 5. Persist to Neo4j with complete schema
-        persist_complete_provenance(mixer_candidates, provenance_map, token_address)
+        # 5. Reachability index for single-wallet checks (explain_provenance)
+        index_start = time.time()
+        reach_index = MixerReachabilityIndex.build(G, mixer_candidates, max_hops=max_hops, edge_arrays=edge_arrays,
+                                                   terminal=hubs)
+        save_reachability_index(token_address, reach_index)
+        print(f"🗂️  Reachability index: {len(reach_index.mixers)} mixers x {len(reach_index.nodes)} wallets in {time.time() - index_start:.2f}s")
+        
+        # Raw features, so weight / threshold changes can be tried without a re-run
+        feature_cache = HeuristicFeatureCache.build(batch_scores, edge_arrays, mixer_candidates, provenance_map,
+                                                    max_hops=max_hops, partial=partial_results)
+        save_feature_cache(token_address, feature_cache)
+        
+        # Value-weighted exposure: a few sparse mat-vecs instead of path counts
+        taint = calculate_taint_exposure(G, mixer_candidates, max_hops=max_hops, edge_arrays=edge_arrays)
         
         # 6. Generate DETAILED reports
         detailed_mixer_report = generate_mixer_detailed_report(G, mixer_candidates)
-        detailed_wallet_report = generate_wallet_detailed_report(G, provenance_map, mixer_candidates)
+        detailed_wallet_report = generate_wallet_detailed_report(G, provenance_map, mixer_candidates, taint,
+                                                                 provenance_stats)
         provenance_analysis = generate_provenance_path_analysis(G, provenance_map)
         network_analysis = generate_network_analysis_report(G, mixer_candidates)
         
@@ -1194,7 +3809,41 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
                 'analysis_time_seconds': round(elapsed, 2),
                 'data_scope': 'last_10k_transactions',
                 'time_range': 'last_24_hours',
-                'detection_method': '40/40/10/10 weighted heuristics'
+                'detection_method': '40/40/10/10 weighted heuristics',
+                'time_budget_seconds': time_budget,
+                'partial_results': partial_results,
+                'detection_coverage': {b.stage: b.summary() for b in stage_budgets},
+                # Where the run's time went; only the detection stages can stop early
+                'time_budget_breakdown': {
+                    'load_seconds': round(load_seconds, 2),
+                    'graph_build_seconds': round(graph_seconds, 2),
+                    'detection_seconds': round(detection_seconds, 2),
+                    'reporting_seconds': round(elapsed - load_seconds - graph_seconds - detection_seconds, 2),
+                    'over_budget': time_budget is not None and elapsed > time_budget
+                },
+                'provenance_traversal': {
+                    **traversal_stats,
+                    'depth_reached': max(traversal_stats['forward_depth_reached'],
+                                         traversal_stats['backward_depth_reached'])
+                },
+                'reachability_index': {
+                    'graph_version': reach_index.version,
+                    'mixers_indexed': len(reach_index.mixers),
+                    'max_hops': reach_index.max_hops,
+                    'temporal': reach_index.temporal,
+                    'built_at': reach_index.built_at
+                },
+                'feature_cache': {
+                    'features': FEATURE_NAMES,
+                    'wallets': len(feature_cache.nodes),
+                    'built_at': feature_cache.built_at
+                },
+                'address_registry': {
+                    'labeled_addresses': len(get_address_registry()),
+                    'known_mixers_in_graph': int(batch_scores['known_mixers'].sum()),
+                    'sanctioned_wallets': [batch_scores['nodes'][i] for i in np.flatnonzero(batch_scores['sanctioned'])]
+                },
+                'hubs': generate_hub_summary(batch_scores, edge_arrays)
             },
             
             'execution_summary': {
@@ -1202,14 +3851,14 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
                 'analysis_start_time': datetime.fromtimestamp(start_time).isoformat(),
                 'analysis_duration_seconds': round(elapsed, 2),
                 'performance_status': 'MVP_COMPLIANT' if elapsed < 30 else 'EXCEEDS_MVP',
-                'data_source': 'bitquery_api' if 'bitquery' in str(transactions[0].get('source', '')) else 'neo4j_cache',
+                'data_source': 'bitquery_api' if 'bitquery' in str(transactions[0].get('source', '')) else f'{store.name}_cache',
                 'data_processed': {
                     'transactions_analyzed': len(transactions),
                     'unique_wallets': G.number_of_nodes(),
                     'unique_transactions': G.number_of_edges(),
                     'time_range': {
-                        'first_tx': min([t['parsed_time'] for t in transactions if t['parsed_time']], default=None),
-                        'last_tx': max([t['parsed_time'] for t in transactions if t['parsed_time']], default=None)
+                        'first_tx': datetime_from_us(min([t['time_us'] for t in transactions if t['time_us'] is not None], default=None)),
+                        'last_tx': datetime_from_us(max([t['time_us'] for t in transactions if t['time_us'] is not None], default=None))
                     }
                 }
             },
@@ -1223,10 +3872,10 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
                     'detection_confidence': 'HIGH' if len(mixer_candidates) > 0 else 'LOW'
                 },
                 'mixer_categories': {
-                    'known_mixers': len([addr for addr in mixer_candidates.keys() 
-                                        if detect_direct_mixer_addresses(addr)['is_mixer']]),
-                    'behavioral_mixers': len([addr for addr in mixer_candidates.keys() 
-                                            if not detect_direct_mixer_addresses(addr)['is_mixer']]),
+                    'known_mixers': len([data for data in mixer_candidates.values()
+                                         if known_mixer_type(data) is not None]),
+                    'behavioral_mixers': len([data for data in mixer_candidates.values()
+                                              if known_mixer_type(data) is None]),
                     'high_risk_mixers': len([m for m in mixer_candidates.values() if m['score'] > 0.8]),
                     'medium_risk_mixers': len([m for m in mixer_candidates.values() if 0.7 < m['score'] <= 0.8]),
                     'low_risk_mixers': len([m for m in mixer_candidates.values() if m['score'] <= 0.7])
@@ -1239,8 +3888,12 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
                 'summary': {
                     'wallets_with_mixer_exposure': len(provenance_map),
                     'percentage_of_total_wallets': round(len(provenance_map) / G.number_of_nodes() * 100, 2) if G.number_of_nodes() > 0 else 0,
-                    'total_provenance_paths': sum(len(paths) for paths in provenance_map.values()),
-                    'average_exposure_per_wallet': round(len(provenance_map) / len(mixer_candidates), 2) if mixer_candidates else 0
+                    'total_provenance_paths': sum(stats['paths_found'] for stats in provenance_stats.values()),
+                    'provenance_paths_kept': sum(len(paths) for paths in provenance_map.values()),
+                    'average_exposure_per_wallet': round(len(provenance_map) / len(mixer_candidates), 2) if mixer_candidates else 0,
+                    'taint_exposed_wallets': int(np.count_nonzero(taint['haircut'] > 0)),
+                    'average_taint_exposure': round(float(taint['haircut'].mean()), 4) if len(taint['haircut']) else 0,
+                    'taint_model': 'haircut (value-weighted inflow share) and poison'
                 },
                 'risk_distribution': risk_distribution,
                 'high_risk_wallets': [
@@ -1300,8 +3953,12 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
             }
         }
         
-        # Convert all datetime objects to strings
-        report = convert_datetime_to_string(report)
+        # 9. Persist to Neo4j with complete schema, after the report is ready
+        if store.persists_provenance:
+            persistence = persist_provenance_in_background(mixer_candidates, provenance_map, token_address)
+        else:
+            persistence = {'status': 'skipped', 'reason': f'{store.name} store has no graph database'}
+        report['forensic_graph_agent']['provenance_persistence'] = dict(persistence)
         
         return report
         
@@ -1314,6 +3971,255 @@ def detect_mixer_origins_complete(token_address, max_hops=MAX_HOPS):
             'use_case_compliance': False
         }
 
+# ---------- Multi-Token Batch ----------
+
+def summarize_token_report(token_address, report, seconds):
+    """Per-token line of a batch result"""
+    if 'error' in report:
+        return {
+            'token_address': token_address,
+            'status': 'error',
+            'error': report.get('error'),
+            'message': report.get('message'),
+            'seconds': round(seconds, 2)
+        }
+    
+    agent = report['forensic_graph_agent']
+    mixers = report['mixer_detection_results']
+    wallets = report['wallet_exposure_analysis']
+    return {
+        'token_address': token_address,
+        'status': 'ok',
+        'seconds': round(seconds, 2),
+        'partial_results': agent['partial_results'],
+        'transactions_analyzed': report['execution_summary']['data_processed']['transactions_analyzed'],
+        'mixers_detected': mixers['summary']['total_mixers_detected'],
+        'mixer_categories': mixers['mixer_categories'],
+        'wallets_with_mixer_exposure': wallets['summary']['wallets_with_mixer_exposure'],
+        'risk_distribution': wallets['risk_distribution'],
+        'sanctioned_wallets': len(agent['address_registry']['sanctioned_wallets']),
+        'top_mixers': [
+            {'address': m['address'], 'score': m['score'], 'mixer_type': m['mixer_type']}
+            for m in mixers['top_5_mixers'][:3]
+        ]
+    }
+
+def analyze_batch_token(token_address, transactions, max_hops, time_budget, registry_memo, deadline=None):
+    """Summary of one token of a batch; its time budget never runs past the batch deadline"""
+    token_start = time.time()
+    if deadline is not None:
+        remaining = deadline - token_start
+        if remaining <= 0:
+            return {
+                'token_address': token_address,
+                'status': 'skipped',
+                'error': 'batch_deadline',
+                'message': 'Batch time budget spent before this token started',
+                'seconds': 0.0
+            }
+        time_budget = remaining if time_budget is None else min(time_budget, remaining)
+    try:
+        report = detect_mixer_origins_complete(token_address, max_hops, time_budget,
+                                               transactions=transactions, registry_memo=registry_memo)
+    except Exception as e:
+        print(f"❌ Batch analysis failed for {token_address}: {e}")
+        traceback.print_exc()
+        report = {'error': 'analysis_failed', 'message': str(e)}
+    return summarize_token_report(token_address, report, time.time() - token_start)
+
+def batch_tokens(token_addresses):
+    """Distinct non-empty token addresses of a batch request (ValueError past BATCH_MAX_TOKENS)"""
+    tokens = list(dict.fromkeys(token.strip() for token in token_addresses
+                                if isinstance(token, str) and token.strip()))
+    if not tokens:
+        raise ValueError("token_addresses must contain at least one token address")
+    if len(tokens) > BATCH_MAX_TOKENS:
+        raise ValueError(f"At most {BATCH_MAX_TOKENS} tokens per batch (got {len(tokens)})")
+    return tokens
+
+def detect_mixer_origins_batch(token_addresses, max_hops=MAX_HOPS, time_budget=ANALYSIS_TIME_BUDGET,
+                               batch_budget=BATCH_TIME_BUDGET):
+    """
+    Screen many tokens: one bulk transfer load, one registry lookup per distinct
+    wallet (shared across tokens), then the per-token pipelines on the bounded
+    analysis pool, at most BATCH_TOKENS_IN_FLIGHT at a time. Returns per-token summaries (in request order) with timings.
+    Behavioral scores stay per token: the same wallet can be a mixer for one
+    token's flows and not another's.
+    batch_budget: seconds for the whole batch (None = unbounded); each token gets
+    at most the time left, tokens not started by the deadline are skipped
+    """
+    start_time = time.time()
+    deadline = start_time + batch_budget if batch_budget is not None else None
+    tokens = batch_tokens(token_addresses)
+    
+    print(f"📦 Batch analysis of {len(tokens)} tokens")
+    store = get_transfer_store()
+    preloaded = store.load_many(tokens, limit=10000)
+    load_seconds = time.time() - start_time
+    
+    # Shared address dictionary: registry membership resolved once per wallet
+    addresses = sorted({tx[key] for rows in preloaded.values() for tx in rows for key in ('sender', 'receiver')})
+    registry_memo = dict(zip(addresses, get_address_registry().find(addresses).tolist()))
+    
+    # Submit a token only when one of the batch's slots frees up: the rest of the
+    # analysis pool stays available to interactive calls
+    slots = threading.Semaphore(BATCH_TOKENS_IN_FLIGHT)
+    futures = []
+    for token in tokens:
+        slots.acquire()
+        future = analysis_executor.submit(analyze_batch_token, token, preloaded.get(token.lower(), []),
+                                          max_hops, time_budget, registry_memo, deadline)
+        future.add_done_callback(lambda _: slots.release())
+        futures.append(future)
+    results = [future.result() for future in futures]
+    
+    elapsed = time.time() - start_time
+    print(f"📦 Batch of {len(tokens)} tokens done in {elapsed:.2f}s")
+    return {
+        'tokens_requested': len(tokens),
+        'tokens_analyzed': sum(1 for r in results if r['status'] == 'ok'),
+        'tokens_with_mixers': sum(1 for r in results if r['status'] == 'ok' and r['mixers_detected'] > 0),
+        'tokens_skipped': sum(1 for r in results if r['status'] == 'skipped'),
+        'total_seconds': round(elapsed, 2),
+        'batch_budget_seconds': batch_budget,
+        'load_seconds': round(load_seconds, 2),
+        'shared_wallets': len(addresses),
+        'results': results
+    }
+
+# ---------- Analysis Jobs ----------
+
+def prune_analysis_jobs():
+    """Forget finished jobs older than ANALYSIS_JOB_RETENTION"""
+    cutoff = time.time() - ANALYSIS_JOB_RETENTION
+    with analysis_jobs_lock:
+        for job_id in [job_id for job_id, job in analysis_jobs.items()
+                       if job['finished_at'] is not None and job['finished_at'] < cutoff]:
+            del analysis_jobs[job_id]
+
+def run_analysis_job(job):
+    job['status'] = 'running'
+    job['started_at'] = time.time()
+    try:
+        if job['kind'] == 'batch':
+            result = detect_mixer_origins_batch(job['token_addresses'], job['max_hops'], job['time_budget'],
+                                                job['batch_budget'])
+        else:
+            result = detect_mixer_origins_complete(job['token_address'], job['max_hops'], job['time_budget'])
+        job['result'] = result
+        job['status'] = 'failed' if 'error' in result else 'complete'
+    except Exception as e:
+        print(f"❌ Analysis job {job['job_id']} failed: {e}")
+        traceback.print_exc()
+        job['result'] = {'error': 'analysis_failed', 'message': str(e)}
+        job['status'] = 'failed'
+    job['finished_at'] = time.time()
+    return job['result']
+
+def queue_job(key, executor, **fields):
+    """
+    Register a job and queue run_analysis_job on `executor`; a queued or running
+    job with the same key is returned instead of starting identical work twice
+    """
+    prune_analysis_jobs()
+    with analysis_jobs_lock:
+        for job in analysis_jobs.values():
+            if job['key'] == key and job['status'] in ('queued', 'running'):
+                return job
+        
+        job = {
+            'job_id': hashlib.sha1(f"{key}-{time.time()}-{len(analysis_jobs)}".encode()).hexdigest()[:16],
+            'key': key,
+            **fields,
+            'status': 'queued',
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None
+        }
+        job['future'] = executor.submit(run_analysis_job, job)
+        analysis_jobs[job['job_id']] = job
+    return job
+
+def submit_analysis_job(token_address, max_hops=MAX_HOPS, time_budget=ANALYSIS_TIME_BUDGET):
+    """
+    Queue a detection run on the bounded analysis pool and return its job.
+    A queued or running job with the same arguments is reused instead of
+    starting a second identical pipeline.
+    """
+    # Clamp first so requests that run the same pipeline share a job
+    max_hops = clamp_max_hops(max_hops)
+    job = queue_job((token_address.lower(), max_hops, time_budget), analysis_executor, kind='analysis',
+                    token_address=token_address, max_hops=max_hops, time_budget=time_budget)
+    print(f"📥 Queued analysis job {job['job_id']} for {token_address}")
+    return job
+
+def submit_batch_job(token_addresses, max_hops=MAX_HOPS, time_budget=ANALYSIS_TIME_BUDGET,
+                     batch_budget=BATCH_TIME_BUDGET):
+    """
+    Queue a batch screen (see detect_mixer_origins_batch) and return its job.
+    Batches are coordinated on their own bounded pool, their tokens run on the
+    analysis pool. Raises ValueError for an empty or oversized token list.
+    """
+    tokens = batch_tokens(token_addresses)
+    max_hops = clamp_max_hops(max_hops)
+    key = ('batch', tuple(token.lower() for token in tokens), max_hops, time_budget, batch_budget)
+    job = queue_job(key, batch_executor, kind='batch', token_address=None, token_addresses=tokens,
+                    max_hops=max_hops, time_budget=time_budget, batch_budget=batch_budget)
+    print(f"📥 Queued batch job {job['job_id']} for {len(tokens)} tokens")
+    return job
+
+def wait_for_analysis_job(job, timeout=None):
+    """Block until the job finishes (or timeout seconds pass); returns the job"""
+    try:
+        job['future'].result(timeout=timeout)
+    except FuturesTimeoutError:
+        pass
+    return job
+
+def analysis_job_status(job, include_result=True):
+    """JSON-safe view of a job"""
+    status = {
+        'job_id': job['job_id'],
+        'token_address': job['token_address'],
+        'status': job['status'],
+        'submitted_at': datetime.fromtimestamp(job['submitted_at']).isoformat(),
+        'started_at': datetime.fromtimestamp(job['started_at']).isoformat() if job['started_at'] else None,
+        'finished_at': datetime.fromtimestamp(job['finished_at']).isoformat() if job['finished_at'] else None
+    }
+    if job['kind'] == 'batch':
+        status['token_addresses'] = job['token_addresses']
+    if include_result and job['status'] in ('complete', 'failed'):
+        status['result'] = job['result']
+    return status
+
+def analysis_arguments(arguments):
+    """
+    (max_hops, time_budget) of an analysis request, checked before anything is
+    queued. Missing values take the defaults; time_budget_seconds may be null
+    (no limit). Raises ValueError naming the bad parameter
+    """
+    max_hops = arguments.get('max_hops')
+    if max_hops is None:
+        max_hops = MAX_HOPS
+    if isinstance(max_hops, bool) or not isinstance(max_hops, int) or not 1 <= max_hops <= MAX_HOPS_LIMIT:
+        raise ValueError(f"max_hops must be an integer between 1 and {MAX_HOPS_LIMIT}")
+    return max_hops, seconds_argument(arguments, 'time_budget_seconds', ANALYSIS_TIME_BUDGET)
+
+def seconds_argument(arguments, name, default):
+    """A time budget argument: positive finite seconds, or None (no limit)"""
+    seconds = arguments.get(name, default)
+    if seconds is None:
+        return None
+    if isinstance(seconds, bool) or not isinstance(seconds, (int, float)) or not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f"{name} must be a positive number of seconds (or null for no limit)")
+    return float(seconds)
+
+def run_analysis(token_address, max_hops=MAX_HOPS, time_budget=ANALYSIS_TIME_BUDGET):
+    """Synchronous detection that still goes through the bounded analysis pool"""
+    job = wait_for_analysis_job(submit_analysis_job(token_address, max_hops, time_budget))
+    return job['result']
+
 # ---------- FLASK APP WITH MCP IMPLEMENTATION ----------
 
 app = Flask('mixer_flagging_complete')
@@ -1333,6 +4239,35 @@ def add_cors_headers(response):
 def handle_options(path=None):
     return '', 200
 
+# ---------- JSON Responses ----------
+
+def json_response(payload, status=200):
+    """
+    Encode payload once (compact, DateTimeEncoder) into a JSON response.
+    Large bodies are gzipped for clients that accept it, or streamed in chunks
+    when the request asks for ?stream=1.
+    """
+    if request.args.get('stream') in ('1', 'true'):
+        def chunks():
+            buffer, size = [], 0
+            for piece in COMPACT_JSON.iterencode(payload):
+                buffer.append(piece)
+                size += len(piece)
+                if size >= RESPONSE_STREAM_CHUNK_BYTES:
+                    yield ''.join(buffer).encode('utf-8')
+                    buffer, size = [], 0
+            if buffer:
+                yield ''.join(buffer).encode('utf-8')
+        return Response(chunks(), status=status, mimetype='application/json')
+    
+    body = COMPACT_JSON.encode(payload).encode('utf-8')
+    response = Response(body, status=status, mimetype='application/json')
+    if len(body) >= RESPONSE_GZIP_MIN_BYTES and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response.set_data(gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 # ---------- MCP PROTOCOL ENDPOINTS ----------
 
 @app.route('/mcp', methods=['POST'])
@@ -1398,8 +4333,87 @@ def mcp_handler():
                 "result": {
                     "tools": [
                         {
-                            "name": "detect_mixer_origins",
-                            "description": "Detect mixer-origin funds with complete behavioral heuristics and provenance tracing. Automatically fetches last 24 hours of token transactions.",
+                            "name": "detect_mixer_origins",
+                            "description": "Detect mixer-origin funds with complete behavioral heuristics and provenance tracing. Automatically fetches last 24 hours of token transactions.",
+                            "inputSchema": {
+                                "type": "object",
+                                "properties": {
+                                    "token_address": {
+                                        "type": "string",
+                                        "description": "Token contract address to analyze"
+                                    },
+                                    "max_hops": {
+                                        "type": "integer",
+                                        "description": f"Maximum number of hops to trace (default: {MAX_HOPS}, at most {MAX_HOPS_LIMIT})",
+                                        "minimum": 1,
+                                        "maximum": MAX_HOPS_LIMIT,
+                                        "default": MAX_HOPS
+                                    },
+                                    "time_budget_seconds": {
+                                        "type": "number",
+                                        "description": "Detection time budget in seconds; stages that run out return partial results with their coverage (default: 25)",
+                                        "exclusiveMinimum": 0,
+                                        "default": ANALYSIS_TIME_BUDGET
+                                    }
+                                },
+                                "required": ["token_address"]
+                            }
+                        },
+                        {
+                            "name": "explain_provenance",
+                            "description": "Explain mixer provenance for a specific wallet with detailed forensic reasoning",
+                            "inputSchema": {
+                                "type": "object",
+                                "properties": {
+                                    "token_address": {
+                                        "type": "string",
+                                        "description": "Token contract address"
+                                    },
+                                    "wallet_address": {
+                                        "type": "string",
+                                        "description": "Wallet address to explain"
+                                    }
+                                },
+                                "required": ["token_address", "wallet_address"]
+                            }
+                        },
+                        {
+                            "name": "detect_mixer_origins_batch",
+                            "description": f"Screen up to {BATCH_MAX_TOKENS} tokens at once and get a per-token summary (mixers, exposed wallets, risk, timing); batches still running after {BATCH_SYNC_WAIT}s return their job_id, poll it with get_analysis_job",
+                            "inputSchema": {
+                                "type": "object",
+                                "properties": {
+                                    "token_addresses": {
+                                        "type": "array",
+                                        "items": {"type": "string"},
+                                        "description": "Token contract addresses to analyze"
+                                    },
+                                    "max_hops": {
+                                        "type": "integer",
+                                        "description": f"Maximum number of hops to trace (default: {MAX_HOPS}, at most {MAX_HOPS_LIMIT})",
+                                        "minimum": 1,
+                                        "maximum": MAX_HOPS_LIMIT,
+                                        "default": MAX_HOPS
+                                    },
+                                    "time_budget_seconds": {
+                                        "type": "number",
+                                        "description": "Detection time budget per token in seconds (default: 25)",
+                                        "exclusiveMinimum": 0,
+                                        "default": ANALYSIS_TIME_BUDGET
+                                    },
+                                    "batch_time_budget_seconds": {
+                                        "type": "number",
+                                        "description": f"Time budget for the whole batch in seconds; tokens not started by then are reported as skipped (default: {BATCH_TIME_BUDGET})",
+                                        "exclusiveMinimum": 0,
+                                        "default": BATCH_TIME_BUDGET
+                                    }
+                                },
+                                "required": ["token_addresses"]
+                            }
+                        },
+                        {
+                            "name": "submit_mixer_analysis",
+                            "description": "Start detect_mixer_origins in the background and return a job id to poll with get_analysis_job",
                             "inputSchema": {
                                 "type": "object",
                                 "properties": {
@@ -1409,29 +4423,61 @@ def mcp_handler():
                                     },
                                     "max_hops": {
                                         "type": "integer",
-                                        "description": "Maximum number of hops to trace (default: 3)",
-                                        "default": 3
+                                        "description": f"Maximum number of hops to trace (default: {MAX_HOPS}, at most {MAX_HOPS_LIMIT})",
+                                        "minimum": 1,
+                                        "maximum": MAX_HOPS_LIMIT,
+                                        "default": MAX_HOPS
+                                    },
+                                    "time_budget_seconds": {
+                                        "type": "number",
+                                        "description": "Detection time budget in seconds (default: 25)",
+                                        "exclusiveMinimum": 0,
+                                        "default": ANALYSIS_TIME_BUDGET
                                     }
                                 },
                                 "required": ["token_address"]
                             }
                         },
                         {
-                            "name": "explain_provenance",
-                            "description": "Explain mixer provenance for a specific wallet with detailed forensic reasoning",
+                            "name": "get_analysis_job",
+                            "description": "Status of a submitted mixer analysis, with the full report once it is complete",
                             "inputSchema": {
                                 "type": "object",
                                 "properties": {
-                                    "token_address": {
+                                    "job_id": {
                                         "type": "string",
-                                        "description": "Token contract address"
+                                        "description": "Job id returned by submit_mixer_analysis"
                                     },
-                                    "wallet_address": {
+                                    "wait_seconds": {
+                                        "type": "number",
+                                        "description": "Wait up to this long for the job to finish before answering (default: 0)",
+                                        "default": 0
+                                    }
+                                },
+                                "required": ["job_id"]
+                            }
+                        },
+                        {
+                            "name": "rescore_mixer_analysis",
+                            "description": "Re-derive mixer candidates and wallet exposure of an analyzed token under other heuristic weights or score threshold, in seconds and without re-fetching",
+                            "inputSchema": {
+                                "type": "object",
+                                "properties": {
+                                    "token_address": {
                                         "type": "string",
-                                        "description": "Wallet address to explain"
+                                        "description": "Token contract address analyzed before"
+                                    },
+                                    "weights": {
+                                        "type": "object",
+                                        "description": f"Heuristic weights to override ({', '.join(HEURISTIC_NAMES)}); others keep the analysis' weights",
+                                        "additionalProperties": {"type": "number"}
+                                    },
+                                    "threshold": {
+                                        "type": "number",
+                                        "description": f"Mixer score threshold (default: the analysis' threshold, {MIXER_SCORE_THRESHOLD})"
                                     }
                                 },
-                                "required": ["token_address", "wallet_address"]
+                                "required": ["token_address"]
                             }
                         }
                     ]
@@ -1447,7 +4493,6 @@ def mcp_handler():
             
             if tool_name == 'detect_mixer_origins':
                 token_address = arguments.get('token_address')
-                max_hops = arguments.get('max_hops', MAX_HOPS)
                 
                 if not token_address:
                     return jsonify({
@@ -1459,13 +4504,25 @@ def mcp_handler():
                         }
                     })
                 
+                try:
+                    max_hops, time_budget = analysis_arguments(arguments)
+                except ValueError as e:
+                    return jsonify({
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "error": {
+                            "code": -32602,
+                            "message": str(e)
+                        }
+                    })
+                
                 print(f"🔍 Running mixer detection for: {token_address}")
                 
                 try:
-                    result = detect_mixer_origins_complete(token_address, max_hops)
+                    result = run_analysis(token_address, max_hops, time_budget)
                     
-                    # Convert result to JSON using custom encoder
-                    result_str = json.dumps(result, indent=2, cls=DateTimeEncoder)
+                    # MCP text content: the report encoded once, compact
+                    result_str = COMPACT_JSON.encode(result)
                     
                     response = {
                         "jsonrpc": "2.0",
@@ -1480,7 +4537,7 @@ def mcp_handler():
                         }
                     }
                     print(f"✅ Response sent with {len(result_str)} characters")
-                    return jsonify(response)
+                    return json_response(response)
                     
                 except Exception as e:
                     print(f"❌ Detection error: {e}")
@@ -1510,30 +4567,45 @@ def mcp_handler():
                 
                 print(f"🔍 Explaining provenance for wallet: {wallet_address}, token: {token_address}")
                 
-                # Query Neo4j for provenance
-                with driver.session() as session:
-                    q = """
-                    MATCH (m:Mixer)-[f:FUNDED]->(w:Wallet {address: $wallet})
-                    WHERE f.token_address = $token
-                    RETURN m.address as mixer, m.mixer_score as score, 
-                           f.hops as hops, f.direction as direction,
-                           m.mixer_type as mixer_type,
-                           m.fan_in as fan_in, m.fan_out as fan_out
-                    ORDER BY m.mixer_score DESC
-                    LIMIT 10
-                    """
-                    
-                    result = session.run(q, wallet=wallet_address.lower(), token=token_address)
-                    records = list(result)
-                    
-                    if not records:
+                # Answer from the token's reachability index when it covers this wallet
+                reach_index = get_reachability_index(token_address)
+                exposures = reach_index.lookup(wallet_address) if reach_index is not None else None
+                
+                if exposures is not None:
+                    if not exposures:
                         text_response = f"No mixer provenance found for wallet {wallet_address} with token {token_address}"
                     else:
-                        text_response = f"Found {len(records)} mixer connections for wallet {wallet_address}:\n\n"
-                        for rec in records:
-                            text_response += f"• Mixer: {rec['mixer'][:10]}... (Score: {rec['score']:.2f}, Type: {rec['mixer_type']})\n"
-                            text_response += f"  Connection: {rec['direction']} via {rec['hops']} hops\n"
-                            text_response += f"  Stats: Fan-in={rec['fan_in']}, Fan-out={rec['fan_out']}\n\n"
+                        top_exposures = sorted(exposures, key=lambda e: e['mixer_score'], reverse=True)[:10]
+                        text_response = f"Found {len(top_exposures)} mixer connections for wallet {wallet_address}:\n\n"
+                        for exp in top_exposures:
+                            text_response += f"• Mixer: {exp['mixer'][:10]}... (Score: {exp['mixer_score']:.2f}, Type: {exp['mixer_type']})\n"
+                            text_response += f"  Connection: {'time-respecting ' if reach_index.temporal else ''}forward via {exp['distance']} hops\n"
+                            text_response += f"  Stats: Fan-in={exp['fan_in']}, Fan-out={exp['fan_out']}\n\n"
+                else:
+                    # Query Neo4j for provenance
+                    with driver.session() as session:
+                        q = """
+                        MATCH (m:Mixer)-[f:FUNDED]->(w:Wallet {address: $wallet})
+                        WHERE f.token_address = $token
+                        RETURN m.address as mixer, m.mixer_score as score, 
+                               f.hops as hops, f.direction as direction,
+                               m.mixer_type as mixer_type,
+                               m.fan_in as fan_in, m.fan_out as fan_out
+                        ORDER BY m.mixer_score DESC
+                        LIMIT 10
+                        """
+                    
+                        result = session.run(q, wallet=wallet_address.lower(), token=token_address)
+                        records = list(result)
+                    
+                        if not records:
+                            text_response = f"No mixer provenance found for wallet {wallet_address} with token {token_address}"
+                        else:
+                            text_response = f"Found {len(records)} mixer connections for wallet {wallet_address}:\n\n"
+                            for rec in records:
+                                text_response += f"• Mixer: {rec['mixer'][:10]}... (Score: {rec['score']:.2f}, Type: {rec['mixer_type']})\n"
+                                text_response += f"  Connection: {rec['direction']} via {rec['hops']} hops\n"
+                                text_response += f"  Stats: Fan-in={rec['fan_in']}, Fan-out={rec['fan_out']}\n\n"
                 
                 response = {
                     "jsonrpc": "2.0",
@@ -1549,6 +4621,153 @@ def mcp_handler():
                 }
                 return jsonify(response)
             
+            elif tool_name == 'detect_mixer_origins_batch':
+                token_addresses = arguments.get('token_addresses') or []
+                
+                if not isinstance(token_addresses, list) or not token_addresses:
+                    return jsonify({
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "error": {
+                            "code": -32602,
+                            "message": "Missing required parameter: token_addresses (list of token addresses)"
+                        }
+                    })
+                
+                try:
+                    max_hops, time_budget = analysis_arguments(arguments)
+                    batch_budget = seconds_argument(arguments, 'batch_time_budget_seconds', BATCH_TIME_BUDGET)
+                    job = submit_batch_job(token_addresses, max_hops, time_budget, batch_budget)
+                except ValueError as e:
+                    return jsonify({
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "error": {
+                            "code": -32602,
+                            "message": str(e)
+                        }
+                    })
+                
+                job = wait_for_analysis_job(job, timeout=BATCH_SYNC_WAIT)
+                if job['status'] == 'failed':
+                    return jsonify({
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "error": {
+                            "code": -32603,
+                            "message": f"Batch analysis failed: {job['result'].get('message')}"
+                        }
+                    })
+                
+                # Still running: hand back the job to poll with get_analysis_job
+                result = job['result'] if job['status'] == 'complete' else analysis_job_status(job)
+                return json_response({
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": COMPACT_JSON.encode(result)
+                            }
+                        ]
+                    }
+                })
+            
+            elif tool_name in ('submit_mixer_analysis', 'get_analysis_job'):
+                if tool_name == 'submit_mixer_analysis':
+                    token_address = arguments.get('token_address')
+                    if not token_address:
+                        return jsonify({
+                            "jsonrpc": "2.0",
+                            "id": request_id,
+                            "error": {
+                                "code": -32602,
+                                "message": "Missing required parameter: token_address"
+                            }
+                        })
+                    try:
+                        max_hops, time_budget = analysis_arguments(arguments)
+                    except ValueError as e:
+                        return jsonify({
+                            "jsonrpc": "2.0",
+                            "id": request_id,
+                            "error": {
+                                "code": -32602,
+                                "message": str(e)
+                            }
+                        })
+                    job = submit_analysis_job(token_address, max_hops, time_budget)
+                else:
+                    job = analysis_jobs.get(arguments.get('job_id', ''))
+                    if job is None:
+                        return jsonify({
+                            "jsonrpc": "2.0",
+                            "id": request_id,
+                            "error": {
+                                "code": -32602,
+                                "message": f"Unknown job_id: {arguments.get('job_id')}"
+                            }
+                        })
+                    wait_seconds = float(arguments.get('wait_seconds') or 0)
+                    if wait_seconds > 0:
+                        wait_for_analysis_job(job, timeout=wait_seconds)
+                
+                return json_response({
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": COMPACT_JSON.encode(analysis_job_status(job))
+                            }
+                        ]
+                    }
+                })
+            
+            elif tool_name == 'rescore_mixer_analysis':
+                token_address = arguments.get('token_address')
+                if not token_address:
+                    return jsonify({
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "error": {
+                            "code": -32602,
+                            "message": "Missing required parameter: token_address"
+                        }
+                    })
+                
+                try:
+                    result = rescore_analysis(token_address, arguments.get('weights'), arguments.get('threshold'))
+                except ValueError as e:
+                    return jsonify({
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "error": {
+                            "code": -32602,
+                            "message": str(e)
+                        }
+                    })
+                if result is None:
+                    result = {
+                        'error': 'not_analyzed',
+                        'message': f'No analysis of {token_address} to rescore, run detect_mixer_origins first'
+                    }
+                
+                return json_response({
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": COMPACT_JSON.encode(result)
+                            }
+                        ]
+                    }
+                })
+            
             else:
                 return jsonify({
                     "jsonrpc": "2.0",
@@ -1605,17 +4824,71 @@ def api_detect_mixer_origins():
                 'error': 'token_address is required'
             }), 400
         
-        max_hops = int(body.get('max_hops', MAX_HOPS))
+        try:
+            max_hops, time_budget = analysis_arguments(body)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'error': str(e)
+            }), 400
         
-        result = detect_mixer_origins_complete(token_address, max_hops)
+        result = run_analysis(token_address, max_hops, time_budget)
         
         if 'error' in result:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'result': result
             })
         
+        return json_response({
+            'status': 'ok',
+            'result': result
+        })
+    except Exception as e:
         return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@app.route('/mcp/detect_mixer_origins_batch', methods=['POST'])
+def api_detect_mixer_origins_batch():
+    """Per-token mixer summaries for a list of tokens"""
+    try:
+        body = request.get_json(silent=True) or {}
+        token_addresses = body.get('token_addresses')
+        
+        if not isinstance(token_addresses, list) or not token_addresses:
+            return jsonify({
+                'status': 'error',
+                'error': 'token_addresses (list) is required'
+            }), 400
+        
+        try:
+            max_hops, time_budget = analysis_arguments(body)
+            batch_budget = seconds_argument(body, 'batch_time_budget_seconds', BATCH_TIME_BUDGET)
+            job = submit_batch_job(token_addresses, max_hops, time_budget, batch_budget)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'error': str(e)
+            }), 400
+        
+        wait_for_analysis_job(job, timeout=BATCH_SYNC_WAIT)
+        if job['status'] == 'failed':
+            return jsonify({
+                'status': 'error',
+                'error': job['result'].get('message')
+            }), 500
+        if job['status'] != 'complete':
+            # Poll GET /mcp/jobs/<job_id> for the result
+            return jsonify({
+                'status': 'ok',
+                'job': analysis_job_status(job, include_result=False)
+            }), 202
+        result = job['result']
+        
+        return json_response({
             'status': 'ok',
             'result': result
         })
@@ -1640,6 +4913,19 @@ def api_explain_provenance():
                 'error': 'Both token_address and wallet_address are required'
             }), 400
         
+        # Clear wallets are answered from the reachability index without Neo4j
+        reach_index = get_reachability_index(token_address)
+        if reach_index is not None and reach_index.lookup(wallet_address) == []:
+            return jsonify({
+                'status': 'ok',
+                'result': {
+                    'wallet': wallet_address,
+                    'mixer_exposure': False,
+                    'message': 'No mixer provenance found for this wallet',
+                    'forensic_assessment': 'CLEAR'
+                }
+            })
+        
         # Query Neo4j for this wallet's provenance
         with driver.session() as session:
             q = """
@@ -1741,6 +5027,119 @@ def api_explain_provenance():
             'traceback': traceback.format_exc()
         }), 500
 
+@app.route('/mcp/rescore', methods=['POST'])
+def api_rescore_analysis():
+    """Candidates and exposure of an analyzed token under other weights / threshold"""
+    try:
+        body = request.get_json(silent=True) or {}
+        token_address = body.get('token_address')
+        
+        if not token_address:
+            return jsonify({
+                'status': 'error',
+                'error': 'token_address is required'
+            }), 400
+        
+        try:
+            result = rescore_analysis(token_address, body.get('weights'), body.get('threshold'))
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'error': str(e)
+            }), 400
+        if result is None:
+            return jsonify({
+                'status': 'error',
+                'error': f'No analysis of {token_address} to rescore, run detect_mixer_origins first'
+            }), 404
+        
+        return json_response({
+            'status': 'ok',
+            'result': result
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@app.route('/mcp/jobs', methods=['POST'])
+def api_submit_job():
+    """Queue a mixer analysis; poll GET /mcp/jobs/<job_id> for the result"""
+    try:
+        body = request.get_json(silent=True) or {}
+        token_address = body.get('token_address')
+        
+        if not token_address:
+            return jsonify({
+                'status': 'error',
+                'error': 'token_address is required'
+            }), 400
+        
+        try:
+            max_hops, time_budget = analysis_arguments(body)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'error': str(e)
+            }), 400
+        
+        job = submit_analysis_job(token_address, max_hops, time_budget)
+        return jsonify({
+            'status': 'ok',
+            'job': analysis_job_status(job, include_result=False)
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        }), 500
+
+@app.route('/mcp/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    """Job status (long-polls up to ?wait=<seconds>), with the report once complete"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'error': f'Unknown job_id: {job_id}'
+        }), 404
+    
+    wait_seconds = request.args.get('wait', 0, type=float)
+    if wait_seconds > 0:
+        wait_for_analysis_job(job, timeout=wait_seconds)
+    
+    return json_response({
+        'status': 'ok',
+        'job': analysis_job_status(job)
+    })
+
+@app.route('/mcp/persistence_status/<token_address>', methods=['GET'])
+def api_persistence_status(token_address):
+    """Completion marker of the background provenance write for a token"""
+    try:
+        status = persistence_runs.get(token_address.lower())
+        if status is None:
+            with driver.session() as session:
+                record = session.run("""
+                    MATCH (run:ProvenanceRun {token_address: $token_address})
+                    RETURN run.run_id AS run_id, run.status AS status,
+                           run.started_at AS started_at, run.completed_at AS completed_at
+                """, token_address=token_address).single()
+            status = dict(record) if record else {'status': 'unknown'}
+        
+        return jsonify({
+            'status': 'ok',
+            'token_address': token_address,
+            'persistence': status
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'error': str(e)
+        }), 500
+
 @app.route('/mcp/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -1773,7 +5172,12 @@ def index():
         'endpoints': {
             'mcp': 'POST /mcp (Main MCP endpoint)',
             'detect_mixer_origins': 'POST /mcp/detect_mixer_origins (Legacy)',
+            'detect_mixer_origins_batch': 'POST /mcp/detect_mixer_origins_batch',
             'explain_provenance': 'POST /mcp/explain_provenance (Legacy)',
+            'submit_job': 'POST /mcp/jobs',
+            'job_status': 'GET /mcp/jobs/<job_id>?wait=<seconds>',
+            'rescore': 'POST /mcp/rescore',
+            'persistence_status': 'GET /mcp/persistence_status/<token_address>',
             'health': 'GET /mcp/health'
         },
         'features': [
@@ -1781,7 +5185,9 @@ def index():
             'Last 24 hours time range',
             'Up to 10,000 transactions per analysis',
             '40/40/10/10 behavioral heuristics',
-            '3-hop provenance tracing',
+            f'Provenance tracing up to max_hops (default {MAX_HOPS}, at most {MAX_HOPS_LIMIT})',
+            'Per-token reachability index for single-wallet checks',
+            'Rescoring with new heuristic weights / threshold from cached features',
             'Neo4j persistence for caching'
         ],
         'status': 'running'
@@ -1807,6 +5213,9 @@ if __name__ == '__main__':
     Available tools:
     - detect_mixer_origins: Analyze token for mixer activity (auto-fetches last 24h)
     - explain_provenance: Explain wallet's mixer connections
+    - detect_mixer_origins_batch: Per-token summaries for a list of tokens
+    - submit_mixer_analysis / get_analysis_job: Same analysis as a background job
+    - rescore_mixer_analysis: Try other heuristic weights / threshold on an analyzed token
     
     Starting on http://0.0.0.0:5001
     ========================================================
@@ -1825,6 +5234,16 @@ if __name__ == '__main__':
         print("⚠️ Could not determine local IP address")
         print("🔗 Try using: http://YOUR_IP_ADDRESS:5001/mcp")
     
-    print("\n📡 Server starting...\n")
+    print(f"\n📡 Server starting ({ANALYSIS_WORKERS} analysis workers)...\n")
+    
+    server_mode = 'production' if '--production' in sys.argv else SERVER_MODE
+    if server_mode == 'production':
+        try:
+            from waitress import serve
+            print(f"🏭 Production mode: waitress with {SERVER_THREADS} request threads")
+            serve(app, host='0.0.0.0', port=5001, threads=SERVER_THREADS)
+            sys.exit(0)
+        except ImportError:
+            print("⚠️ waitress is not installed (pip install waitress), falling back to the Flask server")
     
     app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
\ No newline at end of file
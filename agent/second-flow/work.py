@@ -1,18 +1,520 @@
 import requests
 import networkx as nx
-import community as community_louvain
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
+import os
 import sys
 import time
 import csv
+import multiprocessing
 import numpy as np
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from scipy.sparse import csr_matrix
 from scipy.sparse.linalg import eigsh
 
+
+# ==================== LOUVAIN SUR MATRICE CSR ====================
+
+def _modularity_csr(adjacency, labels, resolution=1.0, m2=None):
+    """
+    Modularité d'une partition sur une matrice d'adjacence symétrique.
+    `m2` (poids total du graphe entier) donne la contribution d'un bloc de composantes
+    """
+    if m2 is None:
+        m2 = adjacency.sum()
+    if m2 == 0:
+        return 0.0
+
+    n_comms = labels.max() + 1
+    coo = adjacency.tocoo()
+    same = labels[coo.row] == labels[coo.col]
+    internal = np.bincount(labels[coo.row[same]], weights=coo.data[same], minlength=n_comms)
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    totals = np.bincount(labels, weights=degrees, minlength=n_comms)
+
+    return float((internal / m2 - resolution * (totals / m2) ** 2).sum())
+
+
+def _louvain_one_level(adjacency, labels, resolution=1.0, max_passes=20, m2=None):
+    """Phase de déplacement local de Louvain (retourne les labels et le nombre de déplacements)"""
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    m2 = float(degrees.sum() if m2 is None else m2)
+    if m2 == 0:
+        return labels.copy(), 0
+
+    # Listes Python: l'accès élément par élément y est bien plus rapide que sur ndarray
+    indptr = adjacency.indptr.tolist()
+    indices = adjacency.indices.tolist()
+    data = adjacency.data.tolist()
+    k = degrees.tolist()
+    node_comm = labels.tolist()
+    totals = np.bincount(labels, weights=degrees, minlength=adjacency.shape[0]).tolist()
+    scale = resolution / m2
+    total_moves = 0
+
+    for _ in range(max_passes):
+        moves = 0
+        for node in range(len(node_comm)):
+            links = {}
+            for j in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[j]
+                if neighbor != node:
+                    comm = node_comm[neighbor]
+                    links[comm] = links.get(comm, 0.0) + data[j]
+
+            current = node_comm[node]
+            k_i = k[node]
+            totals[current] -= k_i
+
+            best_comm = current
+            best_gain = links.get(current, 0.0) - totals[current] * k_i * scale
+            for comm, weight in links.items():
+                gain = weight - totals[comm] * k_i * scale
+                if gain > best_gain + 1e-12:
+                    best_comm, best_gain = comm, gain
+
+            totals[best_comm] += k_i
+            if best_comm != current:
+                node_comm[node] = best_comm
+                moves += 1
+
+        total_moves += moves
+        if moves == 0:
+            break
+
+    return np.array(node_comm, dtype=np.int64), total_moves
+
+
+def louvain_csr(adjacency, initial_labels=None, resolution=1.0, max_levels=10, tol=1e-7, m2=None):
+    """
+    Louvain directement sur une matrice CSR symétrique (sans copie NetworkX).
+    `initial_labels` permet un démarrage à chaud depuis une partition précédente.
+    `m2` : poids total du graphe entier quand `adjacency` n'en est qu'un bloc de
+    composantes, pour que les gains de modularité soient ceux du graphe entier.
+    """
+    n = adjacency.shape[0]
+    if initial_labels is None:
+        level_labels = np.arange(n)
+    else:
+        level_labels = np.unique(np.asarray(initial_labels), return_inverse=True)[1]
+
+    # node_labels: nœud d'origine -> nœud du niveau courant
+    node_labels = np.arange(n)
+    level_adjacency = adjacency
+    best_labels = level_labels.copy()
+    best_modularity = _modularity_csr(adjacency, best_labels, resolution, m2)
+
+    for _ in range(max_levels):
+        level_labels, moves = _louvain_one_level(level_adjacency, level_labels, resolution, m2=m2)
+        level_labels = np.unique(level_labels, return_inverse=True)[1]
+        candidate = level_labels[node_labels]
+
+        modularity = _modularity_csr(adjacency, candidate, resolution, m2)
+        if modularity >= best_modularity:
+            best_labels = candidate
+        if moves == 0 or modularity - best_modularity < tol:
+            break
+
+        node_labels = candidate
+        best_modularity = modularity
+
+        # Agréger chaque communauté en un super-nœud
+        n_comms = level_labels.max() + 1
+        projection = csr_matrix(
+            (np.ones(level_labels.size), (np.arange(level_labels.size), level_labels)),
+            shape=(level_labels.size, n_comms)
+        )
+        level_adjacency = (projection.T @ level_adjacency @ projection).tocsr()
+        level_labels = np.arange(n_comms)
+
+    return np.unique(best_labels, return_inverse=True)[1]
+
+
+# ==================== MINHASH / LSH ====================
+
+_MINHASH_PRIME = np.uint64((1 << 31) - 1)
+
+
+def minhash_signatures(groups, items, n_groups, num_perm=128, seed=42):
+    """
+    Signatures MinHash (n_groups x num_perm) des ensembles {items[i] | groups[i] == g}.
+    Hachage universel (a*x + b) mod p, minimum par groupe via np.minimum.reduceat.
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, int(_MINHASH_PRIME), size=num_perm).astype(np.uint64)
+    b = rng.randint(0, int(_MINHASH_PRIME), size=num_perm).astype(np.uint64)
+
+    order = np.argsort(groups, kind='stable')
+    groups = groups[order]
+    items = items[order].astype(np.uint64)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+    signatures = np.full((n_groups, num_perm), _MINHASH_PRIME, dtype=np.uint64)
+    # Par blocs de permutations pour borner la mémoire (edges x bloc)
+    chunk = max(1, min(num_perm, 4_000_000 // max(len(items), 1)))
+    for start in range(0, num_perm, chunk):
+        stop = min(start + chunk, num_perm)
+        hashed = (items[:, None] * a[None, start:stop] + b[None, start:stop]) % _MINHASH_PRIME
+        signatures[groups[starts], start:stop] = np.minimum.reduceat(hashed, starts, axis=0)
+
+    return signatures
+
+
+def _lsh_band_layout(num_perm, threshold):
+    """Choisit (bandes, lignes) dont le seuil LSH (1/b)^(1/r) reste sous le seuil visé (bon rappel)"""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= 0.9 * threshold:
+            best = (bands, rows)
+    return best
+
+
+def lsh_similar_components(signatures, threshold=0.8):
+    """
+    Regroupe les lignes dont la similarité de Jaccard estimée dépasse `threshold`.
+    Banding LSH pour les candidats, vérification contre l'ancre du bucket,
+    puis union-find (composantes connexes) sur les paires retenues.
+    """
+    from scipy.sparse.csgraph import connected_components
+
+    n, num_perm = signatures.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    bands, rows = _lsh_band_layout(num_perm, threshold)
+    pair_left, pair_right = [], []
+
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, bucket = np.unique(keys, return_inverse=True)
+
+        order = np.argsort(bucket, kind='stable')
+        sorted_bucket = bucket[order]
+        first = np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]]
+        anchors = order[first][np.cumsum(first) - 1]
+        candidates = ~first
+        if not candidates.any():
+            continue
+
+        left = anchors[candidates]
+        right = order[candidates]
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        keep = similarity >= threshold
+        pair_left.append(left[keep])
+        pair_right.append(right[keep])
+
+    if pair_left:
+        left = np.concatenate(pair_left)
+        right = np.concatenate(pair_right)
+    else:
+        left = right = np.zeros(0, dtype=np.int64)
+
+    links = csr_matrix((np.ones(left.size), (left, right)), shape=(n, n))
+    _, components = connected_components(links, directed=False)
+    return components
+
+
+# ==================== COMPOSANTES CONNEXES ====================
+
+# Ni les cycles ni les communautés Louvain ne traversent une composante faiblement
+# connexe : les composantes sont regroupées en lots traités par un pool de processus
+COMPONENT_WORKERS = min(4, os.cpu_count() or 1)
+# Les composantes plus petites que ce nombre de nœuds sont regroupées dans un même lot
+COMPONENT_BATCH_NODES = 5000
+
+_component_executor = None
+
+
+def weak_component_labels(n, src, dst):
+    """Composante faiblement connexe de chaque nœud du graphe orienté src -> dst"""
+    from scipy.sparse.csgraph import connected_components
+
+    graph = csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+    return connected_components(graph, directed=True, connection='weak')[1]
+
+
+def component_batches(labels, min_size=1, batch_nodes=COMPONENT_BATCH_NODES):
+    """
+    Lots de nœuds (indices croissants) : chaque grande composante forme son lot,
+    les petites sont regroupées jusqu'à batch_nodes nœuds. Les composantes de moins
+    de min_size nœuds sont ignorées.
+    """
+    if len(labels) == 0:
+        return []
+    sizes = np.bincount(labels)
+    order = np.argsort(labels, kind='stable')
+    members = np.split(order, np.cumsum(sizes)[:-1])
+
+    batches, pending, pending_size = [], [], 0
+    for comp in np.argsort(-sizes, kind='stable'):
+        if sizes[comp] < min_size:
+            break
+        if sizes[comp] >= batch_nodes:
+            batches.append(members[comp])
+            continue
+        pending.append(members[comp])
+        pending_size += sizes[comp]
+        if pending_size >= batch_nodes:
+            batches.append(np.sort(np.concatenate(pending)))
+            pending, pending_size = [], 0
+    if pending:
+        batches.append(np.sort(np.concatenate(pending)))
+    return batches
+
+
+def _get_component_executor():
+    """Pool partagé (contexte spawn : sûr quel que soit l'état des threads du parent)"""
+    global _component_executor
+    if _component_executor is None:
+        _component_executor = ProcessPoolExecutor(max_workers=COMPONENT_WORKERS,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+    return _component_executor
+
+
+def map_component_batches(function, payloads):
+    """
+    Applique `function` à chaque lot, dans le pool dès qu'il y a plusieurs lots et
+    plusieurs CPU. Les résultats sont rendus dans l'ordre des lots.
+    """
+    global _component_executor
+    if COMPONENT_WORKERS > 1 and len(payloads) > 1:
+        try:
+            return list(_get_component_executor().map(function, payloads))
+        except Exception as e:
+            print(f"   ⚠️  Pool de composantes indisponible ({e}), traitement séquentiel")
+            # Un pool cassé n'accepte plus rien : il sera recréé au prochain appel
+            if _component_executor is not None:
+                _component_executor.shutdown(wait=False, cancel_futures=True)
+                _component_executor = None
+    return [function(payload) for payload in payloads]
+
+
+def _component_cycles(payload):
+    """Cycles de 3 à 5 wallets d'un lot de composantes (adresses, arêtes locales, volumes)"""
+    addresses, src, dst, amounts = payload
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(len(addresses)))
+    for u, v, amount in zip(src.tolist(), dst.tolist(), amounts.tolist()):
+        graph.add_edge(u, v, total_amount=amount)
+
+    patterns = []
+    for cycle in nx.simple_cycles(graph):
+        if 3 <= len(cycle) <= 5:
+            volumes = [graph[cycle[i]][cycle[(i + 1) % len(cycle)]]['total_amount'] for i in range(len(cycle))]
+            total_volume = sum(volumes)
+            patterns.append({
+                'type': 'circular_trading',
+                'cycle': [addresses[i] for i in cycle],
+                'length': len(cycle),
+                'total_volume': total_volume,
+                'avg_volume': total_volume / len(volumes)
+            })
+    return patterns
+
+
+def _component_louvain(payload):
+    """Louvain sur un lot de composantes (bloc de la matrice, labels initiaux, poids total)"""
+    adjacency, initial_labels, m2 = payload
+    return louvain_csr(adjacency, initial_labels, m2=m2)
+
+
+# ==================== SUPER-NŒUDS ====================
+
+# Routers DEX et hot wallets d'exchanges connus : jamais explorés par la recherche de cycles
+KNOWN_HUB_ADDRESSES = {
+    "0x7a250d5630b4cf539739df2c5dacb4c659f2488d": "Uniswap V2: Router",
+    "0xe592427a0aece92de3edee1f18e0157c05861564": "Uniswap V3: Router",
+    "0x3fc91a3afd70395cd496c647d5a6cc9d4b2b7fad": "Uniswap: Universal Router",
+    "0x1111111254eeb25477b68fb85ed929f73a960582": "1inch v5: Aggregation Router",
+    "0x28c6c06298d514db089934071355e5743bf21d60": "Binance 14",
+}
+
+# Sont aussi des super-nœuds les wallets dont le degré atteint ce percentile du
+# graphe et au moins HUB_MIN_DEGREE contreparties
+HUB_DEGREE_PERCENTILE = 99.9
+HUB_MIN_DEGREE = 1000
+
+
+# ==================== TABLE DE CLUSTERS COLONNAIRE ====================
+
+# Score de base par type de détection
+CLUSTER_TYPE_WEIGHTS = {
+    'circular_trading': 0.95,
+    'ponzi_suspected': 0.90,
+    'mixer_suspected': 0.85,
+    'star_funding': 0.80,
+    'common_source_with_whales': 0.75,
+    'common_source': 0.65,
+    'highly_connected_with_whales': 0.70,
+    'highly_connected': 0.60,
+    'amount_based_with_whales': 0.55,
+    'amount_based': 0.45,
+    'cascade_funding': 0.50,
+    'reciprocal_trading': 0.75
+}
+
+# Types dont le score est majoré de 10%
+AMPLIFIED_CLUSTER_TYPES = ('circular_trading', 'ponzi_suspected', 'mixer_suspected')
+
+RISK_LEVELS = np.array(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])
+RISK_LEVEL_BOUNDS = [0.40, 0.60, 0.75]
+
+
+class ClusterTable:
+    """
+    Clusters stockés en colonnes NumPy (type, taille, volume, whales, uniformité,
+    membres via offsets dans un tableau d'ids de wallets). Les champs propres à
+    chaque détecteur restent dans `payloads`; les dicts ne sont reconstruits
+    qu'à la sérialisation (itération, `to_dicts`).
+    """
+
+    def __init__(self, wallets=None, wallet_index=None):
+        self.wallets = list(wallets or [])
+        self.wallet_index = dict(wallet_index or {})
+        self.types = []
+        self.type_code = np.zeros(0, dtype=np.int32)
+        self.size = np.zeros(0, dtype=np.int64)
+        self.volume = np.zeros(0, dtype=np.float64)
+        self.whale_count = np.zeros(0, dtype=np.float64)
+        self.uniformity = np.zeros(0, dtype=np.float64)
+        self.member_offsets = np.zeros(1, dtype=np.int64)
+        self.member_ids = np.zeros(0, dtype=np.int64)
+        self.has_wallets = np.zeros(0, dtype=bool)
+        self.risk_score = None
+        self.risk_level = None
+        self.payloads = []
+
+    @classmethod
+    def from_clusters(cls, clusters, wallets=None, wallet_index=None):
+        """Construit la table en une seule passe sur les dicts des détecteurs"""
+        if isinstance(clusters, cls):
+            return clusters
+
+        table = cls(wallets, wallet_index)
+        type_codes = {}
+        columns = {'type_code': [], 'size': [], 'volume': [], 'whale_count': [],
+                   'uniformity': [], 'has_wallets': [], 'lengths': []}
+        member_ids = []
+
+        for cluster in clusters:
+            cluster_type = cluster.get('type', '')
+            if cluster_type not in type_codes:
+                type_codes[cluster_type] = len(table.types)
+                table.types.append(cluster_type)
+
+            # Volume: premier champ disponible selon le détecteur
+            volume = cluster.get('total_amount',
+                                 cluster.get('total_volume',
+                                             cluster.get('total_received',
+                                                         cluster.get('total_in', 0))))
+
+            uniformity = 0
+            if 'cv' in cluster and cluster['cv'] < 0.3:
+                uniformity = 0.8
+            if 'is_uniform' in cluster and cluster['is_uniform']:
+                uniformity = 0.9
+            if 'similarity_ratio' in cluster and cluster['similarity_ratio'] > 0.8:
+                uniformity = 0.7
+
+            members = (cluster.get('wallets') or cluster.get('receivers') or cluster.get('cycle') or
+                       cluster.get('pair') or cluster.get('path') or
+                       [cluster[key] for key in ('node', 'wallet', 'source') if key in cluster])
+            member_ids.extend(table._wallet_id(addr) for addr in members)
+
+            columns['type_code'].append(type_codes[cluster_type])
+            columns['size'].append(cluster.get('size', 0))
+            columns['volume'].append(volume)
+            columns['whale_count'].append(cluster.get('whale_count', 0))
+            columns['uniformity'].append(uniformity)
+            columns['has_wallets'].append('wallets' in cluster)
+            columns['lengths'].append(len(members))
+
+            table.payloads.append({k: v for k, v in cluster.items()
+                                   if k not in ('wallets', 'risk_score', 'risk_level')})
+
+        table.type_code = np.array(columns['type_code'], dtype=np.int32)
+        table.size = np.array(columns['size'], dtype=np.int64)
+        table.volume = np.array(columns['volume'], dtype=np.float64)
+        table.whale_count = np.array(columns['whale_count'], dtype=np.float64)
+        table.uniformity = np.array(columns['uniformity'], dtype=np.float64)
+        table.has_wallets = np.array(columns['has_wallets'], dtype=bool)
+        table.member_offsets = np.concatenate([[0], np.cumsum(columns['lengths'], dtype=np.int64)])
+        table.member_ids = np.array(member_ids, dtype=np.int64)
+        return table
+
+    def _wallet_id(self, address):
+        wallet_id = self.wallet_index.get(address)
+        if wallet_id is None:
+            wallet_id = len(self.wallets)
+            self.wallet_index[address] = wallet_id
+            self.wallets.append(address)
+        return wallet_id
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def type_names(self):
+        """Nom du type de chaque cluster"""
+        return np.array(self.types, dtype=object)[self.type_code] if len(self) else np.array([], dtype=object)
+
+    def members(self, i):
+        """Adresses membres du cluster i"""
+        ids = self.member_ids[self.member_offsets[i]:self.member_offsets[i + 1]]
+        return [self.wallets[w] for w in ids]
+
+    def score(self):
+        """Score de risque composite et niveau, en expressions vectorisées"""
+        weights = np.array([CLUSTER_TYPE_WEIGHTS.get(t, 0.3) for t in self.types] or [0.3])
+        amplified = np.array([t in AMPLIFIED_CLUSTER_TYPES for t in self.types] or [False])
+
+        base_score = weights[self.type_code]
+        size_score = np.minimum(self.size / 10, 1.0)
+        volume_score = np.where(self.volume > 0, np.minimum(self.volume / 1000, 1.0), 0.0)
+        whale_score = np.minimum(self.whale_count / 5, 1.0)
+
+        risk_score = (
+            base_score * 0.35 +
+            size_score * 0.20 +
+            volume_score * 0.20 +
+            whale_score * 0.15 +
+            self.uniformity * 0.10
+        )
+        risk_score = np.where(amplified[self.type_code], risk_score * 1.1, risk_score)
+        risk_score = np.minimum(risk_score, 1.0)
+
+        self.risk_score = risk_score
+        self.risk_level = np.digitize(risk_score, RISK_LEVEL_BOUNDS)
+        return self
+
+    def row(self, i):
+        """Vue dict du cluster i (sérialisation)"""
+        cluster = dict(self.payloads[i])
+        if self.has_wallets[i]:
+            cluster['wallets'] = self.members(i)
+        if self.risk_score is not None:
+            cluster['risk_score'] = round(float(self.risk_score[i]), 3)
+            cluster['risk_level'] = str(RISK_LEVELS[self.risk_level[i]])
+        return cluster
+
+    def to_dicts(self):
+        """Liste de dicts pour l'export JSON / l'API"""
+        return list(self)
+
+
 class ForensicGraphAgent:
     def __init__(self, api_key):
         self.api_key = api_key
@@ -21,7 +523,9 @@ class ForensicGraphAgent:
         self.combined_G = nx.DiGraph()
         self.token_holders = {}
         self.transactions_cache = []
-        
+        self.community_partition = {}
+        self._arrays = None
+
     def fetch_real_transactions(self, days_back=7, limit=5000, currency="ETH", token_contract_address=None):
         """Récupère les transactions réelles depuis BitQuery"""
         start_time = time.time()
@@ -560,7 +1064,10 @@ class ForensicGraphAgent:
             self.combined_G[u][v]['combined_weight'] = weight
             self.combined_G[u][v]['combined_total'] = total_amount
             self.combined_G[u][v]['combined_count'] = tx_count
-        
+
+        # Invalider la représentation tabulaire du graphe précédent
+        self._arrays = None
+
         print(f"\n📊 STATISTIQUES DU GRAPHE RÉEL:")
         print(f"   • Nœuds uniques: {self.combined_G.number_of_nodes()}")
         print(f"   • Arêtes uniques: {self.combined_G.number_of_edges()}")
@@ -581,7 +1088,103 @@ class ForensicGraphAgent:
                 print(f"   • Hubs (≥5 connexions): {len(hubs)}")
         
         return self.combined_G
-    
+
+    # ==================== REPRÉSENTATION TABULAIRE DU GRAPHE ====================
+
+    def _graph_arrays(self):
+        """Indexe combined_G en tableaux NumPy (nœuds, src, dst, montants, poids), mis en cache"""
+        n_edges = self.combined_G.number_of_edges()
+        if self._arrays is not None and self._arrays['n_edges'] == n_edges:
+            return self._arrays
+
+        nodes = list(self.combined_G.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+
+        src = np.empty(n_edges, dtype=np.int64)
+        dst = np.empty(n_edges, dtype=np.int64)
+        amounts = np.empty(n_edges, dtype=np.float64)
+        weights = np.empty(n_edges, dtype=np.float64)
+
+        for i, (sender, receiver, data) in enumerate(self.combined_G.edges(data=True)):
+            src[i] = index[sender]
+            dst[i] = index[receiver]
+            amounts[i] = data.get('total_amount', data.get('combined_total', 0))
+            weights[i] = data.get('weight', 1)
+
+        self._arrays = {
+            'nodes': nodes,
+            'index': index,
+            'src': src,
+            'dst': dst,
+            'amounts': amounts,
+            'weights': weights,
+            'n_edges': n_edges,
+            'undirected': None
+        }
+        return self._arrays
+
+    def _undirected_csr(self):
+        """Matrice d'adjacence non orientée (A + Aᵀ) au format CSR, construite depuis les tableaux"""
+        arrays = self._graph_arrays()
+        if arrays['undirected'] is None:
+            n = len(arrays['nodes'])
+            directed = csr_matrix((arrays['weights'], (arrays['src'], arrays['dst'])), shape=(n, n))
+            arrays['undirected'] = (directed + directed.T).tocsr()
+        return arrays['undirected']
+
+    def identify_super_nodes(self, percentile=HUB_DEGREE_PERCENTILE, min_degree=HUB_MIN_DEGREE):
+        """
+        Super-nœuds (exchanges, routers) : adresses connues, plus les wallets dont le
+        degré dépasse à la fois le percentile du graphe et min_degree.
+        Retourne {adresse: degré}
+        """
+        arrays = self._graph_arrays()
+        n = len(arrays['nodes'])
+        if n == 0:
+            return {}
+
+        degree = np.bincount(arrays['src'], minlength=n) + np.bincount(arrays['dst'], minlength=n)
+        threshold = max(min_degree, np.percentile(degree, percentile))
+        hubs = degree >= threshold
+        for address in KNOWN_HUB_ADDRESSES:
+            i = arrays['index'].get(address, arrays['index'].get(address.lower()))
+            if i is not None:
+                hubs[i] = True
+
+        return {arrays['nodes'][i]: int(degree[i]) for i in np.flatnonzero(hubs)}
+
+    def _summarize_super_nodes(self, super_nodes):
+        """Affiche l'activité des super-nœuds exclus (résumée au lieu d'être explorée)"""
+        if not super_nodes:
+            return
+        print(f"   • {len(super_nodes)} super-nœuds exclus (exchanges/routers), non explorés:")
+        for address, degree in sorted(super_nodes.items(), key=lambda item: -item[1])[:5]:
+            label = KNOWN_HUB_ADDRESSES.get(address.lower(), 'degré élevé')
+            print(f"     - {address[:10]}... ({label}): {degree} connexions")
+
+    def load_community_partition(self, filename):
+        """Charge une partition précédente (adresse -> communauté) pour le démarrage à chaud"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                self.community_partition = {addr: int(comm) for addr, comm in json.load(f).items()}
+            print(f"   • Partition précédente chargée: {len(self.community_partition)} wallets")
+        except FileNotFoundError:
+            self.community_partition = {}
+        except Exception as e:
+            print(f"⚠️  Erreur chargement partition: {e}")
+            self.community_partition = {}
+        return self.community_partition
+
+    def save_community_partition(self, filename):
+        """Sauvegarde la dernière partition Louvain pour la prochaine analyse du même token"""
+        if not self.community_partition:
+            return
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.community_partition, f)
+        except Exception as e:
+            print(f"⚠️  Erreur sauvegarde partition: {e}")
+
     # ==================== MÉTHODES DE DÉTECTION AVANCÉES ====================
     
     def detect_funding_patterns(self):
@@ -672,38 +1275,23 @@ class ForensicGraphAgent:
         
         wash_patterns = []
         
-        # 1. Cycles courts (3-5 nœuds)
+        # Les super-nœuds sont des extrémités : les cycles qui les traversent
+        # exploseraient sans rien révéler
+        super_nodes = self.identify_super_nodes()
+        self._summarize_super_nodes(super_nodes)
+        graph = self.combined_G.subgraph(
+            [node for node in self.combined_G if node not in super_nodes]) if super_nodes else self.combined_G
+        
+        # 1. Cycles courts (3-5 nœuds), composante par composante dans le pool
         try:
-            cycles = list(nx.simple_cycles(self.combined_G))
-            
-            for cycle in cycles:
-                if 3 <= len(cycle) <= 5:
-                    # Calculer les volumes
-                    volumes = []
-                    for i in range(len(cycle)):
-                        sender = cycle[i]
-                        receiver = cycle[(i + 1) % len(cycle)]
-                        
-                        if self.combined_G.has_edge(sender, receiver):
-                            volumes.append(self.combined_G[sender][receiver].get('total_amount', 0))
-                    
-                    if len(volumes) == len(cycle):
-                        total_volume = sum(volumes)
-                        
-                        wash_patterns.append({
-                            'type': 'circular_trading',
-                            'cycle': cycle,
-                            'length': len(cycle),
-                            'total_volume': total_volume,
-                            'avg_volume': total_volume / len(volumes)
-                        })
+            wash_patterns.extend(self._cycles_by_component(super_nodes))
         except Exception as e:
             print(f"   ⚠️  Erreur détection cycles: {e}")
         
         # 2. Paires de trading réciproques
         reciprocal_pairs = []
-        for u, v in self.combined_G.edges():
-            if self.combined_G.has_edge(v, u):
+        for u, v in graph.edges():
+            if graph.has_edge(v, u):
                 vol_u_to_v = self.combined_G[u][v].get('total_amount', 0)
                 vol_v_to_u = self.combined_G[v][u].get('total_amount', 0)
                 
@@ -727,14 +1315,75 @@ class ForensicGraphAgent:
         print(f"✅ {len(wash_patterns)} patterns de wash trading détectés")
         return wash_patterns
     
+    def _cycles_by_component(self, super_nodes):
+        """
+        Cycles de 3 à 5 wallets hors super-nœuds. Un cycle reste dans une composante
+        faiblement connexe : les composantes d'au moins 3 nœuds sont réparties en lots
+        et énumérées en parallèle, les résultats fusionnés dans l'ordre des lots.
+        """
+        arrays = self._graph_arrays()
+        nodes, index = arrays['nodes'], arrays['index']
+        n = len(nodes)
+
+        keep = np.ones(n, dtype=bool)
+        keep[[index[address] for address in super_nodes]] = False
+        kept_edges = keep[arrays['src']] & keep[arrays['dst']]
+        src, dst = arrays['src'][kept_edges], arrays['dst'][kept_edges]
+        amounts = arrays['amounts'][kept_edges]
+
+        # Les super-nœuds, isolés une fois leurs arêtes retirées, ne forment aucun lot
+        batches = component_batches(weak_component_labels(n, src, dst), min_size=3)
+        batch_of = np.full(n, -1, dtype=np.int64)
+        local = np.zeros(n, dtype=np.int64)
+        for b, batch in enumerate(batches):
+            batch_of[batch] = b
+            local[batch] = np.arange(len(batch))
+
+        # Arêtes groupées par lot, dans leur ordre d'origine
+        edge_batch = batch_of[src]
+        order = np.argsort(edge_batch, kind='stable')
+        bounds = np.searchsorted(edge_batch[order], np.arange(len(batches) + 1))
+        payloads = []
+        for b, batch in enumerate(batches):
+            edges = order[bounds[b]:bounds[b + 1]]
+            payloads.append(([nodes[i] for i in batch], local[src[edges]], local[dst[edges]], amounts[edges]))
+
+        if len(payloads) > 1:
+            print(f"   • {len(payloads)} lots de composantes ({min(COMPONENT_WORKERS, len(payloads))} processus)")
+        return [pattern for patterns in map_component_batches(_component_cycles, payloads)
+                for pattern in patterns]
+
+    def _louvain_by_component(self, initial_labels=None):
+        """
+        Louvain lot de composantes par lot (dans le pool), avec le poids total du
+        graphe entier : une communauté ne traverse jamais une composante
+        """
+        arrays = self._graph_arrays()
+        adjacency = self._undirected_csr()
+        n = adjacency.shape[0]
+        m2 = float(adjacency.sum())
+
+        batches = component_batches(weak_component_labels(n, arrays['src'], arrays['dst']))
+        payloads = [(adjacency[batch][:, batch], None if initial_labels is None else initial_labels[batch], m2)
+                    for batch in batches]
+
+        labels = np.zeros(n, dtype=np.int64)
+        offset = 0
+        for batch, batch_labels in zip(batches, map_component_batches(_component_louvain, payloads)):
+            labels[batch] = batch_labels + offset
+            offset += int(batch_labels.max()) + 1
+        return labels
+
     def detect_wash_trading_sampling(self, sample_size=1000, max_cycles=50):
         """Version avec échantillonnage pour très grands graphes"""
         print(f"\n🔄 Détection de wash trading (échantillonnage de {sample_size} nœuds)...")
     
         wash_patterns = []
     
-        # Échantillonner les nœuds pour l'analyse
-        all_nodes = list(self.combined_G.nodes())
+        # Échantillonner les nœuds pour l'analyse, hors super-nœuds
+        super_nodes = self.identify_super_nodes()
+        self._summarize_super_nodes(super_nodes)
+        all_nodes = [node for node in self.combined_G.nodes() if node not in super_nodes]
     
         if len(all_nodes) > sample_size:
             import random
@@ -1070,148 +1719,179 @@ class ForensicGraphAgent:
         
         print(f"\n✅ Total: {len(all_clusters)} clusters et patterns détectés")
         
-        return all_clusters
+        arrays = self._graph_arrays()
+        return ClusterTable.from_clusters(all_clusters, arrays['nodes'], arrays['index'])
     
-    def detect_common_source_clusters_real(self):
-        """Version améliorée pour données réelles"""
-        wallet_sources = defaultdict(set)
-        wallet_amounts = defaultdict(float)
-        
-        for sender, receiver, data in self.combined_G.edges(data=True):
-            amount = data.get('total_amount', data.get('combined_total', 0))
-            wallet_sources[receiver].add(sender)
-            wallet_amounts[receiver] += amount
-        
-        source_to_wallets = defaultdict(list)
-        for wallet, sources in wallet_sources.items():
-            if sources:
-                source_key = frozenset(sources)
-                source_to_wallets[source_key].append({
-                    'address': wallet,
-                    'amount_received': wallet_amounts[wallet]
-                })
-        
+    def detect_common_source_clusters_real(self, similarity_threshold=0.8, num_perm=128, min_size=3):
+        """
+        Clusters de wallets financés par des sources quasi identiques.
+        MinHash sur l'ensemble des expéditeurs de chaque receveur + LSH,
+        puis union-find: temps quasi linéaire, sans comparaison deux à deux.
+        """
+        arrays = self._graph_arrays()
+        nodes = arrays['nodes']
+        src, dst = arrays['src'], arrays['dst']
+        if src.size == 0:
+            return []
+
+        # Receveurs indexés de 0 à R-1
+        receivers, receiver_of_edge = np.unique(dst, return_inverse=True)
+        amount_received = np.bincount(receiver_of_edge, weights=arrays['amounts'], minlength=receivers.size)
+
+        signatures = minhash_signatures(receiver_of_edge, src, receivers.size, num_perm=num_perm)
+        components = lsh_similar_components(signatures, similarity_threshold)
+
+        sizes = np.bincount(components)
+        kept = np.flatnonzero(sizes >= min_size)
+        if kept.size == 0:
+            return []
+
+        # Sources de financement uniques par cluster
+        edge_component = components[receiver_of_edge]
+        edge_mask = np.isin(edge_component, kept)
+        source_pairs = np.unique(np.stack([edge_component[edge_mask], src[edge_mask]], axis=1), axis=0)
+        source_bounds = np.searchsorted(source_pairs[:, 0], kept, side='left'), np.searchsorted(source_pairs[:, 0], kept, side='right')
+
+        order = np.argsort(components, kind='stable')
+        member_bounds = np.searchsorted(components[order], kept, side='left'), np.searchsorted(components[order], kept, side='right')
+
         clusters = []
-        for sources, wallets in source_to_wallets.items():
-            if len(wallets) >= 3:
-                total_received = sum(w['amount_received'] for w in wallets)
-                
-                clusters.append({
-                    'type': 'common_source',
-                    'funding_sources': list(sources),
-                    'wallets': [w['address'] for w in wallets],
-                    'wallet_details': wallets,
-                    'size': len(wallets),
-                    'source_count': len(sources),
-                    'total_received': total_received,
-                    'avg_received': total_received / len(wallets)
-                })
-        
+        for i in range(kept.size):
+            members = order[member_bounds[0][i]:member_bounds[1][i]]
+            sources = source_pairs[source_bounds[0][i]:source_bounds[1][i], 1]
+            wallets = [{
+                'address': nodes[receivers[m]],
+                'amount_received': float(amount_received[m])
+            } for m in members]
+            total_received = float(amount_received[members].sum())
+
+            clusters.append({
+                'type': 'common_source',
+                'funding_sources': [nodes[s] for s in sources],
+                'wallets': [w['address'] for w in wallets],
+                'wallet_details': wallets,
+                'size': len(wallets),
+                'source_count': int(sources.size),
+                'total_received': total_received,
+                'avg_received': total_received / len(wallets),
+                'similarity_threshold': similarity_threshold
+            })
+
         return clusters
     
-    def detect_highly_connected_clusters_real(self, min_size=3):
-        """Détection de communautés sur données réelles"""
+    def detect_highly_connected_clusters_real(self, min_size=3, initial_partition=None):
+        """
+        Détection de communautés sur données réelles (Louvain sur CSR).
+        `initial_partition` (adresse -> communauté) sert de démarrage à chaud;
+        par défaut la partition de l'analyse précédente est réutilisée.
+        """
         if self.combined_G.number_of_nodes() < min_size:
             return []
-        
+
         try:
-            if nx.is_directed(self.combined_G):
-                G_undirected = self.combined_G.to_undirected()
-            else:
-                G_undirected = self.combined_G.copy()
-            
-            partition = community_louvain.best_partition(G_undirected)
-            
-            communities = defaultdict(list)
-            for node, comm_id in partition.items():
-                communities[comm_id].append(node)
-            
+            arrays = self._graph_arrays()
+            nodes = arrays['nodes']
+            n = len(nodes)
+
+            # Démarrage à chaud: les nouveaux wallets commencent en singleton
+            if initial_partition is None:
+                initial_partition = self.community_partition
+            initial_labels = None
+            if initial_partition:
+                offset = max(initial_partition.values(), default=-1) + 1
+                initial_labels = np.array([
+                    initial_partition.get(node, offset + i) for i, node in enumerate(nodes)
+                ], dtype=np.int64)
+
+            labels = self._louvain_by_component(initial_labels)
+            self.community_partition = {node: int(label) for node, label in zip(nodes, labels)}
+
+            n_comms = labels.max() + 1 if n else 0
+            sizes = np.bincount(labels, minlength=n_comms)
+
+            # Arêtes non orientées uniques (u <= v) et arêtes internes aux communautés
+            src, dst = arrays['src'], arrays['dst']
+            low, high = np.minimum(src, dst), np.maximum(src, dst)
+            pairs = np.unique(low * n + high)
+            low, high = pairs // n, pairs % n
+            internal = labels[low] == labels[high]
+            internal_edges = np.bincount(labels[low[internal]], minlength=n_comms)
+
+            directed_internal = labels[src] == labels[dst]
+            internal_volume = np.bincount(labels[src[directed_internal]],
+                                          weights=arrays['amounts'][directed_internal],
+                                          minlength=n_comms)
+
+            possible = sizes * (sizes - 1) / 2
+            density = np.divide(internal_edges, possible, out=np.zeros(n_comms), where=possible > 0)
+            avg_degree = np.divide(2 * internal_edges, sizes, out=np.zeros(n_comms), where=sizes > 0)
+
+            # Membres groupés par communauté
+            order = np.argsort(labels, kind='stable')
+            boundaries = np.cumsum(sizes)[:-1]
+            members = np.split(order, boundaries)
+
             clusters = []
-            for comm_id, nodes in communities.items():
-                if len(nodes) >= min_size:
-                    subgraph = G_undirected.subgraph(nodes)
-                    
-                    density = nx.density(subgraph)
-                    degrees = [deg for _, deg in subgraph.degree()]
-                    avg_degree = sum(degrees) / len(degrees) if degrees else 0
-                    
-                    # Calculer le volume interne
-                    internal_volume = 0
-                    for u, v, data in subgraph.edges(data=True):
-                        internal_volume += data.get('total_amount', data.get('combined_total', 0))
-                    
-                    clusters.append({
-                        'type': 'highly_connected',
-                        'community_id': comm_id,
-                        'wallets': nodes,
-                        'size': len(nodes),
-                        'density': density,
-                        'avg_degree': avg_degree,
-                        'internal_edges': subgraph.number_of_edges(),
-                        'internal_volume': internal_volume
-                    })
-            
+            for comm_id in np.flatnonzero(sizes >= min_size):
+                clusters.append({
+                    'type': 'highly_connected',
+                    'community_id': int(comm_id),
+                    'wallets': [nodes[i] for i in members[comm_id]],
+                    'size': int(sizes[comm_id]),
+                    'density': float(density[comm_id]),
+                    'avg_degree': float(avg_degree[comm_id]),
+                    'internal_edges': int(internal_edges[comm_id]),
+                    'internal_volume': float(internal_volume[comm_id])
+                })
+
             return clusters
-            
+
         except Exception as e:
             print(f"   ⚠️  Erreur Louvain: {e}")
             return []
     
     def detect_amount_based_clusters_real(self, amount_tolerance=0.2):
-        """Clusters par montant sur données réelles"""
-        edge_amounts = []
-        
-        for _, _, data in self.combined_G.edges(data=True):
-            amount = data.get('total_amount', data.get('combined_total', 0))
-            if amount > 0:
-                edge_amounts.append(amount)
-        
-        if len(edge_amounts) < 3:
+        """Clusters par montant sur données réelles (regroupement vectorisé NumPy)"""
+        arrays = self._graph_arrays()
+        positive = arrays['amounts'] > 0
+        amounts = arrays['amounts'][positive]
+
+        if amounts.size < 3:
             return []
-        
-        # Regrouper par plages de montants
-        amount_groups = defaultdict(list)
-        
-        for sender, receiver, data in self.combined_G.edges(data=True):
-            amount = data.get('total_amount', data.get('combined_total', 0))
-            if amount > 0:
-                # Arrondir à l'ordre de magnitude
-                if amount >= 1000:
-                    key = round(amount, -3)  # Arrondir au millier
-                elif amount >= 100:
-                    key = round(amount, -2)  # Arrondir à la centaine
-                elif amount >= 10:
-                    key = round(amount, -1)  # Arrondir à la dizaine
-                else:
-                    key = round(amount, 1)   # Arrondir au dixième
-                
-                amount_groups[key].append({
-                    'from': sender,
-                    'to': receiver,
-                    'amount': amount
-                })
-        
+
+        # Arrondir à l'ordre de magnitude: millier, centaine, dizaine, sinon dixième
+        magnitude = np.clip(np.floor(np.log10(amounts)), 0, 3)
+        step = np.where(magnitude >= 1, 10.0 ** magnitude, 0.1)
+        keys = np.where(magnitude >= 1, np.round(amounts / step) * step, np.round(amounts, 1))
+
+        bucket_keys, bucket = np.unique(keys, return_inverse=True)
+        n_buckets = bucket_keys.size
+        counts = np.bincount(bucket, minlength=n_buckets)
+        totals = np.bincount(bucket, weights=amounts, minlength=n_buckets)
+
+        # Wallets uniques par bucket: paires (bucket, wallet) dédupliquées
+        n_nodes = len(arrays['nodes'])
+        pairs = np.unique(np.concatenate([
+            bucket * n_nodes + arrays['src'][positive],
+            bucket * n_nodes + arrays['dst'][positive]
+        ]))
+        pair_bucket = pairs // n_nodes
+        unique_wallets = np.bincount(pair_bucket, minlength=n_buckets)
+
+        nodes = arrays['nodes']
         clusters = []
-        for amount_key, edges in amount_groups.items():
-            if len(edges) >= 3:
-                all_wallets = set()
-                total_amount = 0
-                
-                for edge in edges:
-                    all_wallets.add(edge['from'])
-                    all_wallets.add(edge['to'])
-                    total_amount += edge['amount']
-                
-                clusters.append({
-                    'type': 'amount_based',
-                    'amount_range': amount_key,
-                    'wallets': list(all_wallets),
-                    'size': len(all_wallets),
-                    'transaction_count': len(edges),
-                    'total_amount': total_amount,
-                    'avg_amount': total_amount / len(edges)
-                })
-        
+        for b in np.flatnonzero(counts >= 3):
+            lo, hi = np.searchsorted(pair_bucket, [b, b + 1])
+            clusters.append({
+                'type': 'amount_based',
+                'amount_range': float(bucket_keys[b]),
+                'wallets': [nodes[w] for w in pairs[lo:hi] % n_nodes],
+                'size': int(unique_wallets[b]),
+                'transaction_count': int(counts[b]),
+                'total_amount': float(totals[b]),
+                'avg_amount': float(totals[b] / counts[b])
+            })
+
         return clusters
     
     def detect_clusters_with_whales(self):
@@ -1252,87 +1932,14 @@ class ForensicGraphAgent:
         return whale_clusters
     
     def calculate_advanced_risk_metrics(self, clusters):
-        """Calcule des métriques de risque avancées"""
+        """Calcule des métriques de risque avancées (vectorisé sur la table de clusters)"""
         print("\n📊 Calcul des métriques de risque avancées...")
         
-        for cluster in clusters:
-            cluster_type = cluster.get('type', '')
-            
-            # Score basé sur le type
-            type_weights = {
-                'circular_trading': 0.95,
-                'ponzi_suspected': 0.90,
-                'mixer_suspected': 0.85,
-                'star_funding': 0.80,
-                'common_source_with_whales': 0.75,
-                'common_source': 0.65,
-                'highly_connected_with_whales': 0.70,
-                'highly_connected': 0.60,
-                'amount_based_with_whales': 0.55,
-                'amount_based': 0.45,
-                'cascade_funding': 0.50,
-                'reciprocal_trading': 0.75
-            }
-            
-            base_score = type_weights.get(cluster_type, 0.3)
-            
-            # Score basé sur la taille
-            size = cluster.get('size', 0)
-            size_score = min(size / 10, 1.0)
-            
-            # Score basé sur le volume
-            volume = cluster.get('total_amount', 
-                               cluster.get('total_volume', 
-                                         cluster.get('total_received', 
-                                                   cluster.get('total_in', 0))))
-            if volume > 0:
-                volume_score = min(volume / 1000, 1.0)  # Normaliser sur 1000 ETH
-            else:
-                volume_score = 0
-            
-            # Score basé sur les whales
-            whale_score = cluster.get('whale_count', 0) / 5 if 'whale_count' in cluster else 0
-            whale_score = min(whale_score, 1.0)
-            
-            # Score basé sur l'uniformité (pour les patterns de financement)
-            uniformity_score = 0
-            if 'cv' in cluster and cluster['cv'] < 0.3:
-                uniformity_score = 0.8
-            if 'is_uniform' in cluster and cluster['is_uniform']:
-                uniformity_score = 0.9
-            if 'similarity_ratio' in cluster and cluster['similarity_ratio'] > 0.8:
-                uniformity_score = 0.7
-            
-            # Calcul du score composite
-            risk_score = (
-                base_score * 0.35 +
-                size_score * 0.20 +
-                volume_score * 0.20 +
-                whale_score * 0.15 +
-                uniformity_score * 0.10
-            )
-            
-            # Ajustements
-            if cluster_type in ['circular_trading', 'ponzi_suspected', 'mixer_suspected']:
-                risk_score *= 1.1
-            
-            # Limiter à 1.0
-            risk_score = min(risk_score, 1.0)
-            
-            # Déterminer le niveau de risque
-            if risk_score >= 0.75:
-                risk_level = 'CRITICAL'
-            elif risk_score >= 0.60:
-                risk_level = 'HIGH'
-            elif risk_score >= 0.40:
-                risk_level = 'MEDIUM'
-            else:
-                risk_level = 'LOW'
-            
-            cluster['risk_score'] = round(risk_score, 3)
-            cluster['risk_level'] = risk_level
+        if not isinstance(clusters, ClusterTable):
+            arrays = self._graph_arrays()
+            clusters = ClusterTable.from_clusters(clusters, arrays['nodes'], arrays['index'])
         
-        return clusters
+        return clusters.score()
     
     def generate_real_data_report(self, clusters):
         """Génère un rapport pour les données réelles"""
@@ -1344,40 +1951,44 @@ class ForensicGraphAgent:
             print("\n❌ Aucun cluster ou pattern suspect détecté")
             return
         
+        if not isinstance(clusters, ClusterTable):
+            clusters = self.calculate_advanced_risk_metrics(clusters)
+        elif clusters.risk_score is None:
+            clusters.score()
+        
         total = len(clusters)
         
         # Compter par type
-        from collections import Counter
-        type_counter = Counter([c.get('type', 'unknown') for c in clusters])
+        type_counts = np.bincount(clusters.type_code, minlength=len(clusters.types))
+        type_order = np.argsort(-type_counts, kind='stable')
         
         print(f"\n📈 RÉSUMÉ GÉNÉRAL:")
         print(f"   • Total détections: {total}")
-        print(f"   • Types uniques: {len(type_counter)}")
+        print(f"   • Types uniques: {len(clusters.types)}")
         
         # Risques par niveau
-        risk_levels = defaultdict(int)
-        for c in clusters:
-            risk_levels[c.get('risk_level', 'UNKNOWN')] += 1
+        level_counts = np.bincount(clusters.risk_level, minlength=len(RISK_LEVELS))
         
         print(f"\n⚠️  NIVEAUX DE RISQUE:")
-        for level in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'UNKNOWN']:
-            count = risk_levels.get(level, 0)
+        for level in range(len(RISK_LEVELS) - 1, -1, -1):
+            count = int(level_counts[level])
             if count > 0:
                 percentage = (count / total) * 100
-                print(f"   • {level:9s}: {count:3d} ({percentage:5.1f}%)")
+                print(f"   • {RISK_LEVELS[level]:9s}: {count:3d} ({percentage:5.1f}%)")
         
         print(f"\n🔍 DISTRIBUTION PAR TYPE:")
-        for type_name, count in type_counter.most_common():
-            print(f"   • {type_name:25s}: {count:3d}")
+        for code in type_order:
+            print(f"   • {clusters.types[code]:25s}: {type_counts[code]:3d}")
         
         # Top 10 des détections les plus critiques
-        critical_clusters = [c for c in clusters if c.get('risk_level') in ['CRITICAL', 'HIGH']]
+        critical = np.flatnonzero(clusters.risk_level >= 2)
         
-        if critical_clusters:
+        if critical.size:
             print(f"\n🚨 TOP 10 DÉTECTIONS CRITIQUES:")
-            top_clusters = sorted(critical_clusters, key=lambda x: x.get('risk_score', 0), reverse=True)[:10]
+            top = critical[np.argsort(-np.round(clusters.risk_score[critical], 3), kind='stable')[:10]]
             
-            for i, cluster in enumerate(top_clusters, 1):
+            for i, index in enumerate(top, 1):
+                cluster = clusters.row(index)
                 print(f"\n   {i}. {cluster.get('type', 'N/A')}")
                 print(f"      Score: {cluster.get('risk_score', 0):.3f} | Niveau: {cluster.get('risk_level', 'N/A')}")
                 
@@ -1408,16 +2019,18 @@ class ForensicGraphAgent:
         # Recommandations
         print(f"\n💡 RECOMMANDATIONS:")
         
-        if any(c.get('type') == 'mixer_suspected' for c in clusters):
+        detected_types = set(clusters.types)
+        
+        if 'mixer_suspected' in detected_types:
             print("   • ⚠️  Mixers détectés: Surveiller les transactions de blanchiment")
         
-        if any(c.get('type') == 'ponzi_suspected' for c in clusters):
+        if 'ponzi_suspected' in detected_types:
             print("   • ⚠️  Patterns Ponzi: Investigation approfondie requise")
         
-        if any(c.get('type') == 'circular_trading' for c in clusters):
+        if 'circular_trading' in detected_types:
             print("   • ⚠️  Wash trading: Possible manipulation de marché")
         
-        if any('whale' in c.get('type', '') for c in clusters):
+        if any('whale' in t for t in detected_types):
             print("   • 🐋 Whales impliqués: Surveiller l'impact sur le marché")
         
         print(f"\n{'='*70}")
@@ -1432,6 +2045,10 @@ class ForensicGraphAgent:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Vues dict produites uniquement ici, à la sérialisation
+        if isinstance(clusters, ClusterTable):
+            clusters = clusters.to_dicts()
+        
         # Export JSON
         json_filename = f"{filename_prefix}_{timestamp}.json"
         try:
@@ -1564,12 +2181,22 @@ def main_real_data(token_contract_address=None):
     # 5. Construire le graphe
     agent.build_graph_from_real_data(all_transactions, internal_txs)
     
+    if token_contract_address:
+        filename_prefix = f"forensic_token_{token_contract_address[:10]}"
+    else:
+        filename_prefix = "forensic_real"
+    
+    # Partition Louvain de l'analyse précédente (démarrage à chaud)
+    partition_filename = f"{filename_prefix}_partition.json"
+    agent.load_community_partition(partition_filename)
+    
     # 6. Détection complète
     print("\n" + "=" * 70)
     print("🔎 ANALYSE FORENSIC COMPLÈTE")
     print("=" * 70)
     
     all_clusters = agent.detect_all_clusters_real()
+    agent.save_community_partition(partition_filename)
     
     # 7. Calcul des métriques
     if all_clusters:
@@ -1579,11 +2206,6 @@ def main_real_data(token_contract_address=None):
         agent.generate_real_data_report(all_clusters)
         
         # 9. Exporter les résultats
-        if token_contract_address:
-            filename_prefix = f"forensic_token_{token_contract_address[:10]}"
-        else:
-            filename_prefix = "forensic_real"
-            
         agent.export_results(all_clusters, filename_prefix)
         
         return all_clusters
@@ -1609,12 +2231,13 @@ if __name__ == "__main__":
     # Vérifier les dépendances
     try:
         import networkx as nx
-        import community
+        import numpy
+        import scipy
         import requests
         print("✅ Dépendances satisfaites")
     except ImportError as e:
         print(f"❌ Dépendance manquante: {e}")
-        print("   Installation: pip install networkx python-louvain requests")
+        print("   Installation: pip install networkx numpy scipy requests")
         sys.exit(1)
     
     print("\n" + "=" * 70)
@@ -11,6 +11,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/mixer", tags=["mixer"])
 
+# Largest max_hops accepted (the agent's MAX_HOPS_LIMIT)
+MAX_HOPS_LIMIT = 6
+
 
 @router.post("/analyze/{token_address}")
 async def analyze_token_for_mixers(
@@ -35,6 +38,12 @@ async def analyze_token_for_mixers(
             detail="Invalid token address format (must be 0x followed by 40 hex characters)"
         )
     
+    if not 1 <= max_hops <= MAX_HOPS_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_hops must be between 1 and {MAX_HOPS_LIMIT}"
+        )
+    
     try:
         logger.info(f"🔍 Mixer analysis requested for token: {token_address}")
         
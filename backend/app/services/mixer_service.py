@@ -104,9 +104,10 @@ class MixerDetectionService:
         try:
             logger.info(f"🔍 Calling agent API for mixer detection: {token_address}")
             
-            # Prepare request payload - ngrok webhook expects only 'token'
+            # Prepare request payload - ngrok webhook forwards these to detect_mixer_origins
             payload = {
-                "token": token_address
+                "token": token_address,
+                "max_hops": max_hops
             }
             
             logger.info(f"Sending payload: {payload} to {AGENT_MIXER_ENDPOINT}")
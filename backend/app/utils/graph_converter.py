@@ -29,9 +29,12 @@ def convert_forensic_output_to_analysis_data(
         AnalysisDataModel ready for frontend consumption
     """
     try:
-        # Ensure clusters is a list
+        # Ensure clusters is a list (the agent returns a columnar ClusterTable;
+        # materialize its dict views once instead of on every pass below)
         if not clusters:
             clusters = []
+        elif hasattr(clusters, 'to_dicts'):
+            clusters = clusters.to_dicts()
         
         logger.info(f"Converting forensic data: graph has {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
 
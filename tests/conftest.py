@@ -0,0 +1,68 @@
+"""Shared fixtures: the agent modules live in script folders, not packages"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# Spawned pool workers inherit sys.path, so they can import the same modules
+for folder in ('agent/first-flow', 'agent/second-flow'):
+    sys.path.insert(0, str(ROOT / folder))
+
+
+@pytest.fixture(scope='session')
+def work():
+    import work
+    return work
+
+
+@pytest.fixture(scope='session')
+def mixer(tmp_path_factory):
+    import mixer_mcp_tool
+    # Default registry only (known mixers and hubs), whatever the working directory holds
+    empty = tmp_path_factory.mktemp('address_registry')
+    mixer_mcp_tool.address_registry = mixer_mcp_tool.AddressRegistry.from_entries(
+        mixer_mcp_tool.AddressRegistry.read_entries(str(empty)))
+    return mixer_mcp_tool
+
+
+def wallet(i):
+    return f"0x{i:040x}"
+
+
+def synthetic_transfers(mixer, n_wallets=400, n_tx=3000, n_mixers=4, seed=7):
+    """
+    Deterministic token transfers: wallets deposit to and withdraw from a few
+    mixers (the registry's known Tornado pools plus behavioral ones), the rest
+    is wallet-to-wallet noise. Some transfers carry an unparseable timestamp.
+    """
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    known = sorted(mixer.KNOWN_MIXER_ADDRESSES)[:2]
+    mixers = known + [f"0x{('m%d' % i).rjust(40, '0')}" for i in range(n_mixers - len(known))]
+    transfers = []
+    for _ in range(n_tx):
+        r = rng.random()
+        if r < 0.15:
+            sender, receiver = wallet(rng.randrange(n_wallets)), rng.choice(mixers)
+        elif r < 0.3:
+            sender, receiver = rng.choice(mixers), wallet(rng.randrange(n_wallets))
+        else:
+            sender, receiver = wallet(rng.randrange(n_wallets)), wallet(rng.randrange(n_wallets))
+        amount = rng.choice([0.1, 1.0, 10.0, 100.0, round(rng.random() * 50, 6)])
+        when = base + timedelta(seconds=rng.randrange(86400))
+        timestamp = 'unknown' if rng.random() < 0.02 else when.strftime('%Y-%m-%dT%H:%M:%SZ')
+        transfers.append({'sender': sender, 'receiver': receiver, 'amount': amount, 'timestamp': timestamp,
+                          'currency': rng.choice(['ETH', 'ETH', 'DAI']), 'token_address': '0xtoken'})
+    return mixer.attach_parsed_times(transfers), mixers
+
+
+@pytest.fixture
+def transfer_graph(mixer):
+    """(graph, edge arrays, mixer addresses) of the default synthetic transfers"""
+    transfers, mixers = synthetic_transfers(mixer)
+    G = mixer.build_complete_graph(transfers)
+    return G, mixer.build_edge_arrays(G), mixers
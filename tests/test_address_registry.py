@@ -0,0 +1,103 @@
+"""AddressRegistry (mixer_mcp_tool.py): packed binary-search lookups against a plain dict"""
+
+import os
+import random
+
+import numpy as np
+import pytest
+
+
+def address(i):
+    return f"0x{i:040x}"
+
+
+@pytest.fixture
+def label_dir(tmp_path):
+    directory = tmp_path / 'address_registry'
+    directory.mkdir()
+    rows = ['address,label,category']
+    rows += [f"{address(i)},Pool {i},mixer" for i in range(0, 200, 2)]
+    rows += [f"{address(i).upper().replace('0X', '0x')},Exchange {i},exchange" for i in range(1, 200, 10)]
+    rows += ['not-an-address,Broken,mixer', f"{address(4)},Duplicate,exchange"]
+    (directory / 'labels.csv').write_text('\n'.join(rows) + '\n')
+    (directory / 'ofac.txt').write_text(f"# sanctioned\n{address(4)}\n{address(301)}\n")
+    return directory
+
+
+@pytest.fixture
+def registry(mixer, label_dir):
+    return mixer.AddressRegistry.load(str(label_dir))
+
+
+def expected_entries(mixer):
+    """address -> (label, category) of the first non-sanctions entry, as documented"""
+    expected = {a: (label, 'mixer') for a, label in mixer.KNOWN_MIXER_ADDRESSES.items()}
+    expected.update((a, entry) for a, entry in mixer.KNOWN_HUB_ADDRESSES.items())
+    for i in range(0, 200, 2):
+        expected[address(i)] = (f"Pool {i}", 'mixer')
+    for i in range(1, 200, 10):
+        expected[address(i)] = (f"Exchange {i}", 'exchange')
+    expected[address(301)] = ('ofac', 'sanctioned')
+    return expected
+
+
+def test_find_and_lookup_match_dict(mixer, registry):
+    expected = expected_entries(mixer)
+    rng = random.Random(3)
+    queries = [address(rng.randrange(400)) for _ in range(500)] + list(expected)
+    queries += [address(7).upper().replace('0X', '0x'), address(8)[2:], '0x123', 'hello', '', address(2) + '00']
+
+    positions = registry.find(queries)
+    assert len(registry) == len(expected)
+    for query, position in zip(queries, positions.tolist()):
+        key = query.lower() if query.lower().startswith('0x') else '0x' + query.lower()
+        if key in expected and mixer.AddressRegistry.pack(query) is not None:
+            assert position >= 0
+            assert registry.lookup(query) == expected[key]
+        else:
+            assert position == -1, query
+            assert registry.lookup(query) is None
+
+
+def test_masks_and_mixer_types(mixer, registry):
+    queries = [address(2), address(4), address(11), address(301), address(3), 'bad']
+    positions = registry.find(queries)
+    assert registry.mixer_types(positions) == ['Pool 2', 'Pool 4', None, None, None, None]
+    assert registry.category_mask(positions, 'mixer').tolist() == [True, True, False, False, False, False]
+    assert registry.categories_mask(positions, ('exchange', 'router')).tolist() == [
+        False, False, True, False, False, False]
+    assert registry.category_mask(positions, 'bridge').tolist() == [False] * 6
+    # A sanctioned mixer keeps its mixer label
+    assert registry.sanctioned_mask(positions).tolist() == [False, True, False, True, False, False]
+    assert registry.is_sanctioned(address(4)) and not registry.is_sanctioned(address(2))
+
+
+def test_empty_registry(mixer):
+    registry = mixer.AddressRegistry.from_entries([])
+    positions = registry.find([address(1), 'bad'])
+    assert positions.tolist() == [-1, -1]
+    assert registry.mixer_types(positions) == [None, None]
+    assert registry.lookup(address(1)) is None
+
+
+def test_compiled_registry_is_reused_until_files_change(mixer, registry, label_dir):
+    compiled = f"{label_dir}.npz"
+    assert os.path.exists(compiled)
+    again = mixer.AddressRegistry.load(str(label_dir))
+    assert np.array_equal(again.keys, registry.keys) and again.labels == registry.labels
+
+    with open(label_dir / 'labels.csv', 'a') as f:
+        f.write(f"{address(999)},Late pool,mixer\n")
+    os.utime(label_dir / 'labels.csv', ns=(1, 1))
+    updated = mixer.AddressRegistry.load(str(label_dir))
+    assert updated.lookup(address(999)) == ('Late pool', 'mixer')
+
+
+def test_direct_mixer_detection_uses_registry(mixer):
+    known = next(iter(mixer.KNOWN_MIXER_ADDRESSES))
+    result = mixer.detect_direct_mixer_addresses(known.upper().replace('0X', '0x'))
+    assert result['is_mixer'] and result['mixer_type'] == mixer.KNOWN_MIXER_ADDRESSES[known]
+    hub, (label, category) = next(iter(mixer.KNOWN_HUB_ADDRESSES.items()))
+    assert mixer.detect_direct_mixer_addresses(hub) == {
+        'is_mixer': False, 'confidence': 0.0, 'registry_label': label, 'registry_category': category}
+    assert mixer.detect_direct_mixer_addresses(address(5)) == {'is_mixer': False, 'confidence': 0.0}
@@ -0,0 +1,92 @@
+"""ClusterTable (work.py): vectorized risk scoring against the per-cluster rules"""
+
+import random
+
+import pytest
+
+
+def reference_risk(work, cluster):
+    """The per-cluster scoring the table replaces"""
+    cluster_type = cluster.get('type', '')
+    base_score = work.CLUSTER_TYPE_WEIGHTS.get(cluster_type, 0.3)
+    size_score = min(cluster.get('size', 0) / 10, 1.0)
+    volume = cluster.get('total_amount', cluster.get('total_volume',
+                         cluster.get('total_received', cluster.get('total_in', 0))))
+    volume_score = min(volume / 1000, 1.0) if volume > 0 else 0
+    whale_score = min(cluster.get('whale_count', 0) / 5, 1.0)
+    uniformity_score = 0
+    if 'cv' in cluster and cluster['cv'] < 0.3:
+        uniformity_score = 0.8
+    if 'is_uniform' in cluster and cluster['is_uniform']:
+        uniformity_score = 0.9
+    if 'similarity_ratio' in cluster and cluster['similarity_ratio'] > 0.8:
+        uniformity_score = 0.7
+
+    risk_score = (base_score * 0.35 + size_score * 0.20 + volume_score * 0.20 +
+                  whale_score * 0.15 + uniformity_score * 0.10)
+    if cluster_type in ('circular_trading', 'ponzi_suspected', 'mixer_suspected'):
+        risk_score *= 1.1
+    risk_score = min(risk_score, 1.0)
+
+    if risk_score >= 0.75:
+        level = 'CRITICAL'
+    elif risk_score >= 0.60:
+        level = 'HIGH'
+    elif risk_score >= 0.40:
+        level = 'MEDIUM'
+    else:
+        level = 'LOW'
+    return round(risk_score, 3), level
+
+
+def random_clusters(work, count=300, seed=4):
+    rng = random.Random(seed)
+    types = list(work.CLUSTER_TYPE_WEIGHTS) + ['unknown_type']
+    volume_keys = ['total_amount', 'total_volume', 'total_received', 'total_in', None]
+    clusters = []
+    for _ in range(count):
+        wallets = [f"0x{rng.randrange(50):040x}" for _ in range(rng.randrange(1, 8))]
+        cluster = {'type': rng.choice(types), 'size': rng.randrange(0, 30)}
+        key = rng.choice(volume_keys)
+        if key:
+            cluster[key] = rng.choice([0, rng.random() * 3000])
+        if rng.random() < 0.5:
+            cluster['whale_count'] = rng.randrange(0, 8)
+        if rng.random() < 0.3:
+            cluster['cv'] = rng.random() * 0.6
+        if rng.random() < 0.3:
+            cluster['is_uniform'] = rng.random() < 0.5
+        if rng.random() < 0.3:
+            cluster['similarity_ratio'] = rng.random()
+        member_key = rng.choice(['wallets', 'receivers', 'cycle', 'pair', 'path'])
+        cluster[member_key] = wallets
+        clusters.append(cluster)
+    return clusters
+
+
+def test_scores_match_per_cluster_rules(work):
+    clusters = random_clusters(work)
+    rows = work.ClusterTable.from_clusters(clusters).score().to_dicts()
+    assert len(rows) == len(clusters)
+    for cluster, row in zip(clusters, rows):
+        score, level = reference_risk(work, cluster)
+        assert row['risk_score'] == pytest.approx(score, abs=1e-3)
+        assert row['risk_level'] == level
+
+
+def test_rows_keep_cluster_fields_and_members(work):
+    clusters = random_clusters(work, count=50, seed=9)
+    table = work.ClusterTable.from_clusters(clusters)
+    for i, cluster in enumerate(clusters):
+        row = table[i]
+        for key, value in cluster.items():
+            assert row[key] == value
+        members = (cluster.get('wallets') or cluster.get('receivers') or cluster.get('cycle') or
+                   cluster.get('pair') or cluster.get('path'))
+        assert table.members(i) == members
+
+
+def test_empty_table(work):
+    table = work.ClusterTable.from_clusters([]).score()
+    assert len(table) == 0
+    assert table.to_dicts() == []
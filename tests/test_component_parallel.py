@@ -0,0 +1,115 @@
+"""Per-component work on the process pool (mixer_mcp_tool.py) against the in-process passes"""
+
+from datetime import datetime, timedelta
+import random
+
+import numpy as np
+import pytest
+
+from conftest import synthetic_transfers
+
+
+def star_transfers(count, seed=5):
+    """Disconnected mixer-like stars: depositors → hub → withdrawers → next hop"""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 2)
+    transfers = []
+
+    def add(sender, receiver, seconds, amount):
+        transfers.append({'sender': sender, 'receiver': receiver, 'amount': amount, 'currency': 'ETH',
+                          'timestamp': (base + timedelta(seconds=seconds)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                          'token_address': '0xtoken'})
+    for k in range(count):
+        hub = f"0xc{k:039x}"
+        for j in range(20):
+            add(f"0xd{k:04x}{j:035x}", hub, rng.randrange(1000), 1.0)
+        for j in range(25):
+            withdrawer = f"0xe{k:04x}{j:035x}"
+            add(hub, withdrawer, 2000 + rng.randrange(1000), 1.0)
+            add(withdrawer, f"0xf{k:04x}{j:035x}", rng.randrange(5000), round(rng.random() * 3, 6))
+    return transfers
+
+
+@pytest.fixture
+def pool(mixer, monkeypatch):
+    monkeypatch.setattr(mixer, 'COMPONENT_WORKERS', 2)
+    monkeypatch.setattr(mixer, 'COMPONENT_PARALLEL_MIN_TARGETS', 10)
+    yield
+    if mixer.component_executor is not None:
+        mixer.component_executor.shutdown(wait=True)
+        mixer.component_executor = None
+
+
+@pytest.fixture
+def split_graph(mixer):
+    transfers, _ = synthetic_transfers(mixer)
+    G = mixer.build_complete_graph(mixer.attach_parsed_times(transfers + star_transfers(120)))
+    arrays = mixer.build_edge_arrays(G)
+    batch = mixer.calculate_mixer_scores_batch(G, arrays)
+    order = np.argsort(-batch['weighted_scores'], kind='stable')
+    mixers = [batch['nodes'][i] for i in order if batch['weighted_scores'][i] >= mixer.MIXER_SCORE_THRESHOLD]
+    return G, arrays, batch, mixers
+
+
+def provenance(mixer, G, arrays, batch, mixers, temporal, parallel):
+    cache = mixer.MixerScoreCache(G, batch)
+    for candidate in mixers:
+        cache.seed(candidate, *mixer.detect_mixer_behavior(G, candidate))
+    provenance_stats, traversal_stats = {}, {}
+    provenance_map = mixer.build_complete_provenance(G, mixers, score_cache=cache, edge_arrays=arrays,
+                                                     temporal=temporal, provenance_stats=provenance_stats,
+                                                     traversal_stats=traversal_stats, parallel=parallel)
+    return provenance_map, provenance_stats, traversal_stats
+
+
+@pytest.mark.parametrize('temporal', [False, True])
+def test_parallel_backward_maps_match_in_process(mixer, pool, split_graph, temporal):
+    G, arrays, batch, mixers = split_graph
+    assert len(mixers) > 100
+
+    inline_map, inline_stats, inline_traversal = provenance(mixer, G, arrays, batch, mixers, temporal, False)
+    parallel_map, parallel_stats, parallel_traversal = provenance(mixer, G, arrays, batch, mixers, temporal, True)
+
+    components = parallel_traversal.pop('component_parallelism')
+    assert components['batches'] >= 2 and components['tasks'] >= components['batches']
+    assert 'component_parallelism' not in inline_traversal
+    assert parallel_traversal == inline_traversal
+    assert parallel_map == inline_map
+    assert parallel_stats == inline_stats
+    assert any(entry['direction'] == 'backward' for entries in inline_map.values() for entry in entries)
+
+
+def test_component_features_are_bit_identical(mixer, pool, split_graph, monkeypatch):
+    G, arrays, batch, _ = split_graph
+    features = mixer.heuristic_features_by_component(G, arrays)
+    assert features is not None
+    assert np.array_equal(features, batch['features'])
+
+    monkeypatch.setattr(mixer, 'COMPONENT_PARALLEL_MIN_EDGES', 0)
+    parallel = mixer.calculate_mixer_scores_batch(G, arrays)
+    assert np.array_equal(parallel['weighted_scores'], batch['weighted_scores'])
+
+
+def test_single_batch_graph_is_not_split(mixer, pool, transfer_graph):
+    G, arrays, _ = transfer_graph
+    assert mixer.heuristic_features_by_component(G, arrays) is None
+
+
+def test_plans_cover_every_target_once(mixer):
+    rng = np.random.RandomState(2)
+    labels = np.repeat(np.arange(40), rng.randint(1, 300, size=40))
+    rng.shuffle(labels)
+    sizes = np.bincount(labels)
+
+    batches = mixer.plan_component_batches(labels, np.arange(40), batch_nodes=500)
+    assert sorted(c for batch in batches for c in batch) == list(range(40))
+    assert all(len(batch) == 1 or sizes[batch].sum() <= 500 for batch in batches)
+    assert [sizes[batch[0]] for batch in batches] == sorted((sizes[batch[0]] for batch in batches), reverse=True)
+
+    targets = np.sort(rng.choice(len(labels), 700, replace=False))
+    tasks = mixer.plan_component_tasks(labels, targets, batch_nodes=500, chunk_targets=50, workers=3)
+    parts = [part for _, task_parts in tasks for part in task_parts]
+    assert np.array_equal(np.sort(np.concatenate(parts)), targets)
+    for node_ids, task_parts in tasks:
+        assert len(task_parts) <= 3
+        assert all(np.isin(part, node_ids).all() for part in task_parts)
@@ -0,0 +1,66 @@
+"""louvain_csr (work.py) against NetworkX on graphs with known community structure"""
+
+import networkx as nx
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, block_diag
+
+
+def adjacency(G):
+    return csr_matrix(nx.to_scipy_sparse_array(G, nodelist=sorted(G), weight='weight', format='csr'))
+
+
+def communities(labels):
+    return [set(np.flatnonzero(labels == c).tolist()) for c in np.unique(labels)]
+
+
+@pytest.fixture(params=['karate', 'planted'])
+def graph(request):
+    if request.param == 'karate':
+        return nx.karate_club_graph()
+    return nx.planted_partition_graph(6, 30, 0.4, 0.01, seed=3)
+
+
+def test_modularity_matches_networkx(work, graph):
+    labels = np.random.RandomState(0).randint(0, 4, size=graph.number_of_nodes())
+    expected = nx.community.modularity(graph, communities(labels), weight='weight')
+    assert work._modularity_csr(adjacency(graph), labels) == pytest.approx(expected)
+
+
+def test_partition_as_good_as_networkx(work, graph):
+    labels = work.louvain_csr(adjacency(graph))
+    ours = nx.community.modularity(graph, communities(labels), weight='weight')
+    reference = nx.community.modularity(graph, nx.community.louvain_communities(graph, seed=1), weight='weight')
+    assert ours >= reference - 0.02
+
+
+def test_recovers_planted_communities(work):
+    G = nx.planted_partition_graph(6, 30, 0.5, 0.005, seed=5)
+    labels = work.louvain_csr(adjacency(G))
+    planted = np.repeat(np.arange(6), 30)
+    # Every planted group lands (almost) entirely in one community
+    for group in range(6):
+        members = labels[planted == group]
+        assert np.bincount(members).max() >= 28
+
+
+def test_warm_start_keeps_a_converged_partition(work, graph):
+    A = adjacency(graph)
+    labels = work.louvain_csr(A)
+    warm = work.louvain_csr(A, initial_labels=labels)
+    assert work._modularity_csr(A, warm) >= work._modularity_csr(A, labels) - 1e-12
+
+
+def test_blocks_with_total_weight_add_up(work):
+    # Components never share a community: per-block runs with the whole graph's
+    # total weight give the whole graph's modularity
+    first = nx.planted_partition_graph(3, 20, 0.5, 0.02, seed=7)
+    second = nx.planted_partition_graph(2, 25, 0.5, 0.02, seed=8)
+    blocks = [adjacency(first), adjacency(second)]
+    whole = csr_matrix(block_diag(blocks))
+    m2 = whole.sum()
+
+    parts = [work.louvain_csr(block, m2=m2) for block in blocks]
+    labels = np.concatenate([parts[0], parts[1] + parts[0].max() + 1])
+    contributions = sum(work._modularity_csr(block, part, m2=m2) for block, part in zip(blocks, parts))
+    assert work._modularity_csr(whole, labels) == pytest.approx(contributions)
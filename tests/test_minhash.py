@@ -0,0 +1,49 @@
+"""MinHash signatures and LSH grouping (work.py)"""
+
+import numpy as np
+
+
+def signatures_of(work, sets, num_perm=128):
+    groups = np.concatenate([np.full(len(s), g) for g, s in enumerate(sets)])
+    items = np.concatenate([np.array(sorted(s)) for s in sets])
+    return work.minhash_signatures(groups, items, len(sets), num_perm=num_perm)
+
+
+def test_signature_agreement_estimates_jaccard(work):
+    rng = np.random.RandomState(0)
+    base = set(rng.choice(100000, 400, replace=False).tolist())
+    sets = [base]
+    for keep in (350, 250, 100):
+        kept = set(list(base)[:keep])
+        sets.append(kept | set((rng.choice(100000, 400 - keep, replace=False) + 200000).tolist()))
+
+    signatures = signatures_of(work, sets, num_perm=256)
+    for other in sets[1:]:
+        jaccard = len(base & other) / len(base | other)
+        estimate = (signatures[0] == signatures[sets.index(other)]).mean()
+        assert abs(estimate - jaccard) < 0.1
+
+
+def test_identical_sets_have_identical_signatures(work):
+    signatures = signatures_of(work, [{1, 5, 9}, {9, 5, 1}, {2, 4}])
+    assert (signatures[0] == signatures[1]).all()
+    assert not (signatures[0] == signatures[2]).all()
+
+
+def test_lsh_groups_near_duplicates_only(work):
+    rng = np.random.RandomState(1)
+    families = []
+    for family in range(5):
+        core = set((rng.choice(10000, 200, replace=False) + family * 100000).tolist())
+        families.append([core] + [core - {sorted(core)[i]} for i in range(3)])
+    sets = [s for family in families for s in family]
+
+    labels = work.lsh_similar_components(signatures_of(work, sets), threshold=0.8)
+    expected = np.repeat(np.arange(5), 4)
+    for family in range(5):
+        assert len(np.unique(labels[expected == family])) == 1
+    assert len(np.unique(labels)) == 5
+
+
+def test_lsh_empty(work):
+    assert len(work.lsh_similar_components(np.zeros((0, 128), dtype=np.uint64))) == 0
@@ -0,0 +1,41 @@
+"""calculate_mixer_scores_batch (mixer_mcp_tool.py) against the per-node detect_mixer_behavior"""
+
+import numpy as np
+import pytest
+
+from conftest import synthetic_transfers
+
+
+@pytest.mark.parametrize('seed', [7, 11])
+def test_batch_scores_match_per_node_detection(mixer, seed):
+    transfers, _ = synthetic_transfers(mixer, seed=seed)
+    G = mixer.build_complete_graph(transfers)
+    batch = mixer.calculate_mixer_scores_batch(G)
+    assert not batch['hubs'].any()
+
+    for i, node in enumerate(batch['nodes']):
+        score, reasoning = mixer.detect_mixer_behavior(G, node)
+        assert batch['weighted_scores'][i] == pytest.approx(score, abs=1e-9), node
+        if 'heuristics' not in reasoning:
+            continue
+        for k, name in enumerate(mixer.HEURISTIC_NAMES):
+            assert batch['score_matrix'][i, k] == pytest.approx(reasoning['heuristics'][name]['score'], abs=1e-9)
+
+
+def test_known_mixers_flagged(mixer, transfer_graph):
+    G, arrays, mixers = transfer_graph
+    batch = mixer.calculate_mixer_scores_batch(G, arrays)
+    known = {batch['nodes'][i] for i in np.flatnonzero(batch['known_mixers'])}
+    assert known == set(mixers) & set(mixer.KNOWN_MIXER_ADDRESSES)
+    assert all(batch['weighted_scores'][batch['index'][node]] == 1.0 for node in known)
+
+
+def test_registry_memo_gives_same_scores(mixer, transfer_graph):
+    G, arrays, _ = transfer_graph
+    memo = {}
+    first = mixer.calculate_mixer_scores_batch(G, arrays, registry_memo=memo)
+    second = mixer.calculate_mixer_scores_batch(G, arrays, registry_memo=memo)
+    plain = mixer.calculate_mixer_scores_batch(G, arrays)
+    assert len(memo) == G.number_of_nodes()
+    assert np.array_equal(first['weighted_scores'], plain['weighted_scores'])
+    assert np.array_equal(second['weighted_scores'], plain['weighted_scores'])
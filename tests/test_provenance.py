@@ -0,0 +1,72 @@
+"""Multi-source provenance BFS (mixer_mcp_tool.py) against NetworkX shortest paths"""
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from conftest import synthetic_transfers
+
+
+@pytest.fixture
+def sparse_graph(mixer):
+    transfers, mixers = synthetic_transfers(mixer, n_wallets=3000, n_tx=4000, seed=3)
+    G = mixer.build_complete_graph(transfers)
+    return G, mixer.build_edge_arrays(G), mixers
+
+
+@pytest.mark.parametrize('max_hops', [1, 3, 6])
+def test_hops_are_nearest_mixer_distances(mixer, sparse_graph, max_hops):
+    G, arrays, mixers = sparse_graph
+    labels = mixer.trace_provenance_multi_source(G, mixers, max_hops=max_hops, edge_arrays=arrays,
+                                                 node_limit=None)
+    distances = nx.multi_source_dijkstra_path_length(G, set(mixers), cutoff=max_hops)
+    assert labels['depth_reached'] <= max_hops
+
+    for i, node in enumerate(labels['nodes']):
+        assert labels['hops'][i] == distances.get(node, -1), node
+        if labels['hops'][i] <= 0:
+            continue
+        origin = labels['nodes'][labels['origin'][i]]
+        assert origin in mixers
+        path = mixer.reconstruct_provenance_path(labels, node)
+        assert path[0] == origin and path[-1] == node
+        assert len(path) == labels['hops'][i] + 1
+        assert all(G.has_edge(a, b) for a, b in zip(path, path[1:]))
+
+
+def test_terminal_wallets_are_labelled_but_not_expanded(mixer):
+    G = nx.DiGraph([('m', 'hub'), ('hub', 'a'), ('m', 'b'), ('b', 'c')])
+    labels = mixer.trace_provenance_multi_source(G, ['m'], max_hops=3, node_limit=None, terminal={'hub'})
+    hops = dict(zip(labels['nodes'], labels['hops'].tolist()))
+    assert hops == {'m': 0, 'hub': 1, 'a': -1, 'b': 1, 'c': 2}
+    assert labels['terminal_reached'] == 1
+
+
+def test_node_limit_stops_expansion(mixer):
+    G = nx.DiGraph([('m', 'a'), ('m', 'b'), ('a', 'c'), ('c', 'd')])
+    labels = mixer.trace_provenance_multi_source(G, ['m'], max_hops=3, node_limit=2)
+    hops = dict(zip(labels['nodes'], labels['hops'].tolist()))
+    assert hops == {'m': 0, 'a': 1, 'b': 1, 'c': -1, 'd': -1}
+    assert labels['frontier_capped'] and labels['depth_reached'] == 1
+
+
+def test_mixer_funded_through_another_mixer(mixer):
+    # m1 → a → b → m2 → c: m2 keeps hops 0 as a seed but is labelled 3 hops from m1
+    G = nx.DiGraph([('m1', 'a'), ('a', 'b'), ('b', 'm2'), ('m2', 'c')])
+    labels = mixer.trace_provenance_multi_source(G, ['m1', 'm2'], max_hops=3, node_limit=None)
+    index = labels['index']
+    hops, origin = mixer.exposure_labels(labels)
+
+    assert labels['hops'][index['m2']] == 0
+    assert hops[index['m2']] == 3 and labels['nodes'][origin[index['m2']]] == 'm1'
+    assert hops[index['m1']] == 0
+    assert hops[index['c']] == 1 and labels['nodes'][origin[index['c']]] == 'm2'
+    assert mixer.reconstruct_provenance_path(labels, 'm2') == ['m1', 'a', 'b', 'm2']
+    assert mixer.reconstruct_provenance_path(labels, 'c') == ['m2', 'c']
+
+
+def test_chained_mixer_beyond_max_hops_stays_a_seed(mixer):
+    G = nx.DiGraph([('m1', 'a'), ('a', 'b'), ('b', 'm2')])
+    labels = mixer.trace_provenance_multi_source(G, ['m1', 'm2'], max_hops=2, node_limit=None)
+    assert labels['seed_hops'][labels['index']['m2']] == -1
+    assert mixer.reconstruct_provenance_path(labels, 'm2') == ['m2']
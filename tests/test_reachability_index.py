@@ -0,0 +1,70 @@
+"""MixerReachabilityIndex (mixer_mcp_tool.py) against the per-mixer provenance tracers"""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def candidates(mixer, transfer_graph):
+    G, arrays, _ = transfer_graph
+    batch = mixer.calculate_mixer_scores_batch(G, arrays)
+    ranked = np.flatnonzero(batch['weighted_scores'] >= mixer.MIXER_SCORE_THRESHOLD)
+    return {batch['nodes'][i]: {'score': float(batch['weighted_scores'][i]),
+                                'reasoning': {'heuristics': {'fan_in': {'value': int(batch['fan_in'][i])},
+                                                             'fan_out': {'value': int(batch['fan_out'][i])}}}}
+            for i in ranked}
+
+
+def distances(index, j):
+    """Hop distance of every wallet from mixer j (-1 if not reached)"""
+    within = ((index.reach[:, :, j // 8] >> (7 - j % 8)) & 1).astype(bool)
+    return np.where(within[-1], within.argmax(axis=0), -1)
+
+
+@pytest.mark.parametrize('temporal', [False, True])
+def test_distances_match_single_mixer_traces(mixer, transfer_graph, candidates, temporal, monkeypatch):
+    G, arrays, _ = transfer_graph
+    # Several temporal blocks, one of them partial
+    monkeypatch.setattr(mixer.MixerReachabilityIndex, 'TEMPORAL_BLOCK', 16)
+    # Hubs stand in for terminal wallets (never mixer candidates in the pipeline)
+    degree = dict(G.degree())
+    terminal = set(sorted((node for node in G if node not in candidates), key=degree.get)[-5:])
+    index = mixer.MixerReachabilityIndex.build(G, candidates, max_hops=3, edge_arrays=arrays,
+                                               terminal=terminal, temporal=temporal)
+    tracer = mixer.trace_provenance_multi_source_temporal if temporal else mixer.trace_provenance_multi_source
+    assert len(index.mixers) > 16 and len(index.mixers) % 16
+    assert index.temporal == temporal
+
+    for j, source in enumerate(index.mixers):
+        labels = tracer(G, [source], max_hops=3, edge_arrays=arrays, node_limit=None, terminal=terminal)
+        assert np.array_equal(distances(index, j), labels['hops']), source
+
+
+def test_temporal_reach_is_a_subset(mixer, transfer_graph, candidates):
+    G, arrays, _ = transfer_graph
+    plain = mixer.MixerReachabilityIndex.build(G, candidates, edge_arrays=arrays, temporal=False)
+    temporal = mixer.MixerReachabilityIndex.build(G, candidates, edge_arrays=arrays, temporal=True)
+    assert not (temporal.reach & ~plain.reach).any()
+    assert (temporal.reach != plain.reach).any()
+
+
+def test_lookup_and_round_trip(mixer, transfer_graph, candidates, tmp_path):
+    G, arrays, _ = transfer_graph
+    index = mixer.MixerReachabilityIndex.build(G, candidates, edge_arrays=arrays, temporal=True)
+    wallet = next(node for node in index.nodes if node not in candidates and index.lookup(node))
+
+    exposures = index.lookup(wallet)
+    assert [e['distance'] for e in exposures] == sorted(e['distance'] for e in exposures)
+    for e in exposures:
+        assert distances(index, index.mixers.index(e['mixer']))[index.index[wallet]] == e['distance']
+        assert e['mixer_score'] == pytest.approx(candidates[e['mixer']]['score'])
+    assert index.lookup(wallet.upper().replace('0X', '0x')) == exposures
+    assert index.lookup('0x' + 'f' * 40) is None
+
+    filename = str(tmp_path / 'index.npz')
+    index.save(filename)
+    loaded = mixer.MixerReachabilityIndex.load(filename)
+    assert np.array_equal(loaded.reach, index.reach)
+    assert loaded.nodes == index.nodes and loaded.mixers == index.mixers
+    assert loaded.temporal and loaded.version == index.version
+    assert loaded.lookup(wallet) == exposures
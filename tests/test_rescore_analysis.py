@@ -0,0 +1,108 @@
+"""rescore_analysis (mixer_mcp_tool.py): feature-cache rescoring against full pipeline runs"""
+
+import numpy as np
+import pytest
+
+from conftest import synthetic_transfers
+
+TOKEN = '0xToken'
+
+
+@pytest.fixture
+def pipeline(mixer, monkeypatch, tmp_path):
+    """Runs detect_mixer_origins_complete on synthetic transfers, caches under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(mixer, 'feature_caches', {})
+    monkeypatch.setattr(mixer, 'reachability_indexes', {})
+    monkeypatch.setattr(mixer, 'persist_provenance_in_background', lambda *args, **kwargs: {'status': 'skipped'})
+    transfers, _ = synthetic_transfers(mixer, n_wallets=1500, n_tx=4000, seed=9)
+    monkeypatch.setattr(mixer, 'load_transactions_for_token', lambda token_address, limit=10000: transfers)
+
+    def run():
+        report = mixer.detect_mixer_origins_complete(TOKEN, time_budget=None)
+        assert 'error' not in report
+        return report
+    return run
+
+
+def summary(report):
+    return (report['mixer_detection_results']['summary']['total_mixers_detected'],
+            report['wallet_exposure_analysis']['summary']['wallets_with_mixer_exposure'])
+
+
+def test_unchanged_weights_change_nothing(mixer, pipeline):
+    mixers, exposed = summary(pipeline())
+    for weights, threshold in ((None, None), (dict(mixer.WEIGHTS), mixer.MIXER_SCORE_THRESHOLD)):
+        result = mixer.rescore_analysis(TOKEN.lower(), weights, threshold)
+        assert result['weights'] == mixer.WEIGHTS
+        assert result['mixer_candidates']['total'] == result['mixer_candidates']['previous_total'] == mixers
+        assert result['mixer_candidates']['added'] == result['mixer_candidates']['removed'] == []
+        assert result['exposure']['wallets_exposed'] == result['exposure']['previously_exposed'] == exposed
+        assert result['exposure']['newly_exposed'] == result['exposure']['no_longer_exposed'] == 0
+        assert not result['exposure']['re_traversed']
+        assert not result['stale']['backward_provenance'] and result['stale']['message'] is None
+        assert not result['analysis']['partial_results']
+
+
+@pytest.mark.parametrize('weights, threshold', [
+    ({'fan_in': 0.3, 'fan_out': 0.3, 'temporal_randomness': 0.3}, 0.35),
+    (None, 0.5),
+    ({'uniform_denominations': 0.5}, 0.25),
+])
+def test_rescoring_matches_a_full_rerun(mixer, pipeline, monkeypatch, weights, threshold):
+    pipeline()
+    result = mixer.rescore_analysis(TOKEN, weights, threshold, limit=10 ** 6)
+
+    for name, weight in (weights or {}).items():
+        monkeypatch.setitem(mixer.WEIGHTS, name, weight)
+    monkeypatch.setattr(mixer, 'MIXER_SCORE_THRESHOLD', threshold)
+    mixers, exposed = summary(pipeline())
+
+    assert result['mixer_candidates']['total'] == mixers
+    assert result['exposure']['wallets_exposed'] == exposed
+    assert {m['address'] for m in result['mixer_candidates']['top']} == set(mixer.feature_caches[TOKEN.lower()].mixers)
+
+
+def test_cache_reloads_from_disk(mixer, pipeline, monkeypatch):
+    pipeline()
+    in_memory = mixer.rescore_analysis(TOKEN, {'fan_in': 0.6}, 0.4)
+    monkeypatch.setattr(mixer, 'feature_caches', {})
+    from_disk = mixer.rescore_analysis(TOKEN, {'fan_in': 0.6}, 0.4)
+    in_memory.pop('rescoring_seconds'), from_disk.pop('rescoring_seconds')
+    assert from_disk == in_memory
+
+
+def test_budget_cut_analysis_keeps_the_full_baseline(mixer, transfer_graph, monkeypatch):
+    G, arrays, _ = transfer_graph
+    batch = mixer.calculate_mixer_scores_batch(G, arrays)
+    order = np.argsort(-batch['weighted_scores'], kind='stable')
+    mixers = [batch['nodes'][i] for i in order if batch['weighted_scores'][i] >= mixer.MIXER_SCORE_THRESHOLD]
+    cache = mixer.MixerScoreCache(G, batch)
+    full_map = mixer.build_complete_provenance(G, mixers, score_cache=cache, edge_arrays=arrays, parallel=False)
+
+    # A budget cut: only the strongest half were scored and traced
+    scored = mixers[:len(mixers) // 2]
+    cut_map = mixer.build_complete_provenance(G, scored, score_cache=cache, edge_arrays=arrays, parallel=False)
+    feature_cache = mixer.HeuristicFeatureCache.build(batch, arrays, dict.fromkeys(scored), cut_map, partial=True)
+    assert feature_cache.mixers == mixers
+    assert set(feature_cache.nodes[i] for i in np.flatnonzero(feature_cache.exposed)) == set(full_map)
+
+    monkeypatch.setattr(mixer, 'feature_caches', {TOKEN.lower(): feature_cache})
+    result = mixer.rescore_analysis(TOKEN)
+    assert result['analysis']['partial_results']
+    assert result['mixer_candidates']['added'] == result['mixer_candidates']['removed'] == []
+    assert result['exposure']['newly_exposed'] == result['exposure']['no_longer_exposed'] == 0
+
+
+@pytest.mark.parametrize('weights, threshold', [
+    ({'fan_size': 1.0}, None), ({'fan_in': -1}, None), ({'fan_in': 'heavy'}, None), ('fan_in', None),
+    (None, 2), (None, 'high'),
+])
+def test_invalid_arguments(mixer, pipeline, weights, threshold):
+    pipeline()
+    with pytest.raises(ValueError):
+        mixer.rescore_analysis(TOKEN, weights, threshold)
+
+
+def test_unknown_token(mixer, pipeline):
+    assert mixer.rescore_analysis('0xnever') is None
@@ -0,0 +1,57 @@
+"""select_top_provenance (mixer_mcp_tool.py): bounded per-wallet selection against a full sort"""
+
+import random
+import statistics
+
+import pytest
+
+
+def reference_selection(entries, scores, paths_per_mixer, mixers_per_wallet):
+    per_mixer = {}
+    for seq, entry in enumerate(entries):
+        per_mixer.setdefault(entry['mixer'], []).append((entry['hops'], seq, entry))
+    for paths in per_mixer.values():
+        paths.sort(key=lambda item: item[:2])
+        del paths[paths_per_mixer:]
+    best = sorted(per_mixer, key=lambda mixer: (-scores[mixer], per_mixer[mixer][0][0]))[:mixers_per_wallet]
+    return [entry for mixer in best for _, _, entry in per_mixer[mixer]]
+
+
+def random_entries(rng, n_entries, n_mixers):
+    return [{'mixer': f"m{rng.randrange(n_mixers)}", 'hops': rng.randrange(1, 7), 'path': [], 'id': k}
+            for k in range(n_entries)]
+
+
+@pytest.mark.parametrize('paths_per_mixer, mixers_per_wallet', [(1, 1), (2, 10), (3, 4), (50, 50)])
+def test_selection_matches_full_sort(mixer, paths_per_mixer, mixers_per_wallet):
+    rng = random.Random(paths_per_mixer * 100 + mixers_per_wallet)
+    for _ in range(50):
+        entries = random_entries(rng, rng.randrange(0, 60), rng.randrange(1, 15))
+        # Few distinct scores, so ties fall back to the nearest mixer
+        scores = {f"m{j}": rng.choice([0.3, 0.5, 0.9]) for j in range(15)}
+
+        kept, stats = mixer.select_top_provenance(entries, scores.get, paths_per_mixer, mixers_per_wallet)
+        assert [e['id'] for e in kept] == [e['id'] for e in reference_selection(
+            entries, scores, paths_per_mixer, mixers_per_wallet)]
+
+        seen = {e['mixer'] for e in entries}
+        assert len({e['mixer'] for e in kept}) == min(len(seen), mixers_per_wallet)
+        assert stats['mixers_found'] == len(seen)
+        assert stats['paths_found'] == len(entries)
+        if seen:
+            assert stats['max_mixer_score'] == max(scores[m] for m in seen)
+            assert stats['avg_mixer_score'] == pytest.approx(statistics.mean(scores[m] for m in seen))
+
+
+def test_default_bounds(mixer):
+    entries = [{'mixer': f"m{j}", 'hops': hops, 'path': []} for j in range(30) for hops in (3, 1, 2)]
+    kept, stats = mixer.select_top_provenance(entries, lambda m: 0.5)
+    assert len(kept) == mixer.PROVENANCE_PATHS_PER_MIXER * mixer.PROVENANCE_MIXERS_PER_WALLET
+    assert all(e['hops'] <= mixer.PROVENANCE_PATHS_PER_MIXER for e in kept)
+    assert stats['mixers_found'] == 30 and stats['paths_found'] == 90
+
+
+def test_no_entries(mixer):
+    kept, stats = mixer.select_top_provenance([], lambda m: 1.0)
+    assert kept == []
+    assert stats == {'mixers_found': 0, 'paths_found': 0, 'avg_mixer_score': 0, 'max_mixer_score': 0}
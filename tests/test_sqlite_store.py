@@ -0,0 +1,77 @@
+"""SQLiteTransferStore (mixer_mcp_tool.py): day-partitioned save/load round trip"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+TOKEN = '0xToken'
+
+
+def transfers(mixer, days=3, per_day=20, undated=True):
+    base = datetime(2024, 3, 1)
+    rows = []
+    for day in range(days):
+        for k in range(per_day):
+            when = base + timedelta(days=day, minutes=k)
+            rows.append({'sender': f"0x{day:020x}{k:020x}", 'receiver': f"0x{k:040x}", 'amount': 0.5 * k,
+                         'timestamp': when.strftime('%Y-%m-%dT%H:%M:%SZ'), 'currency': 'ETH',
+                         'token_address': TOKEN.lower(), 'tx_hash': f"0x{day}{k:04d}",
+                         'block_height': day * 1000 + k})
+    if undated:
+        rows.append({'sender': '0xa', 'receiver': '0xb', 'amount': 1.0, 'timestamp': 'pending', 'currency': 'ETH',
+                     'token_address': TOKEN.lower(), 'tx_hash': '0xpending', 'block_height': 0})
+    return mixer.attach_parsed_times(rows)
+
+
+def row_key(tx):
+    return tuple(tx[column] for column in ('sender', 'receiver', 'amount', 'timestamp', 'currency',
+                                           'token_address', 'tx_hash', 'block_height', 'time_us'))
+
+
+@pytest.fixture
+def store(mixer, tmp_path):
+    return mixer.SQLiteTransferStore(str(tmp_path / 'store'))
+
+
+def test_round_trip(mixer, store):
+    saved = transfers(mixer)
+    store.save(saved, TOKEN)
+    loaded = store.load(TOKEN, limit=len(saved))
+    assert sorted(map(row_key, loaded)) == sorted(map(row_key, saved))
+
+    with sqlite3.connect(store.path(TOKEN)) as conn:
+        partitions = dict(conn.execute("SELECT day, row_count FROM partitions"))
+    assert partitions == {'20240301': 20, '20240302': 20, '20240303': 20, 'unknown': 1}
+
+
+def test_limit_reads_newest_days_first(mixer, store):
+    store.save(transfers(mixer, undated=False), TOKEN)
+    loaded = store.load(TOKEN, limit=25)
+    assert len(loaded) == 25
+    assert all(tx['timestamp'].startswith('2024-03-03') for tx in loaded[:20])
+    assert all(tx['timestamp'].startswith('2024-03-02') for tx in loaded[20:])
+    # Newest block first within a day
+    heights = [tx['block_height'] for tx in loaded[:20]]
+    assert heights == sorted(heights, reverse=True)
+
+
+def test_saves_append(mixer, store):
+    saved = transfers(mixer, days=1, per_day=5)
+    store.save(saved, TOKEN)
+    store.save(saved, TOKEN)
+    assert len(store.load(TOKEN)) == 2 * len(saved)
+
+
+def test_missing_token_and_load_many(mixer, store):
+    assert store.load('0xnothing') == []
+    store.save(transfers(mixer, days=1, per_day=4), TOKEN)
+    loaded = store.load_many([TOKEN, '0xNothing'])
+    assert set(loaded) == {TOKEN.lower(), '0xnothing'}
+    assert len(loaded[TOKEN.lower()]) == 5 and loaded['0xnothing'] == []
+
+
+def test_get_transfer_store(mixer):
+    assert isinstance(mixer.get_transfer_store('sqlite'), mixer.SQLiteTransferStore)
+    with pytest.raises(ValueError):
+        mixer.get_transfer_store('parquet')
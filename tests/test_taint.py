@@ -0,0 +1,48 @@
+"""Haircut and poison taint propagation (mixer_mcp_tool.py)"""
+
+import networkx as nx
+import numpy as np
+import pytest
+
+
+def small_graph(mixer):
+    G = nx.DiGraph()
+    for sender, receiver, amount in [('m', 'a', 3.0), ('x', 'a', 1.0), ('a', 'b', 2.0), ('y', 'b', 2.0),
+                                     ('b', 'c', 5.0), ('c', 'm', 1.0)]:
+        G.add_edge(sender, receiver, amount=amount, currency='ETH', time_us=None)
+    return G, mixer.build_edge_arrays(G)
+
+
+@pytest.mark.parametrize('max_hops, expected', [
+    (1, {'a': 0.75, 'b': 0.0, 'c': 0.0}),
+    (2, {'a': 0.75, 'b': 0.375, 'c': 0.0}),
+    (3, {'a': 0.75, 'b': 0.375, 'c': 0.375}),
+])
+def test_haircut_is_value_weighted_inflow_share(mixer, max_hops, expected):
+    _, arrays = small_graph(mixer)
+    taint = mixer.propagate_taint(arrays, ['m'], max_hops=max_hops)
+    values = dict(zip(arrays['nodes'], taint.tolist()))
+    assert values['m'] == 1.0 and values['x'] == values['y'] == 0.0
+    for wallet, share in expected.items():
+        assert values[wallet] == pytest.approx(share)
+
+
+@pytest.mark.parametrize('max_hops', [1, 2, 3])
+def test_poison_matches_reachability(mixer, transfer_graph, max_hops):
+    G, arrays, mixers = transfer_graph
+    exposure = mixer.calculate_taint_exposure(G, mixers, max_hops=max_hops, edge_arrays=arrays)
+    labels = mixer.trace_provenance_multi_source(G, mixers, max_hops=max_hops, edge_arrays=arrays,
+                                                 node_limit=None)
+    assert np.array_equal(exposure['poison'] > 0, labels['hops'] >= 0)
+    assert set(np.unique(exposure['poison'])) <= {0.0, 1.0}
+
+    haircut = exposure['haircut']
+    assert ((haircut >= 0) & (haircut <= 1)).all()
+    assert (haircut[[arrays['index'][m] for m in mixers]] == 1.0).all()
+    assert not (haircut > exposure['poison']).any()
+
+
+def test_unknown_mode(mixer):
+    _, arrays = small_graph(mixer)
+    with pytest.raises(ValueError):
+        mixer.propagate_taint(arrays, ['m'], mode='fifo')
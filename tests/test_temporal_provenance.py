@@ -0,0 +1,105 @@
+"""Time-respecting provenance tracers (mixer_mcp_tool.py): every path must be causally possible"""
+
+import math
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from conftest import synthetic_transfers
+
+
+@pytest.fixture
+def sparse_graph(mixer):
+    transfers, mixers = synthetic_transfers(mixer, n_wallets=1500, n_tx=4000, seed=5)
+    G = mixer.build_complete_graph(transfers)
+    return G, mixer.build_edge_arrays(G), mixers
+
+
+def transfer_times(G, sender, receiver):
+    return sorted(t for t in G[sender][receiver]['times_us'] if t is not None)
+
+
+def is_time_respecting(G, path):
+    """A non-decreasing choice of transfer times exists along path (the first hop may be any time)"""
+    at = -math.inf
+    for sender, receiver in zip(path, path[1:]):
+        usable = [t for t in transfer_times(G, sender, receiver) if t >= at]
+        if not usable:
+            return False
+        at = usable[0]
+    return True
+
+
+def reference_hops(G, sources, max_hops):
+    """Earliest arrival per hop count, relaxed over every timed transfer"""
+    transfers = [(s, r, t) for s, r, data in G.edges(data=True) for t in data['times_us'] if t is not None]
+    arrival = {source: -math.inf for source in sources}
+    hops = {source: 0 for source in sources}
+    for hop in range(1, max_hops + 1):
+        updated = dict(arrival)
+        for sender, receiver, t in transfers:
+            if receiver not in sources and arrival.get(sender, math.inf) <= t < updated.get(receiver, math.inf):
+                updated[receiver] = t
+        for wallet in updated:
+            hops.setdefault(wallet, hop)
+        arrival = updated
+    return hops
+
+
+def test_forward_paths_are_time_respecting(mixer, sparse_graph):
+    G, arrays, mixers = sparse_graph
+    labels = mixer.trace_provenance_multi_source_temporal(G, mixers, max_hops=4, edge_arrays=arrays,
+                                                          node_limit=None)
+    plain = mixer.trace_provenance_multi_source(G, mixers, max_hops=4, edge_arrays=arrays, node_limit=None)
+    reached = 0
+    for i, node in enumerate(labels['nodes']):
+        if labels['hops'][i] <= 0:
+            continue
+        reached += 1
+        path = mixer.reconstruct_provenance_path(labels, node)
+        assert path[0] == labels['nodes'][labels['origin'][i]] and path[-1] == node
+        assert all(G.has_edge(a, b) for a, b in zip(path, path[1:]))
+        assert is_time_respecting(G, path), path
+        # Waiting for funds can only lengthen the shortest route
+        assert labels['hops'][i] >= plain['hops'][i] > 0
+    assert reached < (plain['hops'] > 0).sum()
+
+
+@pytest.mark.parametrize('max_hops', [2, 4])
+def test_forward_hops_match_earliest_arrival_reference(mixer, sparse_graph, max_hops):
+    G, arrays, mixers = sparse_graph
+    labels = mixer.trace_provenance_multi_source_temporal(G, mixers, max_hops=max_hops, edge_arrays=arrays,
+                                                          node_limit=None)
+    expected = reference_hops(G, set(mixers), max_hops)
+    assert dict(zip(labels['nodes'], labels['hops'].tolist())) == {
+        node: expected.get(node, -1) for node in labels['nodes']}
+
+
+def test_late_transfer_does_not_pass_funds_on(mixer):
+    G = nx.DiGraph()
+    G.add_edge('m', 'a', amount=1.0, currency='ETH', time_us=200, times_us=[200])
+    G.add_edge('a', 'b', amount=1.0, currency='ETH', time_us=100, times_us=[100])
+    G.add_edge('a', 'c', amount=1.0, currency='ETH', time_us=200, times_us=[200])
+    labels = mixer.trace_provenance_multi_source_temporal(G, ['m'], max_hops=3, node_limit=None)
+    hops = dict(zip(labels['nodes'], labels['hops'].tolist()))
+    assert hops == {'m': 0, 'a': 1, 'b': -1, 'c': 2}
+
+
+def test_backward_paths_are_time_respecting(mixer, sparse_graph):
+    G, arrays, mixers = sparse_graph
+    cache = mixer.MixerScoreCache(G, mixer.calculate_mixer_scores_batch(G, arrays))
+    labels = mixer.trace_provenance_multi_source_temporal(G, mixers, max_hops=3, edge_arrays=arrays,
+                                                          node_limit=None)
+    targets = [labels['nodes'][i] for i in np.flatnonzero(labels['hops'] >= 2)[:40]]
+    found = 0
+    for target in targets:
+        for entry in mixer.trace_provenance_backward_temporal(G, target, max_hops=3, score_cache=cache,
+                                                              edge_arrays=arrays, node_limit=None):
+            found += 1
+            # Backward paths run target → ... → mixer
+            path = entry['path'][::-1]
+            assert path[0] == entry['mixer'] and path[-1] == target
+            assert len(path) - 1 <= entry['hops']
+            assert is_time_respecting(G, path), path
+    assert found